@@ -0,0 +1,256 @@
+import argparse
+import contextlib
+import io
+import json
+import math
+import platform
+import time
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+from ocean_data_qc.fyskem.profile_view import ProfileView
+from ocean_data_qc.fyskem.qc_configuration import QcConfiguration
+from ocean_data_qc.fyskem.qc_flag_expressions import (
+    decode_quality_flags,
+    encode_quality_flags,
+)
+from ocean_data_qc.fyskem.qc_flag_tuple import QcField
+from ocean_data_qc.fyskemqc import QC_CATEGORIES, FysKemQc
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+DEFAULT_NUMBER_OF_ROWS = (10**4, 10**5, 10**6, 10**7)
+STANDARD_DEPTHS = (0, 5, 10, 15, 20, 25, 30, 40, 50, 60, 70, 80, 90, 100, 125, 150, 200)
+INCOMING_FLAGS = ("1", "1", "1", "1", "0", "2", "3", "4", "6", "Q")
+
+
+def parameter_statistics(configuration: QcConfiguration) -> pl.DataFrame:
+    """
+    Mean and standard deviation per parameter, sea basin and month from the statistic
+    check tables. Used to generate values and visits that hit the statistic check.
+    """
+    statistics = []
+    for parameter in configuration.parameters("statistic_check"):
+        statistic_check = configuration.get("statistic_check", parameter)
+        statistics.append(
+            statistic_check.data.group_by(["sea_basin", "month"])
+            .agg(pl.col("mean").mean(), pl.col("std").mean())
+            .with_columns(pl.lit(parameter).alias("parameter"))
+        )
+    return pl.concat(statistics).select(
+        "parameter",
+        "sea_basin",
+        pl.col("month").cast(pl.Int32),
+        pl.col("mean").cast(pl.Float64),
+        pl.col("std").cast(pl.Float64),
+    )
+
+
+def generate_delivery(number_of_rows: int, seed: int = 0) -> pl.DataFrame:
+    """
+    Generate a reproducible synthetic delivery with the given number of rows.
+
+    Each visit is a depth profile in a sea basin and month found in the statistic
+    tables. All configured parameters are sampled at each depth with some parameters
+    randomly missing. Values are drawn from the statistics for the parameter when there
+    are statistics and contain occasional spikes and missing values.
+    """
+    rng = np.random.default_rng(seed)
+    configuration = QcConfiguration()
+    parameters = sorted(
+        {
+            parameter
+            for category in configuration.categories
+            for parameter in configuration.parameters(category)
+        }
+    )
+    statistics = parameter_statistics(configuration)
+    basin_months = statistics.select("sea_basin", "month").unique().sort(pl.all())
+
+    mean_rows_per_visit = len(parameters) * len(STANDARD_DEPTHS) / 2
+    number_of_visits = math.ceil(2 * number_of_rows / mean_rows_per_visit) + 1
+    basin_month_index = rng.integers(len(basin_months), size=number_of_visits)
+    visits = pl.DataFrame(
+        {
+            "visit_key": [f"{visit:08d}" for visit in range(number_of_visits)],
+            "sea_basin": basin_months["sea_basin"].gather(basin_month_index),
+            "visit_month": basin_months["month"].gather(basin_month_index),
+            "number_of_depths": rng.integers(
+                3, len(STANDARD_DEPTHS) + 1, size=number_of_visits
+            ),
+        }
+    )
+
+    profiles = (
+        visits.with_columns(
+            pl.int_ranges(pl.col("number_of_depths")).alias("depth_index")
+        )
+        .explode("depth_index")
+        .with_columns(
+            pl.col("depth_index")
+            .replace_strict(dict(enumerate(STANDARD_DEPTHS)), return_dtype=pl.Float64)
+            .alias("DEPH")
+        )
+        .drop("number_of_depths", "depth_index")
+        .join(pl.DataFrame({"parameter": parameters}), how="cross")
+    )
+    profiles = profiles.filter(pl.Series(rng.random(len(profiles)) < 0.8)).head(
+        number_of_rows
+    )
+
+    number_of_rows = len(profiles)
+    incoming_flags = np.array(INCOMING_FLAGS)[
+        rng.integers(len(INCOMING_FLAGS), size=number_of_rows)
+    ]
+    return (
+        profiles.join(
+            statistics,
+            left_on=["parameter", "sea_basin", "visit_month"],
+            right_on=["parameter", "sea_basin", "month"],
+            how="left",
+            maintain_order="left",
+        )
+        .with_columns(
+            pl.Series("normal", rng.normal(size=number_of_rows)),
+            pl.Series("uniform", rng.random(size=number_of_rows)),
+            pl.Series("incoming_flag", incoming_flags),
+        )
+        .with_columns(
+            pl.when(pl.col("uniform") < 0.02)
+            .then(None)
+            .when(pl.col("uniform") < 0.025)
+            .then(pl.col("mean").fill_null(5.0) * 5)
+            .otherwise(
+                pl.col("mean").fill_null(5.0)
+                + pl.col("std").fill_null(2.0) * pl.col("normal")
+            )
+            .alias("value"),
+            pl.when(pl.col("uniform") > 0.9)
+            .then(pl.col("mean").fill_null(5.0) / 10)
+            .alias("LMQNT_VAL"),
+            pl.when(pl.col("uniform") > 0.5).then(0.1).alias("STD_UNCERT"),
+            pl.format(
+                "{}_{}_0_{}",
+                pl.col("incoming_flag"),
+                pl.lit("0" * len(QcField)),
+                pl.col("incoming_flag"),
+            ).alias("quality_flag_long"),
+        )
+        .drop("mean", "std", "normal", "uniform", "incoming_flag")
+    )
+
+
+def peak_memory_mb() -> float | None:
+    """Peak resident memory of the process so far."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 2**20 if platform.system() == "Darwin" else peak / 2**10
+
+
+def benchmark(number_of_rows: int, seed: int, lazy: bool) -> list[dict]:
+    """
+    Time each QC category, the ProfileView, _update_total and total_flag_info on
+    generated data.
+    """
+    data = generate_delivery(number_of_rows, seed)
+    fyskemqc = FysKemQc(data)
+    results = []
+
+    def timed(step: str, function):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            function()
+        seconds = time.perf_counter() - start
+        results.append(
+            {
+                "rows": len(data),
+                "step": step,
+                "seconds": seconds,
+                "rows_per_second": len(data) / seconds if seconds else None,
+                "peak_memory_mb": peak_memory_mb(),
+            }
+        )
+
+    def decode():
+        fyskemqc._data = decode_quality_flags(fyskemqc._data).with_columns(
+            pl.int_range(pl.len(), dtype=pl.Int64).alias("_row_id")
+        )
+
+    def build_profiles():
+        fyskemqc._profiles = ProfileView(fyskemqc._data)
+
+    def run_category(field, qc_category):
+        fyskemqc._data = fyskemqc._run_category(field, qc_category, fyskemqc._data, lazy)
+
+    def encode():
+        fyskemqc._data = encode_quality_flags(fyskemqc._data)
+
+    timed("decode_quality_flags", decode)
+    timed("ProfileView", build_profiles)
+    for field, qc_category in sorted(
+        (QcField[category.__name__.removesuffix("Qc")], category)
+        for category in QC_CATEGORIES
+    ):
+        timed(qc_category.__name__, lambda: run_category(field, qc_category))
+    timed("encode_quality_flags", encode)
+    timed("_update_total", fyskemqc._update_total)
+    timed("total_flag_info", fyskemqc.total_flag_info)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the automatic QC.")
+    parser.add_argument(
+        "--rows",
+        type=int,
+        nargs="+",
+        default=DEFAULT_NUMBER_OF_ROWS,
+        help="Number of rows in each generated delivery",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--lazy", action="store_true", help="Run categories lazily")
+    parser.add_argument("--output", type=Path, default=Path("benchmark_results.json"))
+    arguments = parser.parse_args()
+
+    results = []
+    # Each size runs in a new process so that the peak memory is per size
+    with get_context("spawn").Pool(1, maxtasksperchild=1) as pool:
+        for number_of_rows in arguments.rows:
+            print(f"benchmark {number_of_rows} rows")
+            results += pool.apply(
+                benchmark, (number_of_rows, arguments.seed, arguments.lazy)
+            )
+
+    arguments.output.write_text(
+        json.dumps(
+            {
+                "created": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "polars": pl.__version__,
+                "platform": platform.platform(),
+                "processor": platform.processor(),
+                "seed": arguments.seed,
+                "lazy": arguments.lazy,
+                "results": results,
+            },
+            indent=2,
+        )
+    )
+    for result in results:
+        print(
+            f"{result['rows']:>10} {result['step']:<25} {result['seconds']:>9.3f} s "
+            f"{result['rows_per_second'] or 0:>12.0f} rows/s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+import importlib.util
+from pathlib import Path
+
+from hatchling.builders.hooks.plugin.interface import BuildHookInterface
+
+STATISTIC_STORE_MODULE = Path("src/ocean_data_qc/fyskem/statistic_store.py")
+
+
+class CustomBuildHook(BuildHookInterface):
+    """Compile the statistics store that is included as a build artifact."""
+
+    def initialize(self, version, build_data):
+        # The module is loaded from its file so that the package and its runtime
+        # dependencies other than polars are not needed when building
+        spec = importlib.util.spec_from_file_location(
+            "statistic_store", Path(self.root) / STATISTIC_STORE_MODULE
+        )
+        statistic_store = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(statistic_store)
+        statistic_store.compile_statistics()
@@ -1,76 +1,165 @@
 import abc
+from typing import Iterable
 
 import polars as pl
 
+from ocean_data_qc.fyskem.deferred_info import FLAG_COLUMN, REASON_COLUMN, DeferredInfo
+from ocean_data_qc.fyskem.profile_view import ProfileView
+from ocean_data_qc.fyskem.qc_checks import threshold_table
 from ocean_data_qc.fyskem.qc_flag import QcFlag
+from ocean_data_qc.fyskem.qc_flag_expressions import (
+    FLAG_CODES,
+    code_column,
+    decode_quality_flags,
+    encode_quality_flags,
+    flag_code,
+)
+from ocean_data_qc.fyskem.qc_flag_tuple import QcField
 from ocean_data_qc.fyskem.qc_flags import QcFlags
 
 
 class BaseQcCategory(abc.ABC):
-    def __init__(self, data: pl.DataFrame, field_position: int, column_name: str):
+    # Automatic flags, besides its own, that the category reads
+    reads_automatic_flags: tuple[QcField, ...] = ()
+    # Whether the checks read the sorted profiles, see ProfileView
+    uses_profiles: bool = False
+
+    def __init__(
+        self,
+        data: pl.DataFrame | pl.LazyFrame,
+        field_position: int,
+        column_name: str,
+        profiles: ProfileView | None = None,
+    ):
+        # With a LazyFrame all checks are added to one query plan per category which
+        # is collected once in collapse_qc_columns()
+        self._lazy = isinstance(data, pl.LazyFrame)
         self._data = data
         # Ensure we have a stable row identifier
-        if "_row_id" not in data.columns:
-            self._data = data.with_columns(pl.arange(0, data.height).alias("_row_id"))
+        if not self._has_column("_row_id"):
+            self._data = self._data.with_columns(
+                pl.int_range(pl.len(), dtype=pl.Int64).alias("_row_id")
+            )
         self._field_position = field_position
         self._column_name = column_name
         self._info_column_name = f"info_{column_name}"
+        self._code_column_name = code_column(QcField(field_position))
+        self._owns_flag_codes = False
+        self._pending_updates = []
+        self._profiles = profiles
+        # With deferred info the info expressions of the checks are collected here
+        # and the results keep a reason code instead of the text, see defer_info()
+        self._info_texts = None
+        self._info_start = 0
+        self._pending_info = []
+        self.deferred_info = DeferredInfo()
 
     @abc.abstractmethod
     def check(self, parameter: str, configuration): ...
 
+    def defer_info(self):
+        """
+        Keep a reason code and the columns read by the info text for each checked row
+        in deferred_info instead of the info text. No info column is added.
+        """
+        self._info_texts = []
+
+    def _result(self, flag: pl.Expr, info: pl.Expr) -> pl.Expr:
+        """
+        The flag and info of a branch of the flagging logic. With deferred info the
+        info is the index of the info expression.
+        """
+        if self._info_texts is None:
+            return pl.struct(flag.alias("flag"), info.alias("info"))
+        self._info_texts.append(info)
+        return pl.struct(
+            flag.alias("flag"),
+            pl.lit(len(self._info_texts) - 1, dtype=pl.UInt16).alias("info"),
+        )
+
+    def check_parameters(self, configurations: dict):
+        """
+        Check all parameters in configurations, a dict of checks keyed by parameter.
+        Categories that compile the checks to a threshold table check all parameters
+        in one query, the others check one parameter at a time.
+        """
+        for parameter, configuration in configurations.items():
+            self.check(parameter, configuration)
+
+    @staticmethod
+    def _join_thresholds(
+        selection: pl.DataFrame | pl.LazyFrame, configurations: dict
+    ) -> pl.DataFrame | pl.LazyFrame:
+        """Add the thresholds of the parameter to each row, see threshold_table."""
+        thresholds = threshold_table(configurations)
+        if isinstance(selection, pl.LazyFrame):
+            thresholds = thresholds.lazy()
+        return selection.join(
+            thresholds, on="parameter", how="inner", maintain_order="left"
+        )
+
+    def _has_column(self, column: str) -> bool:
+        return column in self._data.collect_schema().names()
+
+    def _is_empty(self, frame: pl.DataFrame | pl.LazyFrame) -> bool:
+        """
+        Early exit test for selections. A lazy selection is never treated as empty
+        since that would require collecting it, an empty selection gives no updates.
+        """
+        if isinstance(frame, pl.LazyFrame):
+            return False
+        return frame.is_empty()
+
+    @property
+    def profiles(self) -> ProfileView:
+        """The sorted profiles of the data, built on first use if not given."""
+        if self._profiles is None:
+            self._profiles = ProfileView(self._data)
+        return self._profiles
+
+    def _profile_selection(
+        self, parameters: Iterable[str]
+    ) -> pl.DataFrame | pl.LazyFrame:
+        """The sorted profiles of the parameters, lazy if the category is lazy."""
+        selection = self.profiles.parameters(parameters)
+        return selection.lazy() if self._lazy else selection
+
     def expand_qc_columns(self):
         # Add minimal quality flags if missing
-        if "quality_flag_long" not in self._data.columns:
+        if not self._has_column("quality_flag_long"):
             self._data = self._data.with_columns(
                 pl.lit(str(QcFlags())).alias("quality_flag_long")
             )
 
-        # Split QC flags to separate columns for incoming, auto and manual
-        if not self._data.is_empty():
-            flags = pl.col("quality_flag_long").str.split("_")
-            self._data = self._data.with_columns(
-                [
-                    flags.list.get(0).alias("INCOMING_QC"),
-                    flags.list.get(1).alias("AUTO_QC"),
-                    flags.list.get(2).alias("MANUAL_QC"),
-                    flags.list.get(3).alias("TOTAL_QC"),
-                ]
-            )
+        # Split QC flags to separate columns for incoming, auto and manual and keep the
+        # automatic flags as integer codes. If the codes are already present (when run
+        # from FysKemQc) they are left to the owner to encode.
+        if not self._has_column(self._code_column_name):
+            self._data = decode_quality_flags(self._data)
+            self._owns_flag_codes = True
 
         # Add a column for the specific category
         self._data = self._data.with_columns(
-            [
-                pl.lit(str(QcFlag.NO_QUALITY_CONTROL.value)).alias(self._column_name),
-                pl.lit(str(QcFlag.NO_QUALITY_CONTROL)).alias(self._info_column_name),
-            ]
+            pl.lit(FLAG_CODES[QcFlag.NO_QUALITY_CONTROL.value], dtype=pl.UInt8).alias(
+                self._column_name
+            )
         )
+        if self._info_texts is None:
+            self._data = self._data.with_columns(
+                pl.lit(str(QcFlag.NO_QUALITY_CONTROL)).alias(self._info_column_name)
+            )
 
     def collapse_qc_columns(self):
-        # Insert the specific QC flag into the correct position in AUTO_QC
-        self._data = self._data.with_columns(
-            (
-                pl.col("AUTO_QC").str.slice(0, self._field_position)
-                + pl.col(self._column_name)
-                + pl.col("AUTO_QC").str.slice(self._field_position + 1)
-            ).alias("AUTO_QC")
-        )
+        self._apply_pending_updates()
 
-        # Drop the temporary QC column
-        self._data = self._data.drop(self._column_name)
-
-        # Recreate quality_flag_long from the four parts
+        # Store the specific QC flag code and drop the temporary QC column
         self._data = self._data.with_columns(
-            (
-                pl.col("INCOMING_QC")
-                + "_"
-                + pl.col("AUTO_QC")
-                + "_"
-                + pl.col("MANUAL_QC")
-                + "_"
-                + pl.col("TOTAL_QC")
-            ).alias("quality_flag_long")
-        )
+            pl.col(self._column_name).alias(self._code_column_name)
+        ).drop(self._column_name)
+
+        # Recreate AUTO_QC and quality_flag_long from the codes
+        if self._owns_flag_codes:
+            self._data = encode_quality_flags(self._data)
 
     def update_dataframe(self, selection, result_expr):
         # Add the QC results to the selection
@@ -78,7 +167,9 @@ class BaseQcCategory(abc.ABC):
             selection.with_columns([result_expr.alias("result_struct")])
             .with_columns(
                 [
-                    pl.col("result_struct").struct.field("flag").alias(self._column_name),
+                    flag_code(pl.col("result_struct").struct.field("flag")).alias(
+                        self._column_name
+                    ),
                     pl.col("result_struct")
                     .struct.field("info")
                     .alias(self._info_column_name),
@@ -87,16 +178,95 @@ class BaseQcCategory(abc.ABC):
             .drop("result_struct")
         )
 
+        if self._info_texts is not None:
+            # Keep the reason codes and the columns read by the info expressions of
+            # this check
+            texts = dict(
+                enumerate(self._info_texts[self._info_start :], self._info_start)
+            )
+            self._info_start = len(self._info_texts)
+            operands = sorted(
+                {column for text in texts.values() for column in text.meta.root_names()}
+            )
+            self._pending_info.append(
+                (
+                    selection.select(
+                        "_row_id",
+                        pl.col(self._column_name).alias(FLAG_COLUMN),
+                        pl.col(self._info_column_name).alias(REASON_COLUMN),
+                        *operands,
+                    ).filter(pl.col(REASON_COLUMN).is_not_null()),
+                    texts,
+                )
+            )
+
         # Collect that data that should be updated in the original dataframe
         # only the two update_cols should be updated
         # (total flag is updated after all checks)
-        update_cols = [self._column_name, self._info_column_name]
+        update_cols = [self._column_name]
+        if self._info_texts is None:
+            update_cols.append(self._info_column_name)
         update_df = selection.select(["_row_id", *update_cols])
 
-        self._data = self._data.join(
-            update_df, on="_row_id", how="left", suffix="_update"
+        # Updates from all parameters are applied together when collapsing
+        self._pending_updates.append(update_df)
+
+    def _apply_pending_updates(self):
+        """
+        Apply the results of all checks in the category in one go.
+
+        When _row_id is the row position the results are scattered directly into the
+        category columns, otherwise they are joined on _row_id.
+        """
+        pending_updates, self._pending_updates = self._pending_updates, []
+        updates = pl.concat(pending_updates) if pending_updates else None
+        pending_info, self._pending_info = self._pending_info, []
+        info_operands = [operands for operands, _ in pending_info]
+
+        if self._lazy:
+            if updates is None:
+                self._data = self._data.collect()
+            else:
+                # Collecting data and updates together lets polars share their plan
+                self._data, updates, *info_operands = pl.collect_all(
+                    [self._data, updates, *info_operands]
+                )
+            self._lazy = False
+
+        for operands, (_, texts) in zip(info_operands, pending_info):
+            self.deferred_info.add(operands, texts)
+
+        if updates is None or updates.is_empty():
+            return
+
+        if self._row_id_is_position():
+            self._scatter_updates(updates)
+        else:
+            self._join_updates(updates)
+
+    def _row_id_is_position(self) -> bool:
+        row_id = self._data["_row_id"]
+        return row_id.null_count() == 0 and row_id.equals(
+            pl.int_range(0, len(row_id), dtype=row_id.dtype, eager=True),
+            check_names=False,
         )
 
+    def _scatter_updates(self, updates: pl.DataFrame):
+        # Scattering into string columns requires sorted indices
+        updates = updates.sort("_row_id")
+        columns = []
+        for col in (column for column in updates.columns if column != "_row_id"):
+            # Replace values only where new data exists
+            values = updates.filter(pl.col(col).is_not_null())
+            if values.is_empty():
+                continue
+            columns.append(self._data[col].scatter(values["_row_id"], values[col]))
+        self._data = self._data.with_columns(columns)
+
+    def _join_updates(self, updates: pl.DataFrame):
+        update_cols = [column for column in updates.columns if column != "_row_id"]
+        self._data = self._data.join(updates, on="_row_id", how="left", suffix="_update")
+
         # Replace columns only where new data exists
         for col in update_cols:
             self._data = self._data.with_columns(
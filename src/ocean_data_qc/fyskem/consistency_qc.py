@@ -11,6 +11,121 @@ class ConsistencyQc(BaseQcCategory):
         super().__init__(data, QcField.Consistency, f"AUTO_QC_{QcField.Consistency.name}")
 
     def check(self, parameter: str, configuration: ConsistencyCheck):
+        self.check_parameters({parameter: configuration})
+
+    def check_parameters(self, configurations: dict[str, ConsistencyCheck]):
+        """
+        The values of all parameters in the parameter sets are aggregated per
+        visit_key and DEPH to one wide table in a single pass, which all checks read.
+        """
+        if not self._has_column("STD_UNCERT"):
+            self._data = self._data.with_columns(
+                pl.lit(None).cast(pl.Float64).alias("STD_UNCERT")
+            )
+        parameter_sets = {
+            tuple(parameter_list)
+            for configuration in configurations.values()
+            for parameter_list in configuration.parameter_sets
+        }
+        summations = self._summation_table(parameter_sets)
+        for parameter, configuration in configurations.items():
+            self._check_parameter(parameter, configuration, summations)
+
+    def _summation_table(
+        self, parameter_sets: set[tuple[str, ...]]
+    ) -> pl.DataFrame | pl.LazyFrame:
+        """
+        One row per visit_key and DEPH with the sum of the values, the sum of the
+        squared uncertainties, whether all uncertainties are given and the number of
+        values of each parameter, and the parameters of the values of each parameter
+        set in the order of the data.
+        """
+        parameters = {
+            parameter for parameter_set in parameter_sets for parameter in parameter_set
+        }
+        aggregations = []
+        for parameter in sorted(parameters):
+            is_parameter = pl.col("parameter") == parameter
+            aggregations += [
+                pl.col("value").filter(is_parameter).sum().alias(f"{parameter}:sum"),
+                (pl.col("STD_UNCERT").filter(is_parameter) ** 2)
+                .sum()
+                .alias(f"{parameter}:variance"),
+                pl.col("STD_UNCERT")
+                .filter(is_parameter)
+                .is_not_null()
+                .all()
+                .alias(f"{parameter}:uncertain"),
+                is_parameter.sum().alias(f"{parameter}:count"),
+            ]
+        for parameter_set in sorted(parameter_sets):
+            aggregations.append(
+                pl.col("parameter")
+                .filter(pl.col("parameter").is_in(parameter_set))
+                .alias(ConsistencyQc._parameters_column(parameter_set))
+            )
+        return (
+            self._data.filter(
+                pl.col("parameter").is_in(sorted(parameters))
+                & pl.col("value").is_not_null()
+                & (pl.col("INCOMING_QC") != QcFlag.BAD_VALUE.value)
+                & (
+                    pl.col("INCOMING_QC")
+                    != QcFlag.VALUE_BELOW_LIMIT_OF_QUANTIFICATION.value
+                )
+            )
+            .group_by(["visit_key", "DEPH"])
+            .agg(aggregations)
+        )
+
+    @staticmethod
+    def _parameters_column(parameter_set: tuple[str, ...]) -> str:
+        return f"{'|'.join(parameter_set)}:parameters"
+
+    @staticmethod
+    def _parameter_set_summation(
+        parameter_list: list[str], use_uncertainty: bool
+    ) -> tuple[dict[str, pl.Expr], pl.Expr]:
+        """
+        Summation of a parameter set from the summation table and whether any of the
+        parameters in the set have a value.
+        """
+        present = {
+            parameter: pl.col(f"{parameter}:count") > 0 for parameter in parameter_list
+        }
+        any_present = pl.any_horizontal(present.values())
+
+        # The parameters of all values in the order of the data, a parameter with
+        # several values at a depth is listed once per value
+        ordered_parameters = pl.col(
+            ConsistencyQc._parameters_column(tuple(parameter_list))
+        ).list.join(", ")
+        all_uncertain = pl.all_horizontal(
+            ~is_present | pl.col(f"{parameter}:uncertain")
+            for parameter, is_present in present.items()
+        )
+        return {
+            "summation": pl.sum_horizontal(
+                pl.col(f"{parameter}:sum") for parameter in parameter_list
+            ),
+            "summation_variance": pl.when(all_uncertain & use_uncertainty).then(
+                pl.sum_horizontal(
+                    pl.col(f"{parameter}:variance") for parameter in parameter_list
+                )
+            ),
+            "summation_parameters": ordered_parameters,
+            "n_parameters": pl.sum_horizontal(
+                pl.col(f"{parameter}:count") for parameter in parameter_list
+            ).cast(pl.UInt32),
+            "n_parameters_expected": pl.lit(len(parameter_list), dtype=pl.Int32),
+        }, any_present
+
+    def _check_parameter(
+        self,
+        parameter: str,
+        configuration: ConsistencyCheck,
+        summations: pl.DataFrame | pl.LazyFrame,
+    ):
         """
         This check is applied on the difference between
         the parameter value and the sum of the values in parameter list.
@@ -26,11 +141,6 @@ class ConsistencyQc(BaseQcCategory):
         upper_limit = (
             configuration.upper_limit if configuration.upper_limit != "None" else None
         )
-        if "STD_UNCERT" not in self._data.columns:
-            self._data = self._data.with_columns(
-                pl.lit(None).cast(pl.Float64).alias("STD_UNCERT")
-            )
-
         self._parameter = parameter
 
         parameter_boolean = (
@@ -41,114 +151,41 @@ class ConsistencyQc(BaseQcCategory):
         )
 
         # Early exit if nothing matches
-        if self._data.filter(parameter_boolean).is_empty():
+        if self._is_empty(self._data.filter(parameter_boolean)):
             return
 
-        summation = None
         # Propagated uncertainty will not be calculated for parameters in:
         # ["NTRZ"]
         use_uncertainty = parameter not in ["NTRZ"]
-        for idx, parameter_list in enumerate(configuration.parameter_sets):
-            df = (
-                self._data.filter(
-                    pl.col("parameter").is_in(parameter_list)
-                    & pl.col("value").is_not_null()
-                    & (pl.col("INCOMING_QC") != QcFlag.BAD_VALUE.value)
-                    & (
-                        pl.col("INCOMING_QC")
-                        != QcFlag.VALUE_BELOW_LIMIT_OF_QUANTIFICATION.value
-                    )
-                )
-                .group_by(["visit_key", "DEPH"])
-                .agg(
-                    pl.col("value").sum().alias("summation_tmp"),
-                    pl.when(pl.col("STD_UNCERT").is_not_null().all() & use_uncertainty)
-                    .then((pl.col("STD_UNCERT") ** 2).sum())
-                    .otherwise(None)
-                    .alias("summation_variance_tmp"),
-                    pl.concat_str("parameter", separator=", ").alias(
-                        "summation_parameters_tmp"
-                    ),
-                    pl.col("parameter").count().alias("n_parameters_tmp"),
-                    pl.lit(len(parameter_list)).alias("n_parameters_expected_tmp"),
-                )
-            ).select(
-                [
-                    "visit_key",
-                    "DEPH",
-                    "summation_tmp",
-                    "summation_variance_tmp",
-                    "summation_parameters_tmp",
-                    "n_parameters_tmp",
-                    "n_parameters_expected_tmp",
-                ]
-            )
 
+        # The parameter set with the largest summation is used. A visit and depth
+        # without any value in the first parameter set has no summation.
+        summation = None
+        for parameter_list in configuration.parameter_sets:
+            set_summation, set_present = self._parameter_set_summation(
+                parameter_list, use_uncertainty
+            )
+            set_summation = {
+                name: pl.when(set_present).then(expr)
+                for name, expr in set_summation.items()
+            }
             if summation is None:
-                summation = df.rename(
-                    {
-                        "summation_tmp": "summation",
-                        "summation_variance_tmp": "summation_variance",
-                        "summation_parameters_tmp": "summation_parameters",
-                        "n_parameters_tmp": "n_parameters",
-                        "n_parameters_expected_tmp": "n_parameters_expected",
-                    }
-                )
-            else:
-                summation = (
-                    summation.join(df, on=["visit_key", "DEPH"], how="left")
-                    .with_columns(
-                        pl.when(pl.col("summation").is_null())
-                        .then(pl.col("summation_tmp"))
-                        .when(pl.col("summation_tmp") > pl.col("summation"))
-                        .then(pl.col("summation_tmp"))
-                        .otherwise(pl.col("summation"))
-                        .alias("summation"),
-                        pl.when(pl.col("summation").is_null())
-                        .then(pl.col("summation_variance_tmp"))
-                        .when(pl.col("summation_tmp") > pl.col("summation"))
-                        .then(pl.col("summation_variance_tmp"))
-                        .otherwise(pl.col("summation_variance"))
-                        .alias("summation_variance"),
-                        pl.when(pl.col("summation").is_null())
-                        .then(pl.col("summation_parameters_tmp"))
-                        .when(pl.col("summation_tmp") > pl.col("summation"))
-                        .then(pl.col("summation_parameters_tmp"))
-                        .otherwise(pl.col("summation_parameters"))
-                        .alias("summation_parameters"),
-                        pl.when(pl.col("summation").is_null())
-                        .then(pl.col("n_parameters_tmp"))
-                        .when(pl.col("summation_tmp") > pl.col("summation"))
-                        .then(pl.col("n_parameters_tmp"))
-                        .otherwise(pl.col("n_parameters"))
-                        .alias("n_parameters"),
-                        pl.when(pl.col("summation").is_null())
-                        .then(pl.col("n_parameters_expected_tmp"))
-                        .when(pl.col("summation_tmp") > pl.col("summation"))
-                        .then(pl.col("n_parameters_expected_tmp"))
-                        .otherwise(pl.col("n_parameters_expected"))
-                        .alias("n_parameters_expected"),
-                    )
-                    .select(
-                        [
-                            "visit_key",
-                            "DEPH",
-                            "summation",
-                            "summation_variance",
-                            "summation_parameters",
-                            "n_parameters",
-                            "n_parameters_expected",
-                        ]
-                    )
-                )
+                summation = set_summation
+                first_present = set_present
+                continue
+            use_set = summation["summation"].is_null() | (
+                set_summation["summation"] > summation["summation"]
+            )
+            summation = {
+                name: pl.when(use_set).then(set_summation[name]).otherwise(expr)
+                for name, expr in summation.items()
+            }
+        summation = [
+            pl.when(first_present).then(expr).alias(name)
+            for name, expr in summation.items()
+        ]
 
-        # summation_parameters has dtype list[str],
-        # must be converted to str to function in pl.format
-        summation = summation.with_columns(
-            pl.when(pl.col("summation_parameters").is_not_null())
-            .then(pl.col("summation_parameters").map_elements(lambda x: ", ".join(x)))
-            .otherwise(None)
-            .alias("summation_parameters"),
+        summation = summations.select(["visit_key", "DEPH", *summation]).with_columns(
             pl.when(
                 (pl.lit(self._parameter) == "NTRZ")
                 & (pl.col("n_parameters") == pl.col("n_parameters_expected"))
@@ -216,14 +253,12 @@ class ConsistencyQc(BaseQcCategory):
         result_expr = (
             pl.when(pl.col("summation").is_null())
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.NO_QUALITY_CONTROL.value)).alias("flag"),
-                        pl.format(
-                            "NO_QC_PERFORMED: {} not available",
-                            pl.col("summation_parameters"),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.NO_QUALITY_CONTROL.value)),
+                    pl.format(
+                        "NO_QC_PERFORMED: {} not available",
+                        pl.col("summation_parameters"),
+                    ),
                 )
             )
             # GOOD: within 2 sigma (from deliverer, 95% of normal distribution)
@@ -234,20 +269,18 @@ class ConsistencyQc(BaseQcCategory):
                 & (pl.col("difference") <= 2 * pl.col("uncertainty_difference"))
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.GOOD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "GOOD: difference {}-{} {} - {} = {} is within {}-{}",
-                            pl.lit(self._parameter),
-                            pl.col("summation_parameters"),
-                            pl.col("value"),
-                            pl.col("summation").round(3),
-                            pl.col("difference").round(3),
-                            -2 * pl.col("uncertainty_difference").round(3),
-                            2 * pl.col("uncertainty_difference").round(3),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.GOOD_VALUE.value)),
+                    pl.format(
+                        "GOOD: difference {}-{} {} - {} = {} is within {}-{}",
+                        pl.lit(self._parameter),
+                        pl.col("summation_parameters"),
+                        pl.col("value"),
+                        pl.col("summation").round(3),
+                        pl.col("difference").round(3),
+                        -2 * pl.col("uncertainty_difference").round(3),
+                        2 * pl.col("uncertainty_difference").round(3),
+                    ),
                 )
             )
             # GOOD: between -2 sigma from deliverer and upper_limit
@@ -258,20 +291,18 @@ class ConsistencyQc(BaseQcCategory):
                 & (pl.col("difference") <= pl.col("upper_limit"))
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.GOOD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "GOOD: difference {}-{} {} - {} = {} is within {}-{}",
-                            pl.lit(self._parameter),
-                            pl.col("summation_parameters"),
-                            pl.col("value"),
-                            pl.col("summation").round(3),
-                            pl.col("difference").round(3),
-                            -2 * pl.col("uncertainty_difference").round(3),
-                            pl.col("upper_limit"),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.GOOD_VALUE.value)),
+                    pl.format(
+                        "GOOD: difference {}-{} {} - {} = {} is within {}-{}",
+                        pl.lit(self._parameter),
+                        pl.col("summation_parameters"),
+                        pl.col("value"),
+                        pl.col("summation").round(3),
+                        pl.col("difference").round(3),
+                        -2 * pl.col("uncertainty_difference").round(3),
+                        pl.col("upper_limit"),
+                    ),
                 )
             )
             # GOOD: between -2 sigma and 2 sigma from default configuration
@@ -282,20 +313,18 @@ class ConsistencyQc(BaseQcCategory):
                 & (pl.col("difference") <= 2 * configuration.sigma)
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.GOOD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "GOOD: difference {}-{} {} - {} = {} is within {}-{}",
-                            pl.lit(self._parameter),
-                            pl.col("summation_parameters"),
-                            pl.col("value"),
-                            pl.col("summation").round(3),
-                            pl.col("difference").round(3),
-                            -2 * configuration.sigma,
-                            2 * configuration.sigma,
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.GOOD_VALUE.value)),
+                    pl.format(
+                        "GOOD: difference {}-{} {} - {} = {} is within {}-{}",
+                        pl.lit(self._parameter),
+                        pl.col("summation_parameters"),
+                        pl.col("value"),
+                        pl.col("summation").round(3),
+                        pl.col("difference").round(3),
+                        -2 * configuration.sigma,
+                        2 * configuration.sigma,
+                    ),
                 )
             )
             # GOOD: between -2 sigma and upper limit from default configuration
@@ -306,20 +335,18 @@ class ConsistencyQc(BaseQcCategory):
                 & (pl.col("difference") <= pl.col("upper_limit"))
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.GOOD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "GOOD: difference {}-{} {} - {} = {} is within {}-{}",
-                            pl.lit(self._parameter),
-                            pl.col("summation_parameters"),
-                            pl.col("value"),
-                            pl.col("summation").round(3),
-                            pl.col("difference").round(3),
-                            -2 * configuration.sigma,
-                            pl.col("upper_limit"),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.GOOD_VALUE.value)),
+                    pl.format(
+                        "GOOD: difference {}-{} {} - {} = {} is within {}-{}",
+                        pl.lit(self._parameter),
+                        pl.col("summation_parameters"),
+                        pl.col("value"),
+                        pl.col("summation").round(3),
+                        pl.col("difference").round(3),
+                        -2 * configuration.sigma,
+                        pl.col("upper_limit"),
+                    ),
                 )
             )
             # Probably bad value, between 2 and 3 sigma from deliverer
@@ -338,23 +365,21 @@ class ConsistencyQc(BaseQcCategory):
                 )
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.PROBABLY_BAD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "Probably bad: difference {}-{} {} - {} = {} "
-                            "is within {}-{} or {}-{}",
-                            pl.lit(self._parameter),
-                            pl.col("summation_parameters"),
-                            pl.col("value"),
-                            pl.col("summation").round(3),
-                            pl.col("difference").round(3),
-                            -3 * pl.col("uncertainty_difference").round(3),
-                            -2 * pl.col("uncertainty_difference").round(3),
-                            2 * pl.col("uncertainty_difference").round(3),
-                            3 * pl.col("uncertainty_difference").round(3),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.PROBABLY_BAD_VALUE.value)),
+                    pl.format(
+                        "Probably bad: difference {}-{} {} - {} = {} "
+                        "is within {}-{} or {}-{}",
+                        pl.lit(self._parameter),
+                        pl.col("summation_parameters"),
+                        pl.col("value"),
+                        pl.col("summation").round(3),
+                        pl.col("difference").round(3),
+                        -3 * pl.col("uncertainty_difference").round(3),
+                        -2 * pl.col("uncertainty_difference").round(3),
+                        2 * pl.col("uncertainty_difference").round(3),
+                        3 * pl.col("uncertainty_difference").round(3),
+                    ),
                 )
             )
             # Probably bad value, between -2 and -3 sigma from deliverer,
@@ -368,20 +393,18 @@ class ConsistencyQc(BaseQcCategory):
                 )
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.PROBABLY_BAD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "Probably bad: difference {}-{} {} - {} = {} is within {}-{}",
-                            pl.lit(self._parameter),
-                            pl.col("summation_parameters"),
-                            pl.col("value"),
-                            pl.col("summation").round(3),
-                            pl.col("difference").round(3),
-                            -3 * pl.col("uncertainty_difference").round(3),
-                            -2 * pl.col("uncertainty_difference").round(3),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.PROBABLY_BAD_VALUE.value)),
+                    pl.format(
+                        "Probably bad: difference {}-{} {} - {} = {} is within {}-{}",
+                        pl.lit(self._parameter),
+                        pl.col("summation_parameters"),
+                        pl.col("value"),
+                        pl.col("summation").round(3),
+                        pl.col("difference").round(3),
+                        -3 * pl.col("uncertainty_difference").round(3),
+                        -2 * pl.col("uncertainty_difference").round(3),
+                    ),
                 )
             )
             # Probably bad value, between 2 and 3 sigma from default configuration
@@ -400,23 +423,21 @@ class ConsistencyQc(BaseQcCategory):
                 )
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.PROBABLY_BAD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "Probably bad: difference {}-{} {} - {} = {} "
-                            "is within {}-{} or {}-{}",
-                            pl.lit(self._parameter),
-                            pl.col("summation_parameters"),
-                            pl.col("value"),
-                            pl.col("summation").round(3),
-                            pl.col("difference").round(3),
-                            -3 * configuration.sigma,
-                            -2 * configuration.sigma,
-                            2 * configuration.sigma,
-                            3 * configuration.sigma,
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.PROBABLY_BAD_VALUE.value)),
+                    pl.format(
+                        "Probably bad: difference {}-{} {} - {} = {} "
+                        "is within {}-{} or {}-{}",
+                        pl.lit(self._parameter),
+                        pl.col("summation_parameters"),
+                        pl.col("value"),
+                        pl.col("summation").round(3),
+                        pl.col("difference").round(3),
+                        -3 * configuration.sigma,
+                        -2 * configuration.sigma,
+                        2 * configuration.sigma,
+                        3 * configuration.sigma,
+                    ),
                 )
             )
             # Probably bad value, between -2 and -3 sigma from default configuration,
@@ -430,20 +451,18 @@ class ConsistencyQc(BaseQcCategory):
                 )
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.PROBABLY_BAD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "Probably bad: difference {}-{} {} - {} = {} is within {}-{}",
-                            pl.lit(self._parameter),
-                            pl.col("summation_parameters"),
-                            pl.col("value"),
-                            pl.col("summation").round(3),
-                            pl.col("difference").round(3),
-                            -3 * configuration.sigma,
-                            -2 * configuration.sigma,
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.PROBABLY_BAD_VALUE.value)),
+                    pl.format(
+                        "Probably bad: difference {}-{} {} - {} = {} is within {}-{}",
+                        pl.lit(self._parameter),
+                        pl.col("summation_parameters"),
+                        pl.col("value"),
+                        pl.col("summation").round(3),
+                        pl.col("difference").round(3),
+                        -3 * configuration.sigma,
+                        -2 * configuration.sigma,
+                    ),
                 )
             )
             # Bad value, below -3 sigma or above 3 sigma from deliverer
@@ -456,20 +475,18 @@ class ConsistencyQc(BaseQcCategory):
                 )
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.BAD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "BAD: difference {}-{} {} - {} = {} is < {} or > {}",
-                            pl.lit(self._parameter),
-                            pl.col("summation_parameters"),
-                            pl.col("value"),
-                            pl.col("summation").round(3),
-                            pl.col("difference").round(3),
-                            -3 * pl.col("uncertainty_difference").round(3),
-                            3 * pl.col("uncertainty_difference").round(3),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.BAD_VALUE.value)),
+                    pl.format(
+                        "BAD: difference {}-{} {} - {} = {} is < {} or > {}",
+                        pl.lit(self._parameter),
+                        pl.col("summation_parameters"),
+                        pl.col("value"),
+                        pl.col("summation").round(3),
+                        pl.col("difference").round(3),
+                        -3 * pl.col("uncertainty_difference").round(3),
+                        3 * pl.col("uncertainty_difference").round(3),
+                    ),
                 )
             )
             # Bad value, below -3 sigma from deliverer or above upper limit
@@ -482,20 +499,18 @@ class ConsistencyQc(BaseQcCategory):
                 )
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.BAD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "BAD: difference {}-{} {} - {} = {} is < {} or > {}",
-                            pl.lit(self._parameter),
-                            pl.col("summation_parameters"),
-                            pl.col("value"),
-                            pl.col("summation").round(3),
-                            pl.col("difference").round(3),
-                            -3 * pl.col("uncertainty_difference").round(3),
-                            pl.col("upper_limit"),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.BAD_VALUE.value)),
+                    pl.format(
+                        "BAD: difference {}-{} {} - {} = {} is < {} or > {}",
+                        pl.lit(self._parameter),
+                        pl.col("summation_parameters"),
+                        pl.col("value"),
+                        pl.col("summation").round(3),
+                        pl.col("difference").round(3),
+                        -3 * pl.col("uncertainty_difference").round(3),
+                        pl.col("upper_limit"),
+                    ),
                 )
             )
             # Bad value, below -3 sigma or above 3 sigma from default configuration
@@ -508,20 +523,18 @@ class ConsistencyQc(BaseQcCategory):
                 )
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.BAD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "BAD: difference {}-{} {} - {} = {} is < {} or > {}",
-                            pl.lit(self._parameter),
-                            pl.col("summation_parameters"),
-                            pl.col("value"),
-                            pl.col("summation").round(3),
-                            pl.col("difference").round(3),
-                            -3 * configuration.sigma,
-                            3 * configuration.sigma,
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.BAD_VALUE.value)),
+                    pl.format(
+                        "BAD: difference {}-{} {} - {} = {} is < {} or > {}",
+                        pl.lit(self._parameter),
+                        pl.col("summation_parameters"),
+                        pl.col("value"),
+                        pl.col("summation").round(3),
+                        pl.col("difference").round(3),
+                        -3 * configuration.sigma,
+                        3 * configuration.sigma,
+                    ),
                 )
             )
             # Bad value, below -3 sigma from default configuration or above upper limit
@@ -534,36 +547,32 @@ class ConsistencyQc(BaseQcCategory):
                 )
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.BAD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "BAD: difference {}-{} {} - {} = {} is < {} or > {}",
-                            pl.lit(self._parameter),
-                            pl.col("summation_parameters"),
-                            pl.col("value"),
-                            pl.col("summation").round(3),
-                            pl.col("difference").round(3),
-                            -3 * configuration.sigma,
-                            pl.col("upper_limit"),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.BAD_VALUE.value)),
+                    pl.format(
+                        "BAD: difference {}-{} {} - {} = {} is < {} or > {}",
+                        pl.lit(self._parameter),
+                        pl.col("summation_parameters"),
+                        pl.col("value"),
+                        pl.col("summation").round(3),
+                        pl.col("difference").round(3),
+                        -3 * configuration.sigma,
+                        pl.col("upper_limit"),
+                    ),
                 )
             )
             # BAD: anything else
             .otherwise(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.BAD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "BAD: unexpected difference {}-{} {} - {} = {} ",
-                            pl.lit(self._parameter),
-                            pl.col("summation_parameters"),
-                            pl.col("value"),
-                            pl.col("summation").round(3),
-                            pl.col("difference").round(3),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.BAD_VALUE.value)),
+                    pl.format(
+                        "BAD: unexpected difference {}-{} {} - {} = {} ",
+                        pl.lit(self._parameter),
+                        pl.col("summation_parameters"),
+                        pl.col("value"),
+                        pl.col("summation").round(3),
+                        pl.col("difference").round(3),
+                    ),
                 )
             )
         )
@@ -0,0 +1,47 @@
+import polars as pl
+
+from ocean_data_qc.fyskem.qc_flag import QcFlag
+from ocean_data_qc.fyskem.qc_flag_codec import FLAG_CODES
+
+# Columns of the operand tables besides the operands of the info texts
+FLAG_COLUMN = "_info_flag"
+REASON_COLUMN = "_info_reason"
+
+
+class DeferredInfo:
+    """
+    The info texts of a QC category kept as a reason code per checked row, the index
+    of the info expression of the branch that gave the flag, and the columns the
+    expressions read. The texts are rendered when asked for.
+    """
+
+    def __init__(self):
+        self._parts: list[tuple[pl.DataFrame, dict[int, pl.Expr]]] = []
+
+    def __bool__(self) -> bool:
+        return bool(self._parts)
+
+    def add(self, operands: pl.DataFrame, texts: dict[int, pl.Expr]):
+        """
+        Add the operands of checked rows: _row_id, the flag code, the reason code and
+        the columns read by texts, the info expressions keyed by reason code.
+        """
+        self._parts.append((operands, texts))
+
+    def render(self, flagged_only: bool = False) -> pl.DataFrame:
+        """
+        Return _row_id and info of the checked rows. A row checked more than once gets
+        the text of the last check. With flagged_only rows flagged as good are left out.
+        """
+        good_code = FLAG_CODES[QcFlag.GOOD_VALUE.value]
+        rendered = []
+        for operands, texts in self._parts:
+            if flagged_only:
+                operands = operands.filter(pl.col(FLAG_COLUMN) != good_code)
+            info = pl.lit(None, dtype=pl.Utf8)
+            for reason, text in texts.items():
+                info = pl.when(pl.col(REASON_COLUMN) == reason).then(text).otherwise(info)
+            rendered.append(operands.select("_row_id", info.alias("info")))
+        if not rendered:
+            return pl.DataFrame(schema={"_row_id": pl.Int64, "info": pl.Utf8})
+        return pl.concat(rendered).unique("_row_id", keep="last", maintain_order=True)
@@ -3,69 +3,111 @@ import polars as pl
 from ocean_data_qc.fyskem.base_qc_category import BaseQcCategory
 from ocean_data_qc.fyskem.qc_checks import DependencyCheck
 from ocean_data_qc.fyskem.qc_flag import QcFlag
+from ocean_data_qc.fyskem.qc_flag_expressions import FLAG_CODES, code_column
 from ocean_data_qc.fyskem.qc_flag_tuple import QcField
 
+# Flags in the order they are inherited by a dependent parameter
+DEPENDENCY_PRIORITY = ("4", "3", "2", "1", "9", "8", "7", "6", "5", "0")
+
 
 class DependencyQc(BaseQcCategory):
+    # All automatic flags of the parameters in the lists are ranked
+    reads_automatic_flags = tuple(QcField)
+
     def __init__(self, data):
         super().__init__(data, QcField.Dependency, f"AUTO_QC_{QcField.Dependency.name}")
 
     def check(self, parameter: str, configuration: DependencyCheck):
+        self.check_parameters({parameter: configuration})
+
+    def check_parameters(self, configurations: dict[str, DependencyCheck]):
         """
         This check controls the flags of the parameters in the
         configuration list and will flag the dependent parameter according
-        to these following the priority: 4, 3, 2, 1, 0, 9, 8, 7, 6, 5, 0
+        to these following the priority: 4, 3, 2, 1, 9, 8, 7, 6, 5, 0
+
+        The automatic and total flags of the parameters in the lists are ranked by
+        this priority and all dependent parameters are checked in one query.
         """
-        priority_list = ["4", "3", "2", "1", "9", "8", "7", "6", "5", "0"]
+        # One row per parameter in the list of each dependent parameter
+        dependencies = pl.DataFrame(
+            [
+                (dependency, parameter)
+                for parameter, configuration in configurations.items()
+                for dependency in configuration.parameter_list
+            ],
+            schema={"parameter": pl.Utf8, "dependent": pl.Utf8},
+            orient="row",
+        )
+        dependency_parameters = dependencies["parameter"].unique().sort().to_list()
+        if self._lazy:
+            dependencies = dependencies.lazy()
+
+        # The highest priority flag among the parameters in the list of each dependent
+        # parameter at a visit_key and DEPH, and the parameters that have it
+        is_dependency_flag = pl.col("flag_rank") == pl.col("flag_rank").min()
         dependency_flags = (
             self._data.filter(
-                pl.col("parameter").is_in(configuration.parameter_list)
+                pl.col("parameter").is_in(dependency_parameters)
                 & pl.col("value").is_not_null()
             )
-            .group_by(["visit_key", "DEPH"])
+            .select(["visit_key", "DEPH", "parameter", self._flag_rank()])
+            .join(dependencies, on="parameter", how="inner", maintain_order="left")
+            .group_by(["dependent", "visit_key", "DEPH"])
             .agg(
-                pl.col("quality_flag_long").alias("flags_list"),
-                pl.col("parameter").alias("params_list"),
-            )
-            .with_columns(pl.col("flags_list").list.join("").alias("combined_flags"))
-            .with_columns(
-                pl.coalesce(
-                    [
-                        pl.when(pl.col("combined_flags").str.contains(p)).then(int(p))
-                        for p in priority_list
-                    ]
-                ).alias("dependency_flag")
+                pl.col("flag_rank").min(),
+                pl.col("parameter")
+                .filter(is_dependency_flag)
+                .str.join(",")
+                .alias("dependency_flag_parameters"),
             )
-            .explode(["flags_list", "params_list"])
-            .filter(
-                pl.col("flags_list").str.contains(pl.col("dependency_flag").cast(pl.Utf8))
-            )
-            .group_by(["visit_key", "DEPH", "dependency_flag"])
-            .agg(pl.col("params_list").str.join(",").alias("dependency_flag_parameters"))
             .select(
-                ["visit_key", "DEPH", "dependency_flag", "dependency_flag_parameters"]
+                pl.col("dependent").alias("parameter"),
+                "visit_key",
+                "DEPH",
+                pl.col("flag_rank")
+                .replace_strict(
+                    dict(enumerate(int(flag) for flag in DEPENDENCY_PRIORITY)),
+                    return_dtype=pl.Int32,
+                )
+                .alias("dependency_flag"),
+                pl.when(pl.col("flag_rank").is_not_null()).then(
+                    pl.col("dependency_flag_parameters")
+                ),
             )
         )
 
         selection = self._data.filter(
-            (pl.col("parameter") == parameter) & pl.col("value").is_not_null()
-        ).join(dependency_flags, on=["visit_key", "DEPH"], how="left")
+            pl.col("parameter").is_in(list(configurations))
+            & pl.col("value").is_not_null()
+        ).join(dependency_flags, on=["parameter", "visit_key", "DEPH"], how="left")
 
-        if selection.is_empty():
+        if self._is_empty(selection):
             return
 
-        result_expr = self._apply_flagging_logic(
-            configuration=configuration,
-            parameter=parameter,
-        )
+        result_expr = self._apply_flagging_logic()
         # Update original dataframe with qc results
         self.update_dataframe(selection=selection, result_expr=result_expr)
 
-    def _apply_flagging_logic(
-        self,
-        configuration: DependencyCheck,
-        parameter: str,
-    ) -> pl.DataFrame:
+    @staticmethod
+    def _flag_rank() -> pl.Expr:
+        """
+        The rank in DEPENDENCY_PRIORITY of the highest priority flag of a row among its
+        automatic and total flags, null if none of them are in DEPENDENCY_PRIORITY.
+        """
+        ranks = {flag: rank for rank, flag in enumerate(DEPENDENCY_PRIORITY)}
+        code_ranks = {FLAG_CODES[flag]: rank for flag, rank in ranks.items()}
+        return pl.min_horizontal(
+            pl.col("TOTAL_QC").replace_strict(ranks, default=None, return_dtype=pl.UInt8),
+            *(
+                pl.col(code_column(field)).replace_strict(
+                    code_ranks, default=None, return_dtype=pl.UInt8
+                )
+                for field in QcField
+            ),
+        ).alias("flag_rank")
+
+    def _apply_flagging_logic(self) -> pl.DataFrame:
         """
         Apply flagging logic for dependency test using polars.
         """
@@ -73,30 +115,26 @@ class DependencyQc(BaseQcCategory):
         result_expr = (
             pl.when((pl.col("dependency_flag") >= 1) & (pl.col("dependency_flag") <= 4))
             .then(
-                pl.struct(
-                    [
-                        pl.col("dependency_flag").cast(pl.Utf8).alias("flag"),
-                        pl.format(
-                            "The following parameters: {} have flag {} which is "
-                            "inherited by the parameter: {}",
-                            pl.col("dependency_flag_parameters"),
-                            pl.col("dependency_flag"),
-                            pl.lit(parameter),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.col("dependency_flag").cast(pl.Utf8),
+                    pl.format(
+                        "The following parameters: {} have flag {} which is "
+                        "inherited by the parameter: {}",
+                        pl.col("dependency_flag_parameters"),
+                        pl.col("dependency_flag"),
+                        pl.col("parameter"),
+                    ),
                 )
             )
             .otherwise(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.NO_QUALITY_CONTROL.value)).alias("flag"),
-                        pl.format(
-                            "No QC performed since associated parameters: {} "
-                            "contain flag: {}",
-                            pl.col("dependency_flag_parameters"),
-                            pl.col("dependency_flag"),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.NO_QUALITY_CONTROL.value)),
+                    pl.format(
+                        "No QC performed since associated parameters: {} "
+                        "contain flag: {}",
+                        pl.col("dependency_flag_parameters"),
+                        pl.col("dependency_flag"),
+                    ),
                 )
             )
         )
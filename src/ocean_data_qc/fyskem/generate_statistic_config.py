@@ -1,6 +1,12 @@
+import csv
+import hashlib
+import inspect
+import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pandas as pd
+import polars as pl
 from jinja2 import Template
 
 # Set up Jinja2 template
@@ -143,122 +149,300 @@ def write_yaml(config, output_file, yaml_template=yaml_template_config):
     print("YAML configuration successfully generated!")
 
 
+# Rules used to compute the flag limits. A change here or in _limits regenerates all
+# parameter files.
+LIMIT_RULES = {
+    "decimals": 2,
+    # flag 2 and flag 3 limits are min/max -/+ factor * iqr
+    "flag2_iqr_factor": 1.5,
+    "flag3_iqr_factor": 3,
+    # min_range_value and max_range_value are min/max -/+ factor * std
+    "range_std_factor": 2,
+    # Baltic Proper below halocline where concentrations show a strong increasing trend
+    "special_range_std_factor": 3,
+    "special_parameters": ["H2S", "AMON", "din", "SIO3-SI"],
+    "special_sea_basins": [
+        "Eastern Gotland Basin",
+        "Western Gotland Basin",
+        "Northern Baltic Proper",
+    ],
+    "special_min_depth": 60,
+    # Lowest limits for temperatures and for parameters that can not be negative
+    "temperature_lower_limit": -2,
+    "lower_limit": 0,
+}
+
+# The manifest is kept next to the output directory, not in it, since the statistic
+# check reads every file in the output directory as a parameter
+MANIFEST_SUFFIX = "_manifest.json"
+
+LIMIT_COLUMNS = (
+    "min_depth",
+    "max_depth",
+    "flag1_lower",
+    "flag1_upper",
+    "flag2_lower",
+    "flag2_upper",
+    "flag3_lower",
+    "flag3_upper",
+    "min_range_value",
+    "max_range_value",
+)
+
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(2**20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _rules_hash() -> str:
+    """Hash of the limit rules, the source of _limits and the limit columns."""
+    digest = hashlib.sha256(json.dumps(LIMIT_RULES, sort_keys=True).encode("utf8"))
+    digest.update(inspect.getsource(_limits).encode("utf8"))
+    digest.update(json.dumps(LIMIT_COLUMNS).encode("utf8"))
+    return digest.hexdigest()
+
+
+def _manifest_path(output_dir: Path) -> Path:
+    output_dir = output_dir.resolve()
+    return output_dir.with_name(f"{output_dir.name}{MANIFEST_SUFFIX}")
+
+
+def _read_manifest(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _source_info(path: Path) -> dict:
+    """Content hash and columns of a basin file, read from the header only."""
+    with open(path, encoding="utf8", newline="") as file:
+        columns = next(csv.reader(file, delimiter="\t"))
+    statistics = {}
+    for column in columns:
+        if ":" in column:
+            statistics.setdefault(column.split(":")[0], []).append(column.split(":")[-1])
+    return {
+        "sha256": _file_hash(path),
+        "descriptive_columns": [column for column in columns if ":" not in column],
+        "statistics": statistics,
+    }
+
+
+def _scan_basin_file(
+    index: int, path: Path, source: dict, parameters: set[str]
+) -> pl.LazyFrame:
+    """
+    Scan the columns for the given parameters in a basin file to long format, with one
+    row per row in the file, parameter and statistic.
+    """
+    parameter_columns = [
+        f"{parameter}:{statistic}"
+        for parameter, statistics in source["statistics"].items()
+        if parameter in parameters
+        for statistic in statistics
+    ]
+    return (
+        pl.scan_csv(
+            path,
+            separator="\t",
+            encoding="utf8",
+            schema_overrides=dict.fromkeys(parameter_columns, pl.Float64),
+        )
+        .with_row_index("_row")
+        .with_columns(pl.lit(index).alias("_file"))
+        .unpivot(
+            on=parameter_columns,
+            index=["_file", "_row", *source["descriptive_columns"]],
+            variable_name="_column",
+        )
+        .drop_nulls("value")
+        .with_columns(
+            pl.col("_column").str.split(":").list.first().alias("_parameter"),
+            pl.col("_column").str.split(":").list.last().alias("_statistic"),
+        )
+        .drop("_column")
+    )
+
+
+def _limits(rules: dict) -> list[pl.Expr]:
+    """Flag limits and range values for all parameters at once."""
+    # description of the limits
+    # upper limit for bad data: max + (75th percentile-median)
+    # lower limit for bad data: min - (median - 25th percentile)
+    # upper limit for correctable data: 99th percentile to upper limit for bad data
+    # lower limit for bad data: 1st percentile to lower limit for bad data
+    iqr_low = pl.col("median") - pl.col("25p")
+    iqr_high = pl.col("75p") - pl.col("median")
+    flag2_factor = rules["flag2_iqr_factor"]
+    flag3_factor = rules["flag3_iqr_factor"]
+
+    # default use std * 2 to define allowed max and min range, override with std * 3
+    # in the special basins below the special depth
+    special = (
+        pl.col("_parameter").is_in(rules["special_parameters"])
+        & pl.col("sea_basin").is_in(rules["special_sea_basins"])
+        & (pl.col("depth") >= rules["special_min_depth"])
+    )
+    std_factor = (
+        pl.when(special)
+        .then(rules["special_range_std_factor"])
+        .otherwise(rules["range_std_factor"])
+    )
+
+    # Handle low temperatures and conc < 0
+    lower_limit = (
+        pl.when(pl.col("_parameter").str.to_uppercase().str.contains("TEMP"))
+        .then(rules["temperature_lower_limit"])
+        .when(~pl.col("_parameter").str.contains("neg"))
+        .then(rules["lower_limit"])
+    )
+
+    def rounded(limit: pl.Expr) -> pl.Expr:
+        return limit.round(rules["decimals"])
+
+    def clipped(limit: pl.Expr) -> pl.Expr:
+        limit = rounded(limit)
+        return pl.when(limit < lower_limit).then(lower_limit).otherwise(limit)
+
+    return [
+        clipped(pl.col("min")).alias("flag1_lower"),
+        clipped(pl.col("max")).alias("flag1_upper"),
+        clipped(pl.col("min") - iqr_low * flag2_factor).alias("flag2_lower"),
+        clipped(pl.col("max") + iqr_high * flag2_factor).alias("flag2_upper"),
+        clipped(pl.col("min") - iqr_low * flag3_factor).alias("flag3_lower"),
+        clipped(pl.col("max") + iqr_high * flag3_factor).alias("flag3_upper"),
+        clipped(pl.col("min") - pl.col("std") * std_factor).alias("min_range_value"),
+        rounded(pl.col("max") + pl.col("std") * std_factor).alias("max_range_value"),
+    ]
+
+
 def generate_statistic_parameter_files(data_directory, output_directory):
     """
     read file with statistics and create one file with statistics for each parameter
     Add columns to use for checks (min_range_value and max_range_value)
+
+    The basin files are read in parallel and the limits for all parameters are
+    computed in one pass. A manifest with content hashes of the basin files, the limit
+    rules and the written files is kept next to the output directory, e.g.
+    statistic_check_data_manifest.json for statistic_check_data. Only parameters with
+    changed basin files, changed limit rules or changed output files are written.
+    Files for parameters in the manifest that are no longer generated are removed.
     """
-    # Define file directory
     data_dir = Path(data_directory)
     output_dir = Path(output_directory)
     output_dir.mkdir(exist_ok=True)  # Ensure output directory exists
-
-    # Dictionary to collect data per parameter
-    parameter_data = {}
-
-    # Loop over all CSV files
-    for file_path in data_dir.glob("*.csv"):
-        sea_basin = file_path.stem  # Extract sea basin name from filename
-        print(sea_basin)
-        df = pd.read_csv(file_path, sep="\t", encoding="utf-8")
-
-        # Extract unique parameter names
-        param_names = {col.split(":")[0] for col in df.columns if ":" in col}
-        descriptive_cols = [col for col in df.columns if ":" not in col]
-
-        for param in param_names:
-            # Select only relevant columns for this parameter
-            parameter_cols = [col for col in df.columns if col.startswith(param + ":")]
-            if not parameter_cols:
-                continue  # Skip if no relevant columns
-
-            # Rename columns to remove parameter prefix (e.g., "TEMP:mean" → "mean")
-            param_df = df[descriptive_cols + parameter_cols].copy()
-            param_df.dropna(subset=parameter_cols, how="all", inplace=True)
-            if param_df.empty:
-                continue
-            param_df.rename(
-                columns=lambda x: x.split(":")[-1] if ":" in x else x, inplace=True
+    manifest_path = _manifest_path(output_dir)
+    manifest = _read_manifest(manifest_path)
+    rules_hash = _rules_hash()
+
+    paths = sorted(data_dir.glob("*.csv"))
+    with ThreadPoolExecutor() as executor:
+        sources = dict(zip(paths, executor.map(_source_info, paths)))
+
+    # Basin files, descriptive columns and statistics per parameter in file order
+    parameter_sources = {}
+    for path, source in sources.items():
+        for parameter, statistics in source["statistics"].items():
+            parameter_source = parameter_sources.setdefault(
+                parameter, {"sources": {}, "columns": []}
             )
-            # Add sea basin column
-            # param_df.insert(0, "sea_basin", sea_basin)
-            # Collect data for this parameter
-            if param not in parameter_data:
-                parameter_data[param] = []
-            parameter_data[param].append(param_df)
-    config_data = {}
-
-    # Save each parameter's collected data into a separate file
-    for param, dataframes in parameter_data.items():
-        param_df = pd.concat(dataframes, ignore_index=True)
-        # Split the "depth_interval" column into "min_depth" and "max_depth"
-        param_df[["min_depth", "max_depth"]] = param_df["depth_interval"].str.split(
-            "_", expand=True
-        )
-
-        # description of the limits
-        # upper limit for bad data: max + (75th percentile-median)
-        # lower limit for bad data: min - (median - 25th percentile)
-        # upper limit for correctable data: 99th percentile to upper limit for bad data
-        # lower limit for bad data: 1st percentile to lower limit for bad data
-        iqr_low = param_df["median"] - param_df["25p"]
-        iqr_high = param_df["75p"] - param_df["median"]
-        param_df["flag1_lower"] = round(param_df["min"], 2)  # good down to min
-        param_df["flag1_upper"] = round(param_df["max"], 2)  # good up to max
-        # flag 2 probabbly good between min and min - iqr_low
-        param_df["flag2_lower"] = round(param_df["min"] - iqr_low * 1.5, 2)
-        # flag 2 probabbly good between max and max + iqr_high,
-        param_df["flag2_upper"] = round(param_df["max"] + iqr_high * 1.5, 2)
-        # flag3 bad correctable between min - iqr_low and min - 1.5*iqr_low,
-        # all BELOW min will be flag 4 (bad)
-        param_df["flag3_lower"] = round(param_df["min"] - iqr_low * 3, 2)
-        # flag3 bad correctable between max + iqr_high and max + 1.5*iqr_high,
-        # all ABOVE will be flag 4 (bad)
-        param_df["flag3_upper"] = round(param_df["max"] + iqr_high * 3, 2)
-        # Convert min_depth and max_depth to numeric (since split gives strings)
-        param_df["min_depth"] = pd.to_numeric(param_df["min_depth"])
-        param_df["max_depth"] = pd.to_numeric(param_df["max_depth"])
-
-        # default use std *2 to define allowed max and min range
-        # so far we only have good or bad in the test, not probably good
-        param_df["min_range_value"] = round(param_df["min"] - param_df["std"] * 2, 2)
-        param_df["max_range_value"] = round(param_df["max"] + param_df["std"] * 2, 2)
-
-        # Special case: override with std * 3 where all conditions are met.
-        # Applies to Baltic Proper below halocline (> 60 m)
-        special_params = ["H2S", "AMON", "din", "SIO3-SI"]
-
-        if param in special_params:
-            special_basins = [
-                "Eastern Gotland Basin",
-                "Western Gotland Basin",
-                "Northern Baltic Proper",
+            parameter_source["sources"][path.name] = source["sha256"]
+            parameter_source["columns"] += [
+                column
+                for column in source["descriptive_columns"] + statistics
+                if column not in parameter_source["columns"]
             ]
-            mask = (param_df["sea_basin"].isin(special_basins)) & (
-                param_df["depth"] >= 60
-            )
-            param_df.loc[mask, "min_range_value"] = round(
-                param_df.loc[mask, "min"] - param_df.loc[mask, "std"] * 3, 2
+
+    previous = (
+        dict(manifest.get("parameters", {}))
+        if manifest.get("rules") == rules_hash
+        else {}
+    )
+    changed_parameters = [
+        parameter
+        for parameter, parameter_source in parameter_sources.items()
+        if parameter not in previous
+        or previous[parameter]["sources"] != parameter_source["sources"]
+        or not (output_dir / f"{parameter}.txt").exists()
+        or _file_hash(output_dir / f"{parameter}.txt") != previous[parameter]["sha256"]
+    ]
+
+    if changed_parameters:
+        scans = [
+            _scan_basin_file(index, path, source, set(changed_parameters))
+            for index, (path, source) in enumerate(sources.items())
+            if set(changed_parameters).intersection(source["statistics"])
+        ]
+        data = pl.concat(scans, how="diagonal_relaxed").collect()
+        data = (
+            data.pivot(
+                on="_statistic",
+                index=[
+                    column
+                    for column in data.columns
+                    if column not in ("_statistic", "value")
+                ],
+                values="value",
+                sort_columns=False,
             )
-            param_df.loc[mask, "max_range_value"] = round(
-                param_df.loc[mask, "max"] + param_df.loc[mask, "std"] * 3, 2
+            .sort(["_file", "_row"], maintain_order=True)
+            .with_columns(
+                pl.col("depth_interval")
+                .str.split_exact("_", 1)
+                .struct.rename_fields(["min_depth", "max_depth"])
+                .struct.unnest()
+                .cast(pl.Float64)
             )
+            .with_columns(_limits(LIMIT_RULES))
+            .partition_by("_parameter", as_dict=True, include_key=False)
+        )
 
-        # Handle low temperatures and conc < 0
-        flag_cols = param_df.filter(like="flag").columns
-        if "TEMP" in param.upper():
-            param_df["min_range_value"] = param_df["min_range_value"].clip(lower=-2)
-            param_df[flag_cols] = param_df[flag_cols].clip(lower=-2)
-        elif "neg" not in param:
-            param_df["min_range_value"] = param_df["min_range_value"].clip(lower=0)
-            param_df[flag_cols] = param_df[flag_cols].clip(lower=0)
+        def write_parameter_file(parameter):
+            param_file = output_dir / f"{parameter}.txt"
+            data[(parameter,)].select(
+                *parameter_sources[parameter]["columns"], *LIMIT_COLUMNS
+            ).write_csv(param_file, separator="\t")
+            print(f"Saved: {param_file}")
+            return _file_hash(param_file)
+
+        # Parameters without any statistics are not written
+        written_parameters = []
+        for parameter in changed_parameters:
+            previous.pop(parameter, None)
+            if (parameter,) in data:
+                written_parameters.append(parameter)
+        with ThreadPoolExecutor() as executor:
+            output_hashes = executor.map(write_parameter_file, written_parameters)
+            for parameter, output_hash in zip(written_parameters, output_hashes):
+                previous[parameter] = {
+                    "sources": parameter_sources[parameter]["sources"],
+                    "sha256": output_hash,
+                }
 
-        param_file = output_dir / f"{param}.txt"
-        param_df.to_csv(param_file, sep="\t", index=False, encoding="utf8")
-        config_data[param] = {"file_name": f"{param}.txt"}
-        print(f"Saved: {param_file}")
+    parameters = {
+        parameter: previous[parameter]
+        for parameter in parameter_sources
+        if parameter in previous
+    }
+
+    # Files written earlier for parameters that are no longer generated
+    for parameter in sorted(set(manifest.get("parameters", {})).difference(parameters)):
+        param_file = output_dir / f"{parameter}.txt"
+        if param_file.exists():
+            param_file.unlink()
+            print(f"Removed: {param_file}")
+
+    manifest_path.write_text(
+        json.dumps({"rules": rules_hash, "parameters": parameters}, indent=2),
+        encoding="utf8",
+    )
 
-    return config_data
+    return {parameter: {"file_name": f"{parameter}.txt"} for parameter in parameters}
 
 
 # Running the code
@@ -1,97 +1,94 @@
 import polars as pl
 
 from ocean_data_qc.fyskem.base_qc_category import BaseQcCategory
+from ocean_data_qc.fyskem.profile_view import ProfileView
 from ocean_data_qc.fyskem.qc_checks import GradientCheck
 from ocean_data_qc.fyskem.qc_flag import QcFlag
 from ocean_data_qc.fyskem.qc_flag_tuple import QcField
 
 
 class GradientQc(BaseQcCategory):
-    def __init__(self, data):
+    uses_profiles = True
+
+    def __init__(self, data, profiles: ProfileView | None = None):
         super().__init__(
             data,
             QcField.Gradient,
             f"AUTO_QC_{QcField.Gradient.name}",
+            profiles,
         )
 
     def check(self, parameter: str, configuration: GradientCheck):
+        self.check_parameters({parameter: configuration})
+
+    def check_parameters(self, configurations: dict[str, GradientCheck]):
         """
         Beräknar riktad gradient i parameter mellan två på varandra efterföljande djup.
         GOOD_DATA: om gradienten ligger mellan allowed_increase och allowed_decrease
         BAD_DATA: om gradienten ligger utanför intervallet
         """
-        self._parameter = parameter
-        selection = (
-            self._data.filter(
-                (pl.col("parameter") == parameter) & pl.col("value").is_not_null()
-            )
-            .sort(["visit_key", "DEPH"])
-            .with_columns(
-                [
-                    (
-                        pl.col("value").diff().over("visit_key")
-                        / pl.col("DEPH").diff().over("visit_key")
-                    ).alias("gradient")
-                ]
-            )
+        selection = self._join_thresholds(
+            self._profile_selection(configurations).filter(pl.col("value").is_not_null()),
+            configurations,
+        ).with_columns(
+            [
+                (
+                    (pl.col("value") - pl.col("prev_value"))
+                    / (pl.col("DEPH") - pl.col("prev_deph"))
+                ).alias("gradient")
+            ]
         )
 
-        if selection.is_empty():
+        if self._is_empty(selection):
             return
 
-        result_expr = self._apply_flagging_logic(configuration=configuration)
+        result_expr = self._apply_flagging_logic()
         # Update original dataframe with qc results
         self.update_dataframe(selection=selection, result_expr=result_expr)
 
-    def _apply_flagging_logic(self, configuration: GradientCheck) -> pl.DataFrame:
+    def _apply_flagging_logic(self) -> pl.DataFrame:
         """
         Apply flagging logic for gradient test using polars.
         """
         # Create the flag + info struct logic
         result_expr = (
             pl.when(
-                (pl.col("gradient") >= configuration.allowed_decrease)
-                & (pl.col("gradient") <= configuration.allowed_increase)
+                (pl.col("gradient") >= pl.col("check_allowed_decrease"))
+                & (pl.col("gradient") <= pl.col("check_allowed_increase"))
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.GOOD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "GOOD change from previous depth {} is within {}-{}",
-                            pl.col("gradient").round(3),
-                            pl.lit(configuration.allowed_decrease),
-                            pl.lit(configuration.allowed_increase),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.GOOD_VALUE.value)),
+                    pl.format(
+                        "GOOD change from previous depth {} is within {}-{}",
+                        pl.col("gradient").round(3),
+                        pl.col("check_allowed_decrease_text"),
+                        pl.col("check_allowed_increase_text"),
+                    ),
                 )
             )
             .when(
-                (pl.col("gradient") < configuration.allowed_decrease)
-                | (pl.col("gradient") > configuration.allowed_increase)
+                (pl.col("gradient") < pl.col("check_allowed_decrease"))
+                | (pl.col("gradient") > pl.col("check_allowed_increase"))
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.BAD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "BAD change from previous depth {} not within {}-{}",
-                            pl.col("gradient").round(3),
-                            pl.lit(configuration.allowed_decrease),
-                            pl.lit(configuration.allowed_increase),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.BAD_VALUE.value)),
+                    pl.format(
+                        "BAD change from previous depth {} not within {}-{}",
+                        pl.col("gradient").round(3),
+                        pl.col("check_allowed_decrease_text"),
+                        pl.col("check_allowed_increase_text"),
+                    ),
                 )
             )
             .otherwise(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.NO_QUALITY_CONTROL.value)).alias("flag"),
-                        pl.format(
-                            "Gradient is {} e.g. first depth with value at visit",
-                            pl.col("gradient").round(3),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.NO_QUALITY_CONTROL.value)),
+                    pl.format(
+                        "Gradient is {} e.g. first depth with value at visit",
+                        pl.col("gradient").round(3),
+                    ),
                 )
             )
         )
@@ -3,88 +3,83 @@ import polars as pl
 from ocean_data_qc.fyskem.base_qc_category import BaseQcCategory
 from ocean_data_qc.fyskem.qc_checks import H2sCheck
 from ocean_data_qc.fyskem.qc_flag import QcFlag
+from ocean_data_qc.fyskem.qc_flag_expressions import has_flag
 from ocean_data_qc.fyskem.qc_flag_tuple import QcField
 
 
 class H2sQc(BaseQcCategory):
+    # All flag positions of H2S and the checked parameters are read
+    reads_automatic_flags = tuple(QcField)
+
     def __init__(self, data):
         super().__init__(data, QcField.H2s, f"AUTO_QC_{QcField.H2s.name}")
 
     def check(self, parameter: str, configuration: H2sCheck):
+        self.check_parameters({parameter: configuration})
+
+    def check_parameters(self, configurations: dict[str, H2sCheck]):
         """
         GOOD_DATA: H2S has flag bad or below detection or value isna
         BAD_DATA: all other H2S flags or value not isna
         BELOW_DETECTIONs: given parameter flag BELOW_DETECTION
-        """
-
-        self._parameter = parameter
-        parameter_boolean = pl.col("parameter") == parameter
 
-        # Early exit if nothing matches
-        if self._data.filter(parameter_boolean).is_empty():
+        The visits and depths with H2S present are looked up once and joined to the
+        rows of all checked parameters.
+        """
+        selection = self._join_thresholds(self._data, configurations)
+        if self._is_empty(selection):
             return
 
-        selection = self._data.filter(pl.col("parameter") == parameter).join(
+        h2s_present = (
             self._data.filter(
                 (pl.col("parameter") == "H2S")
-                & (~pl.col("quality_flag_long").str.contains(r"(?:6|4)"))
-            ).select(
-                [
-                    pl.col("value").alias("h2s"),
-                    pl.col("visit_key"),
-                    pl.col("DEPH"),
-                ]
-            ),
-            on=["visit_key", "DEPH"],
-            how="left",
+                & pl.col("value").is_not_null()
+                & ~has_flag(QcFlag.VALUE_BELOW_DETECTION.value)
+                & ~has_flag(QcFlag.BAD_VALUE.value)
+            )
+            .select(["visit_key", "DEPH", pl.lit(True).alias("h2s_present")])
+            .unique(["visit_key", "DEPH"])
+        )
+        selection = selection.join(
+            h2s_present, on=["visit_key", "DEPH"], how="left", maintain_order="left"
         )
 
-        result_expr = self._apply_flagging_logic(configuration)
+        result_expr = self._apply_flagging_logic()
         # Update original dataframe with qc results
         self.update_dataframe(selection=selection, result_expr=result_expr)
 
-    def _apply_flagging_logic(self, configuration: H2sCheck) -> pl.DataFrame:
+    def _apply_flagging_logic(self) -> pl.DataFrame:
         """
         Apply the tests logic to selection
         """
         result_expr = (
             pl.when(pl.col("value").is_null() | pl.col("value").is_nan())
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.MISSING_VALUE.value)).alias("flag"),
-                        pl.lit(f"MISSING no value for {self._parameter}").alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.MISSING_VALUE.value)),
+                    pl.format("MISSING no value for {}", pl.col("parameter")),
                 )
             )
-            .when(pl.col("quality_flag_long").str.contains(configuration.skip_flag))
+            .when(has_flag(pl.col("check_skip_flag_text")))
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.VALUE_BELOW_DETECTION.value)).alias("flag"),
-                        pl.lit(
-                            f"BELOW_DETECTION {self._parameter} is below detection limit"
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.VALUE_BELOW_DETECTION.value)),
+                    pl.format(
+                        "BELOW_DETECTION {} is below detection limit",
+                        pl.col("parameter"),
+                    ),
                 )
             )
-            .when(pl.col("h2s").is_null())
+            .when(pl.col("h2s_present").is_null())
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.GOOD_VALUE.value)).alias("flag"),
-                        pl.lit("GOOD no h2s present").alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.GOOD_VALUE.value)), pl.lit("GOOD no h2s present")
                 )
             )
             .otherwise(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.BAD_VALUE.value)).alias("flag"),
-                        pl.lit(f"BAD {self._parameter} because h2s present").alias(
-                            "info"
-                        ),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.BAD_VALUE.value)),
+                    pl.format("BAD {} because h2s present", pl.col("parameter")),
                 )
             )
         )
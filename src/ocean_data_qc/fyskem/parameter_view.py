@@ -0,0 +1,129 @@
+from typing import Iterator
+
+import polars as pl
+
+from ocean_data_qc.fyskem.parameter import Parameter
+from ocean_data_qc.fyskem.qc_flag import QcFlag
+from ocean_data_qc.fyskem.qc_flag_expressions import automatic_flags, total_flag
+from ocean_data_qc.fyskem.qc_flag_tuple import QcField
+from ocean_data_qc.fyskem.qc_flags import QcFlags
+
+
+class ParameterRow(Parameter):
+    """
+    A Parameter that reads its values from a row of a DataFrame when they are used.
+    The flags are parsed the first time qc is read. The row dict is created the first
+    time data is read and then used for all values, as in Parameter.
+    """
+
+    def __init__(self, data: pl.DataFrame, index: int):
+        self._frame = data
+        self._index = index
+        self._qc = None
+        self._row = None
+
+    def _get(self, column: str, default=None):
+        if self._row is not None:
+            return self._row.get(column, default)
+        values = self._frame.get_column(column, default=None)
+        if values is None:
+            return default
+        return values[self._index]
+
+    @property
+    def name(self):
+        return self._get("parameter")
+
+    @property
+    def depth(self):
+        return self._get("DEPH")
+
+    @property
+    def value(self):
+        return self._get("value")
+
+    @property
+    def qc(self) -> QcFlags:
+        if self._qc is None:
+            flags = self._get("quality_flag_long")
+            self._qc = QcFlags.from_string(flags) if flags is not None else QcFlags()
+        return self._qc
+
+    @property
+    def manual_comment(self) -> str:
+        return self._get("MANUAL_QC_COMMENT", "")
+
+    @property
+    def manual_category(self) -> str:
+        return self._get("MANUAL_QC_CATEGORY", "")
+
+    @property
+    def data(self):
+        # Update 'quality_flag_long' before returning data
+        if self._row is None:
+            self._row = self._frame.row(self._index, named=True)
+        self._row["quality_flag_long"] = str(self.qc)
+        return self._row
+
+
+class ParameterView:
+    """
+    The rows of a DataFrame as Parameters, created when a row is used. Filtering and
+    slicing give new views of the data without creating any Parameters.
+    """
+
+    def __init__(self, data: pl.DataFrame):
+        self._data = data
+
+    def __len__(self) -> int:
+        return self._data.height
+
+    def __getitem__(self, index: int) -> ParameterRow:
+        if not -len(self) <= index < len(self):
+            raise IndexError(f"Row {index} out of range for {len(self)} rows")
+        return ParameterRow(self._data, index % len(self))
+
+    def __iter__(self) -> Iterator[ParameterRow]:
+        return (ParameterRow(self._data, index) for index in range(len(self)))
+
+    @property
+    def data(self) -> pl.DataFrame:
+        return self._data
+
+    def iter_batches(self, batch_size: int) -> Iterator["ParameterView"]:
+        """Views of at most batch_size consecutive rows, zero copy slices of the data."""
+        for offset in range(0, len(self), batch_size):
+            yield ParameterView(self._data.slice(offset, batch_size))
+
+    def filter(
+        self,
+        parameter: str | None = None,
+        visit_key: str | None = None,
+        flag: QcFlag | None = None,
+        field: QcField | None = None,
+    ) -> "ParameterView":
+        """
+        A view of the rows with the given parameter, visit_key and flag. The flag is
+        compared with the total flag, or with the automatic flag of field if given.
+        Raises ValueError if field is given without a flag.
+        """
+        if field is not None and flag is None:
+            raise ValueError("A flag is needed to filter on the flag of a field")
+        predicates = []
+        if parameter is not None:
+            predicates.append(pl.col("parameter") == parameter)
+        if visit_key is not None:
+            predicates.append(pl.col("visit_key") == visit_key)
+        if flag is not None:
+            quality_flag_long = pl.col("quality_flag_long").fill_null("")
+            flags = (
+                total_flag(quality_flag_long)
+                if field is None
+                else automatic_flags(quality_flag_long).str.slice(field.value, 1)
+            )
+            predicates.append(
+                flags.replace("", QcFlag.NO_QUALITY_CONTROL.value) == flag.value
+            )
+        if not predicates:
+            return self
+        return ParameterView(self._data.filter(predicates))
@@ -0,0 +1,85 @@
+from typing import Iterable
+
+import polars as pl
+
+# Columns read by the profile checks, none of them are changed by any QC category
+PROFILE_COLUMNS = ("_row_id", "parameter", "visit_key", "DEPH", "value", "TOTAL_QC")
+
+
+def profile_shift(column: str, n: int) -> pl.Expr:
+    """
+    The column n rows before (n > 0) or after (n < 0) in the same profile. Null at the
+    ends of each profile. Used instead of shift().over("visit_key") on a sorted
+    selection from a ProfileView.
+    """
+    return pl.when(pl.col("_profile").shift(n) == pl.col("_profile")).then(
+        pl.col(column).shift(n)
+    )
+
+
+class ProfileView:
+    """
+    The rows of the data sorted by parameter, visit_key and DEPH, built once per run
+    and shared by the checks that compare values along a profile.
+
+    Each profile (a parameter at a visit) is numbered in _profile. prev_value and
+    prev_deph are the value and depth of the closest row above with a value in the
+    same profile, next_value and next_deph of the closest row below.
+    """
+
+    def __init__(self, data: pl.DataFrame | pl.LazyFrame):
+        profiles = (
+            data.lazy()
+            .select(PROFILE_COLUMNS)
+            .sort(["parameter", "visit_key", "DEPH"], maintain_order=True)
+            .with_columns(
+                pl.struct("parameter", "visit_key").rle_id().alias("_profile"),
+            )
+            .with_columns(
+                self._closest_with_value("value", 1).alias("prev_value"),
+                self._closest_with_value("DEPH", 1).alias("prev_deph"),
+                self._closest_with_value("value", -1).alias("next_value"),
+                self._closest_with_value("DEPH", -1).alias("next_deph"),
+            )
+        )
+        self._data = profiles.collect()
+
+        # Offset and number of rows of each parameter in the sorted rows
+        lengths = self._data.group_by("parameter", maintain_order=True).len()
+        offsets = lengths["len"].cum_sum() - lengths["len"]
+        self._boundaries = dict(
+            zip(lengths["parameter"], zip(offsets.to_list(), lengths["len"].to_list()))
+        )
+
+    @staticmethod
+    def _closest_with_value(column: str, n: int) -> pl.Expr:
+        # Fill the column from the rows with a value towards the row n steps away and
+        # keep it only if that row with a value is in the same profile
+        strategy = "forward" if n > 0 else "backward"
+        with_value = pl.when(pl.col("value").is_not_null())
+        return pl.when(
+            with_value.then(pl.col("_profile")).fill_null(strategy=strategy).shift(n)
+            == pl.col("_profile")
+        ).then(with_value.then(pl.col(column)).fill_null(strategy=strategy).shift(n))
+
+    def __contains__(self, parameter: str) -> bool:
+        return parameter in self._boundaries
+
+    def parameter(self, parameter: str) -> pl.DataFrame:
+        """The sorted profiles of a parameter, a zero copy slice of the view."""
+        offset, length = self._boundaries.get(parameter, (0, 0))
+        return self._data.slice(offset, length)
+
+    def parameters(self, parameters: Iterable[str]) -> pl.DataFrame:
+        """The sorted profiles of the parameters, in the order of the view."""
+        boundaries = sorted(
+            self._boundaries[parameter]
+            for parameter in set(parameters)
+            if parameter in self._boundaries
+        )
+        if not boundaries:
+            return self._data.clear()
+        return pl.concat(
+            [self._data.slice(offset, length) for offset, length in boundaries],
+            rechunk=False,
+        )
@@ -1,11 +1,15 @@
+import bisect
 import math
 import warnings
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from pathlib import Path
 from typing import List, Optional
 
+import numpy as np
 import polars as pl
 
+from ocean_data_qc.fyskem.statistic_store import shared_statistics
+
 
 @dataclass
 class QuantificationLimitCheck:
@@ -60,55 +64,205 @@ class DependencyCheck:
     parameter_list: list
 
 
+def threshold_table(configurations: dict) -> pl.DataFrame:
+    """
+    Compile the checks of a category, keyed by parameter, to a table with one row per
+    parameter. Each threshold is a Float64 column check_<threshold> and a String column
+    check_<threshold>_text with the threshold formatted as the configured value, e.g.
+    10 and not 10.0.
+    """
+    names = (
+        [check_field.name for check_field in fields(next(iter(configurations.values())))]
+        if configurations
+        else []
+    )
+    rows = {"parameter": pl.Series(list(configurations), dtype=pl.String)}
+    for name in names:
+        values = [
+            getattr(configuration, name) for configuration in configurations.values()
+        ]
+        rows[f"check_{name}"] = pl.Series(values, dtype=pl.Float64, strict=False)
+        rows[f"check_{name}_text"] = pl.Series(
+            [pl.Series([value]).cast(pl.String).item() for value in values],
+            dtype=pl.String,
+        )
+    return pl.DataFrame(rows)
+
+
+THRESHOLD_COLUMNS = (
+    "min_range_value",
+    "max_range_value",
+    "flag1_lower",
+    "flag1_upper",
+    "flag2_lower",
+    "flag2_upper",
+    "flag3_lower",
+    "flag3_upper",
+)
+
+
+class ThresholdGrid:
+    """
+    Dense array of statistic thresholds indexed by sea basin, month and depth bin.
+
+    The depth bin edges are all min_depth and max_depth values in the statistics, so
+    every depth interval in the statistics covers one or more whole bins. Cells without
+    statistics are NaN. If depth intervals overlap the first row in the statistics is
+    used, as in a lookup by filtering. The same rule is used by StatisticQc through
+    depth_bins.
+    """
+
+    def __init__(self, data: pl.DataFrame):
+        self._basins = data["sea_basin"].unique().sort().to_list()
+        self._basin_codes = {basin: code for code, basin in enumerate(self._basins)}
+        self._depth_edges = np.unique(
+            np.concatenate(
+                [
+                    data["min_depth"].cast(pl.Float64).to_numpy(),
+                    data["max_depth"].cast(pl.Float64).to_numpy(),
+                ]
+            )
+        )
+        self._depth_edge_list = self._depth_edges.tolist()
+        self._grid = np.full(
+            (
+                len(self._basin_codes),
+                13,
+                max(len(self._depth_edges) - 1, 0),
+                len(THRESHOLD_COLUMNS),
+            ),
+            np.nan,
+        )
+
+        basins = np.array(
+            [self._basin_codes[basin] for basin in data["sea_basin"]], dtype=np.intp
+        )
+        months = data["month"].cast(pl.Int64).to_numpy()
+        first_bins = np.searchsorted(self._depth_edges, data["min_depth"].to_numpy())
+        end_bins = np.searchsorted(self._depth_edges, data["max_depth"].to_numpy())
+        values = (
+            data.select(pl.col(THRESHOLD_COLUMNS).cast(pl.Float64))
+            .to_numpy()
+            .reshape(-1, len(THRESHOLD_COLUMNS))
+        )
+        # The cells covered by each row, in the order of the rows
+        cell_counts = np.maximum(end_bins - first_bins, 0)
+        cell_rows = np.repeat(np.arange(len(data)), cell_counts)
+        cell_offsets = np.arange(cell_counts.sum()) - np.repeat(
+            np.cumsum(cell_counts) - cell_counts, cell_counts
+        )
+        cells = np.ravel_multi_index(
+            (
+                basins[cell_rows],
+                months[cell_rows],
+                first_bins[cell_rows] + cell_offsets,
+            ),
+            self._grid.shape[:3],
+        )
+
+        # Row in the statistics used for each cell, the first row covering the cell or
+        # -1 for cells without statistics
+        filled_cells, first = np.unique(cells, return_index=True)
+        overlapping = len(filled_cells) < len(cells)
+        self._rows = np.full(self._grid.shape[:3], -1, dtype=np.int64)
+        self._rows.reshape(-1)[filled_cells] = cell_rows[first]
+        self._grid.reshape(-1, len(THRESHOLD_COLUMNS))[filled_cells] = values[
+            cell_rows[first]
+        ]
+        if overlapping:
+            warnings.warn("Overlapping depth intervals in statistics, using first match")
+
+    def depth_bins(self) -> pl.DataFrame:
+        """
+        Return the cells with statistics as sea_basin, month, bin_min_depth,
+        bin_max_depth and statistics_row, the row in the statistics used for the cell.
+        The bins of a sea basin and month do not overlap and are sorted by depth.
+        """
+        basins, months, depth_bins = np.nonzero(self._rows >= 0)
+        return pl.DataFrame(
+            {
+                "sea_basin": pl.Series(self._basins, dtype=pl.Utf8).gather(basins),
+                "month": months,
+                "bin_min_depth": self._depth_edges[depth_bins],
+                "bin_max_depth": self._depth_edges[depth_bins + 1],
+                "statistics_row": self._rows[basins, months, depth_bins],
+            }
+        )
+
+    def lookup(self, sea_basins, depths, months) -> dict[str, np.ndarray]:
+        """Return arrays with each threshold for the given points."""
+        basins = (
+            pl.Series(sea_basins, dtype=pl.Utf8)
+            .replace_strict(self._basin_codes, default=-1, return_dtype=pl.Int64)
+            .to_numpy()
+        )
+        depths = np.asarray(depths, dtype=float)
+        months = np.asarray(months).astype(int)
+        bins = np.searchsorted(self._depth_edges, depths, side="right") - 1
+
+        valid = (
+            (basins >= 0)
+            & (months >= 1)
+            & (months <= 12)
+            & (bins >= 0)
+            & (bins < self._grid.shape[2])
+        )
+        thresholds = np.full((len(depths), len(THRESHOLD_COLUMNS)), np.nan)
+        thresholds[valid] = self._grid[basins[valid], months[valid], bins[valid]]
+        return {
+            column: thresholds[:, index] for index, column in enumerate(THRESHOLD_COLUMNS)
+        }
+
+    def lookup_point(self, sea_basin: str, depth: float, month: int) -> dict:
+        """Return each threshold for a single point."""
+        basin = self._basin_codes.get(sea_basin)
+        depth_bin = bisect.bisect_right(self._depth_edge_list, depth) - 1
+        if (
+            basin is None
+            or not 1 <= month <= 12
+            or not 0 <= depth_bin < self._grid.shape[2]
+        ):
+            return dict.fromkeys(THRESHOLD_COLUMNS, math.nan)
+        return dict(zip(THRESHOLD_COLUMNS, self._grid[basin, month, depth_bin].tolist()))
+
+
 @dataclass
 class StatisticCheck:
     """Holds the statistical threshold configuration for each parameter."""
 
     filepath: str  # Single file containing statistics for all sea areas
     _df: Optional[pl.DataFrame] = field(init=False, repr=False, default=None)
+    _grid: Optional[ThresholdGrid] = field(init=False, repr=False, default=None)
 
     @property
     def data(self) -> pl.DataFrame:
-        """Lazy load the Polars DataFrame only when accessed."""
+        """
+        Lazy load the Polars DataFrame only when accessed. The statistics are shared
+        by all StatisticChecks in the process.
+        """
         if self._df is None:
             relative_filepath = Path(__file__).parent / self.filepath
-            self._df = pl.read_csv(relative_filepath, separator="\t", encoding="utf8")
+            self._df = shared_statistics(relative_filepath)
         return self._df
 
+    @property
+    def threshold_grid(self) -> ThresholdGrid:
+        """Lazy build the threshold grid only when accessed."""
+        if self._grid is None:
+            self._grid = ThresholdGrid(self.data)
+        return self._grid
+
     def get_thresholds(self, sea_basin: str, depth: float, month: int) -> dict:
         """
         Retrieves thresholds as a dictionary.
         Returns NaNs if no matching configuration is found.
         """
-        # Select columns relevant for thresholds
-        threshold_cols = [
-            "min_range_value",
-            "max_range_value",
-            "flag1_lower",
-            "flag1_upper",
-            "flag2_lower",
-            "flag2_upper",
-            "flag3_lower",
-            "flag3_upper",
-        ]
-        month_str = f"{int(month):02d}"  # keep format consistent
-
-        match = self.data.filter(
-            (pl.col("sea_basin") == sea_basin)
-            & (pl.col("month") == int(month_str))
-            & (pl.col("min_depth") <= depth)
-            & (pl.col("max_depth") > depth)
-        )
+        return self.threshold_grid.lookup_point(sea_basin, depth, int(month))
 
-        if match.height == 0:
-            # Return NaN for all expected fields
-            return {col: math.nan for col in threshold_cols}
-
-        if match.height > 1:
-            warnings.warn(
-                f"Multiple rows ({match.height}) matched for sea_basin={sea_basin}, "
-                "depth={depth}, month={month}. Using the first match in {match}"
-            )
-        row = match.row(0, named=True)
-
-        return {col: float(row[col]) for col in threshold_cols}
+    def get_thresholds_batch(self, sea_basins, depths, months) -> dict[str, np.ndarray]:
+        """
+        Retrieves thresholds for many points as a dictionary of arrays. The arguments
+        are sequences or arrays of the same length. NaN is returned for points without
+        a matching configuration.
+        """
+        return self.threshold_grid.lookup(sea_basins, depths, months)
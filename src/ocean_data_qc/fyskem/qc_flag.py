@@ -24,6 +24,11 @@ class QcFlag(enum.Enum):
         """Return sort key for QcFlag."""
         return cls.__PRIORITY.index(flag.value)
 
+    @classmethod
+    def priority(cls) -> tuple[str, ...]:
+        """Return all flag values ordered from highest to lowest priority."""
+        return cls.__PRIORITY
+
     def __str__(self):
         return self.name.replace("_", " ").capitalize().replace("qc", "QC")
 
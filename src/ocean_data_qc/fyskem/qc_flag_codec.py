@@ -0,0 +1,200 @@
+from typing import Iterable, Sequence
+
+import numpy as np
+import polars as pl
+
+from ocean_data_qc.fyskem.qc_flag import QcFlag
+from ocean_data_qc.fyskem.qc_flag_tuple import QcField
+
+# Integer code of each flag, also used for the automatic flags while QC is running
+FLAG_CODES = {flag.value: code for code, flag in enumerate(QcFlag)}
+CODE_FLAGS = {code: value for value, code in FLAG_CODES.items()}
+
+# A quality_flag_long is packed to an unsigned 64 bit integer with one 4 bit code per
+# flag, the incoming flag in the lowest bits followed by the automatic flags in QcField
+# order and the manual and total flags. "0_0000000000_0_0" is packed to 0.
+BITS_PER_FLAG = 4
+INCOMING_POSITION = 0
+AUTOMATIC_POSITIONS = tuple(1 + field.value for field in QcField)
+MANUAL_POSITION = len(QcField) + 1
+TOTAL_POSITION = len(QcField) + 2
+
+NO_QC_CODE = FLAG_CODES[QcFlag.NO_QUALITY_CONTROL.value]
+
+# Rank of each code by QcFlag priority and the code of each rank, 4 bit codes without a
+# flag have the lowest priority
+_CODE_RANKS = np.array(
+    [
+        QcFlag.priority().index(CODE_FLAGS[code]) if code in CODE_FLAGS else len(QcFlag)
+        for code in range(2**BITS_PER_FLAG)
+    ],
+    dtype=np.uint8,
+)
+_RANK_CODES = np.array(
+    [FLAG_CODES[value] for value in QcFlag.priority()] + [NO_QC_CODE], dtype=np.uint8
+)
+
+
+def _shift(position: int) -> int:
+    return BITS_PER_FLAG * position
+
+
+def pack(
+    incoming: QcFlag,
+    automatic: Sequence[QcFlag],
+    manual: QcFlag,
+    total: QcFlag,
+) -> int:
+    """Pack the flags of one quality_flag_long to an integer."""
+    if len(automatic) > len(AUTOMATIC_POSITIONS):
+        raise ValueError(
+            f"Cannot pack {len(automatic)} automatic flags, "
+            f"at most {len(AUTOMATIC_POSITIONS)}"
+        )
+    flags = {
+        INCOMING_POSITION: incoming,
+        **dict(zip(AUTOMATIC_POSITIONS, automatic)),
+        MANUAL_POSITION: manual,
+        TOTAL_POSITION: total,
+    }
+    return sum(
+        FLAG_CODES[flag.value] << _shift(position) for position, flag in flags.items()
+    )
+
+
+def unpack(packed: int) -> tuple[QcFlag, tuple[QcFlag, ...], QcFlag, QcFlag]:
+    """Return the incoming, automatic, manual and total flags of a packed integer."""
+
+    def flag(position: int) -> QcFlag:
+        code = (packed >> _shift(position)) & (2**BITS_PER_FLAG - 1)
+        if code not in CODE_FLAGS:
+            raise ValueError(f"Invalid QC flag code {code} in {packed!r}")
+        return QcFlag(CODE_FLAGS[code])
+
+    return (
+        flag(INCOMING_POSITION),
+        tuple(flag(position) for position in AUTOMATIC_POSITIONS),
+        flag(MANUAL_POSITION),
+        flag(TOTAL_POSITION),
+    )
+
+
+def packed_flags(quality_flag_long: pl.Expr) -> pl.Expr:
+    """
+    Return quality_flag_long strings packed to UInt64.
+
+    Empty parts and missing automatic flags are no QC performed, as in
+    QcFlags.from_string. Automatic flags after the known QC fields are not packed.
+    """
+    parts = quality_flag_long.str.split("_")
+    automatic = parts.list.get(1, null_on_oob=True)
+    flags = {
+        INCOMING_POSITION: parts.list.get(0, null_on_oob=True),
+        **{
+            position: automatic.str.slice(field.value, 1)
+            for field, position in zip(QcField, AUTOMATIC_POSITIONS)
+        },
+        MANUAL_POSITION: parts.list.get(2, null_on_oob=True),
+        TOTAL_POSITION: parts.list.get(3, null_on_oob=True),
+    }
+    codes = (
+        flag.fill_null("")
+        .replace_strict(FLAG_CODES | {"": NO_QC_CODE}, return_dtype=pl.UInt64)
+        .mul(2 ** _shift(position))
+        for position, flag in flags.items()
+    )
+    return pl.when(quality_flag_long.is_not_null()).then(pl.sum_horizontal(codes))
+
+
+def packed_flag_code(packed: pl.Expr, position: int) -> pl.Expr:
+    """Return the UInt8 code of the flag at a position of packed flags."""
+    return ((packed // 2 ** _shift(position)) % 2**BITS_PER_FLAG).cast(pl.UInt8)
+
+
+def packed_total_code(packed: pl.Expr) -> pl.Expr:
+    """
+    Return the code of the total flag calculated from packed flags, same rule as
+    QcFlags._update_total.
+    """
+    ranks = {code: int(rank) for code, rank in enumerate(_CODE_RANKS)}
+    highest_priority = pl.min_horizontal(
+        packed_flag_code(packed, position).replace_strict(ranks, return_dtype=pl.UInt8)
+        for position in (INCOMING_POSITION, *AUTOMATIC_POSITIONS)
+    ).replace_strict(dict(enumerate(_RANK_CODES.tolist())), return_dtype=pl.UInt8)
+    manual = packed_flag_code(packed, MANUAL_POSITION)
+    return pl.when(manual != NO_QC_CODE).then(manual).otherwise(highest_priority)
+
+
+def unpacked_flags(packed: pl.Expr) -> pl.Expr:
+    """Return quality_flag_long strings for packed flags."""
+
+    def flag(position: int) -> pl.Expr:
+        return packed_flag_code(packed, position).replace_strict(
+            CODE_FLAGS, return_dtype=pl.Utf8
+        )
+
+    return pl.concat_str(
+        [
+            flag(INCOMING_POSITION),
+            pl.concat_str([flag(position) for position in AUTOMATIC_POSITIONS]),
+            flag(MANUAL_POSITION),
+            flag(TOTAL_POSITION),
+        ],
+        separator="_",
+    )
+
+
+def encode(quality_flag_long: Iterable[str]) -> np.ndarray:
+    """
+    Pack quality_flag_long strings to a uint64 array, see packed_flags. A missing
+    string is packed as an empty string.
+
+    Each distinct string is only packed once, data usually holds few distinct flags.
+    """
+    strings = pl.Series("quality_flag_long", quality_flag_long, dtype=pl.Utf8).fill_null(
+        ""
+    )
+    distinct = strings.unique().to_frame()
+    packed = distinct.select(packed_flags(pl.col("quality_flag_long"))).to_series()
+    return strings.replace_strict(distinct.to_series(), packed).to_numpy()
+
+
+def decode(packed: np.ndarray) -> np.ndarray:
+    """Return an array of quality_flag_long strings for packed flags."""
+    packed = pl.Series("packed", np.asarray(packed, dtype=np.uint64))
+    distinct = packed.unique().to_frame()
+    strings = distinct.select(unpacked_flags(pl.col("packed"))).to_series()
+    return packed.replace_strict(distinct.to_series(), strings).to_numpy()
+
+
+def flag_codes(packed: np.ndarray, position: int) -> np.ndarray:
+    """Return the uint8 codes of the flag at a position of packed flags."""
+    packed = np.asarray(packed, dtype=np.uint64)
+    return (
+        (packed >> np.uint64(_shift(position))) & np.uint64(2**BITS_PER_FLAG - 1)
+    ).astype(np.uint8)
+
+
+def total_codes(packed: np.ndarray) -> np.ndarray:
+    """
+    Return the codes of the total flags calculated from packed flags, same rule as
+    QcFlags._update_total.
+    """
+    ranks = _CODE_RANKS[
+        np.stack(
+            [
+                flag_codes(packed, position)
+                for position in (INCOMING_POSITION, *AUTOMATIC_POSITIONS)
+            ]
+        )
+    ]
+    manual = flag_codes(packed, MANUAL_POSITION)
+    return np.where(manual != NO_QC_CODE, manual, _RANK_CODES[ranks.min(axis=0)])
+
+
+def with_total(packed: np.ndarray) -> np.ndarray:
+    """Return packed flags with the total flag calculated, see total_codes."""
+    packed = np.asarray(packed, dtype=np.uint64)
+    total_shift = np.uint64(_shift(TOTAL_POSITION))
+    total_mask = np.uint64(2**BITS_PER_FLAG - 1) << total_shift
+    return (packed & ~total_mask) | (total_codes(packed).astype(np.uint64) << total_shift)
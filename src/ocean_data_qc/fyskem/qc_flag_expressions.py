@@ -0,0 +1,191 @@
+import polars as pl
+
+from ocean_data_qc.fyskem.qc_flag import QcFlag
+from ocean_data_qc.fyskem.qc_flag_codec import CODE_FLAGS, FLAG_CODES
+from ocean_data_qc.fyskem.qc_flag_tuple import QcField
+from ocean_data_qc.fyskem.qc_flags import QcFlags
+
+
+def split_flags(quality_flag_long: pl.Expr) -> tuple[pl.Expr, pl.Expr, pl.Expr]:
+    """Return expressions for the incoming, automatic and manual parts."""
+    parts = quality_flag_long.str.split("_")
+    return tuple(parts.list.get(index, null_on_oob=True) for index in range(3))
+
+
+def highest_priority_flag(flags: pl.Expr) -> pl.Expr:
+    """
+    Return the flag with highest priority found in a string of flag characters.
+
+    Same ordering as QcFlag.key_function. A string without flags gives
+    NO_QUALITY_CONTROL.
+    """
+    return pl.coalesce(
+        *(
+            pl.when(flags.str.contains(value, literal=True)).then(pl.lit(value))
+            for value in QcFlag.priority()
+        ),
+        pl.lit(QcFlag.NO_QUALITY_CONTROL.value),
+    )
+
+
+def total_flag(quality_flag_long: pl.Expr) -> pl.Expr:
+    """
+    Return the total flag for quality_flag_long strings.
+
+    Same rule as QcFlags._update_total: a manual flag overrides everything, otherwise
+    the flag with highest priority among the incoming and automatic flags is used.
+    """
+    incoming, automatic, manual = split_flags(quality_flag_long)
+    no_qc = QcFlag.NO_QUALITY_CONTROL.value
+    return (
+        pl.when((manual != no_qc) & (manual != ""))
+        .then(manual)
+        .otherwise(highest_priority_flag(incoming + automatic))
+    )
+
+
+def with_total_flag(quality_flag_long: pl.Expr) -> pl.Expr:
+    """
+    Return quality_flag_long strings with an updated total flag.
+
+    Gives the same string as str(QcFlags.from_string(value)), including defaults for
+    empty parts.
+    """
+    incoming, automatic, manual = split_flags(quality_flag_long)
+    no_qc = QcFlag.NO_QUALITY_CONTROL.value
+    flags = pl.concat_str(
+        [
+            pl.when(incoming == "").then(pl.lit(no_qc)).otherwise(incoming),
+            pl.when(automatic == "")
+            .then(pl.lit(no_qc * len(QcField)))
+            .otherwise(automatic),
+            pl.when(manual == "").then(pl.lit(no_qc)).otherwise(manual),
+            total_flag(quality_flag_long),
+        ],
+        separator="_",
+    )
+    return pl.when(quality_flag_long == "").then(pl.lit(str(QcFlags()))).otherwise(flags)
+
+
+def automatic_flags(quality_flag_long: pl.Expr) -> pl.Expr:
+    """
+    Return the automatic part of quality_flag_long strings.
+
+    As in QcFlags.from_string, missing automatic flags are treated as no QC performed
+    for all fields.
+    """
+    _, automatic, _ = split_flags(quality_flag_long)
+    all_no_qc = pl.lit(QcFlag.NO_QUALITY_CONTROL.value * len(QcField))
+    return (
+        pl.when((quality_flag_long == "") | (automatic == ""))
+        .then(all_no_qc)
+        .otherwise(automatic)
+    )
+
+
+def total_automatic_source(
+    automatic: pl.Expr, total_automatic: pl.Expr
+) -> dict[QcField, pl.Expr]:
+    """
+    Return a boolean expression per QcField telling whether the field holds the total
+    automatic flag, same as QcFlags.total_automatic_source.
+
+    automatic is the automatic flags (see automatic_flags) and total_automatic the
+    highest priority flag among them. Pass them as columns to avoid evaluating them
+    once per field.
+    """
+    return {
+        field: automatic.str.slice(field.value, 1) == total_automatic for field in QcField
+    }
+
+
+def flag_code(flag: pl.Expr) -> pl.Expr:
+    """Return the integer code for flag characters, an empty flag is no QC performed."""
+    no_qc_code = FLAG_CODES[QcFlag.NO_QUALITY_CONTROL.value]
+    return flag.replace_strict(FLAG_CODES | {"": no_qc_code}, return_dtype=pl.UInt8)
+
+
+def code_flag(code: pl.Expr) -> pl.Expr:
+    """Return the flag character for integer codes."""
+    return code.replace_strict(CODE_FLAGS, return_dtype=pl.Utf8)
+
+
+def code_column(field: QcField) -> str:
+    """Return the name of the column holding the integer code for a QC field."""
+    return f"_code_AUTO_QC_{field.name}"
+
+
+def decode_quality_flags(data: pl.DataFrame | pl.LazyFrame):
+    """
+    Split quality_flag_long into INCOMING_QC, AUTO_QC, MANUAL_QC and TOTAL_QC and add
+    one integer code column per automatic QC field.
+    """
+    flags = pl.col("quality_flag_long").str.split("_")
+    automatic = flags.list.get(1)
+    return data.with_columns(
+        [
+            flags.list.get(0).alias("INCOMING_QC"),
+            automatic.alias("AUTO_QC"),
+            flags.list.get(2).alias("MANUAL_QC"),
+            flags.list.get(3).alias("TOTAL_QC"),
+            *(
+                flag_code(automatic.str.slice(field.value, 1)).alias(code_column(field))
+                for field in QcField
+            ),
+        ]
+    )
+
+
+def encoded_automatic_flags() -> pl.Expr:
+    """
+    Return the AUTO_QC string built from the integer code columns. Flags after the
+    known QC fields in AUTO_QC are kept.
+    """
+    return pl.concat_str(
+        [
+            *(code_flag(pl.col(code_column(field))) for field in QcField),
+            pl.col("AUTO_QC").str.slice(len(QcField)),
+        ]
+    )
+
+
+def encoded_quality_flag_long() -> pl.Expr:
+    """Return the quality_flag_long string built from the split and code columns."""
+    return pl.concat_str(
+        [
+            pl.col("INCOMING_QC"),
+            encoded_automatic_flags(),
+            pl.col("MANUAL_QC"),
+            pl.col("TOTAL_QC"),
+        ],
+        separator="_",
+    )
+
+
+def has_flag(flag: str | pl.Expr) -> pl.Expr:
+    """
+    Return whether the incoming, manual or total flag or any of the automatic flag
+    codes is flag. Compares the flag positions of the split and code columns instead of
+    searching the quality_flag_long string.
+    """
+    if isinstance(flag, str):
+        flag = pl.lit(flag)
+    return pl.any_horizontal(
+        pl.col("INCOMING_QC") == flag,
+        *(pl.col(code_column(field)) == flag_code(flag) for field in QcField),
+        pl.col("MANUAL_QC") == flag,
+        pl.col("TOTAL_QC") == flag,
+    )
+
+
+def encode_quality_flags(data: pl.DataFrame | pl.LazyFrame):
+    """
+    Write the integer code columns back to AUTO_QC and quality_flag_long and drop
+    the code columns.
+    """
+    return data.with_columns(
+        [
+            encoded_automatic_flags().alias("AUTO_QC"),
+            encoded_quality_flag_long().alias("quality_flag_long"),
+        ]
+    ).drop([code_column(field) for field in QcField])
@@ -24,6 +24,15 @@ class QcField(IntEnum):
     Dependency = 9
 
 
+# Flags by their code in the byte buffer of a QcFlagTuple, the order of QcFlag
+_FLAGS = tuple(QcFlag)
+_CODES = {flag: code for code, flag in enumerate(_FLAGS)}
+# Same values as accepted by QcFlag.parse
+_VALUE_CODES = {flag.value: code for flag, code in _CODES.items()} | {
+    "": _CODES[QcFlag.NO_QUALITY_CONTROL]
+}
+
+
 class QcFlagTuple:
     """
     A tuple of QcFlags where elements can be assigned.
@@ -32,63 +41,65 @@ class QcFlagTuple:
     Supports:
         - Assignment at any index (tuple grows dynamically)
         - Validation of elements
-        - Tuple-like methods (getitem, iter, len, eq, str, repr, getattr)
+        - Tuple-like methods (getitem, iter, len, eq, str, repr, count, index)
+
+    The flags are stored as one byte code per flag in a bytearray.
     """
 
+    __slots__ = ("_changes", "_codes")
+
     def __init__(self, *args, **kwargs):
-        inner_tuple = tuple(*args, **kwargs)
-        self._validate_new_elements(inner_tuple)
-        self._inner_tuple = tuple(self._convert(v) for v in inner_tuple)
+        self._codes = bytearray(self._convert(value) for value in tuple(*args, **kwargs))
+        # Number of assignments, lets the owner of the tuple cache values derived from it
+        self._changes = 0
 
-    def _convert(self, value):
+    @staticmethod
+    def _convert(value) -> int:
         if isinstance(value, QcFlag):
-            return value
+            return _CODES[value]
         if isinstance(value, int) or isinstance(value, str):
-            try:
-                return QcFlag.parse(str(value))
-            except Exception as e:
-                raise errors.QcFlagTupleError(f"Invalid QC flag value: {value!r}") from e
+            code = _VALUE_CODES.get(str(value))
+            if code is None:
+                raise errors.QcFlagTupleError(f"Invalid QC flag value: {value!r}")
+            return code
         raise errors.QcFlagTupleError(f"Invalid element type: {value!r}")
 
-    def _validate_new_elements(self, seq):
-        for v in seq:
-            try:
-                self._convert(v)
-            except errors.QcFlagTupleError as e:
-                raise errors.QcFlagTupleError(
-                    f"Validation failed for value: {v!r}"
-                ) from e
-
     def __getitem__(self, item):
-        return self._inner_tuple[item]
+        if isinstance(item, slice):
+            return tuple(_FLAGS[code] for code in self._codes[item])
+        return _FLAGS[self._codes[item]]
 
     def __setitem__(self, index, value):
-        lst = list(self._inner_tuple)
-
-        if index >= len(lst):
-            extension = [QcFlag.NO_QUALITY_CONTROL] * (index - len(lst) + 1)
-            lst.extend(extension)
+        code = self._convert(value)
 
-        lst[index] = self._convert(value)
+        if index >= len(self._codes):
+            self._codes.extend(
+                bytes([_CODES[QcFlag.NO_QUALITY_CONTROL]])
+                * (index - len(self._codes) + 1)
+            )
 
-        self._validate_new_elements(lst)
-
-        self._inner_tuple = tuple(lst)
+        self._codes[index] = code
+        self._changes += 1
 
     def __iter__(self):
-        return iter(self._inner_tuple)
+        return map(_FLAGS.__getitem__, self._codes)
 
     def __len__(self):
-        return len(self._inner_tuple)
+        return len(self._codes)
 
     def __eq__(self, other):
-        return self._inner_tuple == other
+        if isinstance(other, QcFlagTuple):
+            return self._codes == other._codes
+        return tuple(self) == other
+
+    def count(self, value) -> int:
+        return tuple(self).count(value)
 
-    def __getattr__(self, name):
-        return getattr(self._inner_tuple, name)
+    def index(self, value, *args) -> int:
+        return tuple(self).index(value, *args)
 
     def __str__(self):
-        return "".join(flag.value for flag in self._inner_tuple)
+        return "".join(_FLAGS[code].value for code in self._codes)
 
     def __repr__(self):
-        return f"{self.__class__.__name__}({self._inner_tuple!r})"
+        return f"{self.__class__.__name__}({tuple(self)!r})"
@@ -1,26 +1,35 @@
-from dataclasses import dataclass, field
 from typing import Sequence
 
+from ocean_data_qc.fyskem import qc_flag_codec
 from ocean_data_qc.fyskem.qc_flag import QcFlag
 from ocean_data_qc.fyskem.qc_flag_tuple import QcField, QcFlagTuple
 
 
-@dataclass
 class QcFlags:
-    _incoming: QcFlag = QcFlag.NO_QUALITY_CONTROL
-    _automatic: QcFlagTuple = field(
-        default_factory=lambda: QcFlagTuple((QcFlag.NO_QUALITY_CONTROL,) * len(QcField))
-    )
-    _manual: QcFlag = QcFlag.NO_QUALITY_CONTROL
-    _total: QcFlag = QcFlag.NO_QUALITY_CONTROL
-
-    def __post_init__(self):
-        self._incoming = self._incoming or QcFlag.NO_QUALITY_CONTROL
-        self._automatic = self._automatic or QcFlagTuple(
-            (QcFlag.NO_QUALITY_CONTROL,) * len(QcField)
-        )
-        self._manual = self._manual or QcFlag.NO_QUALITY_CONTROL
-        self._update_total()
+    """
+    The incoming, automatic and manual flags of a value and its total flag.
+
+    The total flag is calculated when read and kept until any of the flags change.
+    """
+
+    __slots__ = ("_automatic", "_incoming", "_manual", "_total", "_total_changes")
+
+    def __init__(
+        self,
+        _incoming: QcFlag = QcFlag.NO_QUALITY_CONTROL,
+        _automatic: QcFlagTuple | None = None,
+        _manual: QcFlag = QcFlag.NO_QUALITY_CONTROL,
+        _total: QcFlag = QcFlag.NO_QUALITY_CONTROL,
+    ):
+        # The total is always calculated from the other flags
+        self._incoming = _incoming or QcFlag.NO_QUALITY_CONTROL
+        if not _automatic:
+            _automatic = QcFlagTuple((QcFlag.NO_QUALITY_CONTROL,) * len(QcField))
+        elif not isinstance(_automatic, QcFlagTuple):
+            _automatic = QcFlagTuple(_automatic)
+        self._automatic = _automatic
+        self._manual = _manual or QcFlag.NO_QUALITY_CONTROL
+        self._total = None
 
     def get_field(self, field_name: QcField):
         return self.automatic[field_name]
@@ -35,7 +44,7 @@ class QcFlags:
     @incoming.setter
     def incoming(self, value: QcFlag):
         self._incoming = value
-        self._update_total()
+        self._total = None
 
     @property
     def automatic(self) -> QcFlagTuple:
@@ -44,7 +53,7 @@ class QcFlags:
     @automatic.setter
     def automatic(self, value: Sequence):
         self._automatic = QcFlagTuple(value)
-        self._update_total()
+        self._total = None
 
     @property
     def total_automatic(self) -> QcFlag:
@@ -77,13 +86,17 @@ class QcFlags:
     @manual.setter
     def manual(self, value: QcFlag):
         self._manual = value
-        self._update_total()
+        self._total = None
 
     @property
     def total(self) -> QcFlag:
+        # Flags assigned in place in the automatic tuple also invalidate the total
+        if self._total is None or self._total_changes != self._automatic._changes:
+            self._update_total()
         return self._total
 
     def _update_total(self):
+        self._total_changes = self._automatic._changes
         if self.manual != QcFlag.NO_QUALITY_CONTROL:
             self._total = self.manual
             return
@@ -96,6 +109,24 @@ class QcFlags:
             default=QcFlag.NO_QUALITY_CONTROL,
         )
 
+    def __eq__(self, other):
+        if not isinstance(other, QcFlags):
+            return NotImplemented
+        return (self.incoming, self.automatic, self.manual) == (
+            other.incoming,
+            other.automatic,
+            other.manual,
+        )
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(_incoming={self.incoming!r}, "
+            f"_automatic={self.automatic!r}, _manual={self.manual!r}, "
+            f"_total={self.total!r})"
+        )
+
     def __str__(self):
         return (
             f"{self.incoming.value}_"
@@ -113,12 +144,22 @@ class QcFlags:
 
         incoming = QcFlag.parse(incoming)
 
-        automatic = QcFlagTuple(QcFlag.parse(flag) for flag in automatic)
+        automatic = QcFlagTuple(automatic)
 
         manual = QcFlag.parse(manual)
 
         return cls(incoming, automatic, manual)
 
+    @property
+    def packed(self) -> int:
+        """The flags packed to an integer, see qc_flag_codec."""
+        return qc_flag_codec.pack(self.incoming, self.automatic, self.manual, self.total)
+
+    @classmethod
+    def from_packed(cls, value: int):
+        incoming, automatic, manual, _ = qc_flag_codec.unpack(value)
+        return cls(incoming, QcFlagTuple(automatic), manual)
+
 
 if __name__ == "__main__":
     qcflags = QcFlags().from_string("0_0400400000_0_0")
@@ -0,0 +1,53 @@
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+import polars as pl
+
+
+@dataclass(frozen=True)
+class QcTiming:
+    """
+    Timing of one step in the automatic QC.
+
+    step is the name of the QC category class, "_update_total" or "total_flag_info".
+    parameter is set for the check of a single parameter in a category and is None for
+    the whole step. Values that are not known are None, such as the number of rows when
+    running lazily and the seconds of a single parameter, since a category checks all
+    its parameters at once.
+    """
+
+    step: str
+    parameter: Optional[str]
+    seconds: Optional[float]
+    rows_selected: Optional[int] = None
+    rows_updated: Optional[int] = None
+    rows_before: Optional[int] = None
+    rows_after: Optional[int] = None
+    size_before: Optional[int] = None
+    size_after: Optional[int] = None
+
+
+class QcTimingCollector:
+    """Hook for FysKemQc that keeps all timings."""
+
+    def __init__(self):
+        self.timings: list[QcTiming] = []
+
+    def __call__(self, timing: QcTiming):
+        self.timings.append(timing)
+
+    def to_dataframe(self) -> pl.DataFrame:
+        return pl.DataFrame(
+            [asdict(timing) for timing in self.timings],
+            schema={
+                "step": pl.Utf8,
+                "parameter": pl.Utf8,
+                "seconds": pl.Float64,
+                "rows_selected": pl.Int64,
+                "rows_updated": pl.Int64,
+                "rows_before": pl.Int64,
+                "rows_after": pl.Int64,
+                "size_before": pl.Int64,
+                "size_after": pl.Int64,
+            },
+        )
@@ -15,7 +15,12 @@ class QuantificationLimitQc(BaseQcCategory):
         )
 
     def check(self, parameter, configuration: QuantificationLimitCheck):
+        self.check_parameters({parameter: configuration})
+
+    def check_parameters(self, configurations: dict[str, QuantificationLimitCheck]):
         """
+        Check all parameters in one query with their limits joined to each row.
+
         BELOW_QUANTIFICATION:
             - everything below quantification limit
             and
@@ -26,26 +31,23 @@ class QuantificationLimitQc(BaseQcCategory):
             and
             - at quantification limit with incoming flag GOOD_DATA
         """
-        if "LMQNT_VAL" not in self._data.columns:
+        if not self._has_column("LMQNT_VAL"):
             self._data = self._data.with_columns(
                 pl.lit(None).cast(pl.Float64).alias("LMQNT_VAL")
             )
 
-        self._parameter = parameter
-        selection = self._data.filter(
-            (pl.col("parameter") == parameter) & pl.col("value").is_not_null()
+        selection = self._join_thresholds(
+            self._data.filter(pl.col("value").is_not_null()), configurations
         )
 
-        if selection.is_empty():
+        if self._is_empty(selection):
             return
 
-        result_expr = self._apply_flagging_logic(configuration)
+        result_expr = self._apply_flagging_logic()
         # Update original dataframe with qc results
         self.update_dataframe(selection=selection, result_expr=result_expr)
 
-    def _apply_flagging_logic(
-        self, configuration: QuantificationLimitCheck
-    ) -> pl.DataFrame:
+    def _apply_flagging_logic(self) -> pl.DataFrame:
         """
         Apply flagging logic for value in comparison to given lmqnt limit.
         """
@@ -56,15 +58,13 @@ class QuantificationLimitQc(BaseQcCategory):
                 & (pl.col("value") > pl.col("LMQNT_VAL"))
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.GOOD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "GOOD value {} > quantification limit {}",
-                            pl.col("value").round(3),
-                            pl.col("LMQNT_VAL").round(3),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.GOOD_VALUE.value)),
+                    pl.format(
+                        "GOOD value {} > quantification limit {}",
+                        pl.col("value").round(3),
+                        pl.col("LMQNT_VAL").round(3),
+                    ),
                 )
             )
             .when(
@@ -76,15 +76,13 @@ class QuantificationLimitQc(BaseQcCategory):
                 )
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.GOOD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "GOOD value {} at quantification limit {}",
-                            pl.col("value").round(3),
-                            pl.col("LMQNT_VAL").round(3),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.GOOD_VALUE.value)),
+                    pl.format(
+                        "GOOD value {} at quantification limit {}",
+                        pl.col("value").round(3),
+                        pl.col("LMQNT_VAL").round(3),
+                    ),
                 )
             )
             .when(
@@ -104,36 +102,32 @@ class QuantificationLimitQc(BaseQcCategory):
                 )
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(
-                            str(QcFlag.VALUE_BELOW_LIMIT_OF_QUANTIFICATION.value)
-                        ).alias("flag"),
-                        pl.format(
-                            "BELOW_QUANTIFICATION {} <= {}",
-                            pl.col("value").round(3),
-                            pl.col("LMQNT_VAL").round(3),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.VALUE_BELOW_LIMIT_OF_QUANTIFICATION.value)),
+                    pl.format(
+                        "BELOW_QUANTIFICATION {} <= {}",
+                        pl.col("value").round(3),
+                        pl.col("LMQNT_VAL").round(3),
+                    ),
                 )
             )
-            .when(pl.col("LMQNT_VAL").is_null() & (pl.col("value") > configuration.limit))
+            .when(
+                pl.col("LMQNT_VAL").is_null() & (pl.col("value") > pl.col("check_limit"))
+            )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.GOOD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "GOOD value {} > quantification limit {}",
-                            pl.col("value").round(2),
-                            pl.lit(configuration.limit),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.GOOD_VALUE.value)),
+                    pl.format(
+                        "GOOD value {} > quantification limit {}",
+                        pl.col("value").round(2),
+                        pl.col("check_limit_text"),
+                    ),
                 )
             )
             .when(
                 (
                     pl.col("LMQNT_VAL").is_null()
-                    & (pl.col("value") == configuration.limit)
+                    & (pl.col("value") == pl.col("check_limit"))
                     & (
                         (pl.col("INCOMING_QC") == QcFlag.GOOD_VALUE.value)
                         | (pl.col("INCOMING_QC") == QcFlag.PROBABLY_GOOD_VALUE.value)
@@ -141,29 +135,23 @@ class QuantificationLimitQc(BaseQcCategory):
                 )
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.GOOD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "GOOD value {} at quantification limit {}",
-                            pl.col("value").round(2),
-                            pl.lit(configuration.limit),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.GOOD_VALUE.value)),
+                    pl.format(
+                        "GOOD value {} at quantification limit {}",
+                        pl.col("value").round(2),
+                        pl.col("check_limit_text"),
+                    ),
                 )
             )
             .otherwise(
-                pl.struct(
-                    [
-                        pl.lit(
-                            str(QcFlag.VALUE_BELOW_LIMIT_OF_QUANTIFICATION.value)
-                        ).alias("flag"),
-                        pl.format(
-                            "BELOW_QUANTIFICATION {} <= {}",
-                            pl.col("value"),
-                            pl.lit(configuration.limit),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.VALUE_BELOW_LIMIT_OF_QUANTIFICATION.value)),
+                    pl.format(
+                        "BELOW_QUANTIFICATION {} <= {}",
+                        pl.col("value"),
+                        pl.col("check_limit_text"),
+                    ),
                 )
             )
         )
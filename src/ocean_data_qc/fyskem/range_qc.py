@@ -11,60 +11,53 @@ class RangeQc(BaseQcCategory):
         super().__init__(data, QcField.Range, f"AUTO_QC_{QcField.Range.name}")
 
     def check(self, parameter: str, configuration: RangeCheck):
-        self._parameter = parameter
-        parameter_boolean = pl.col("parameter") == parameter
-        # Early exit if nothing matches
-        if self._data.filter(parameter_boolean).is_empty():
+        self.check_parameters({parameter: configuration})
+
+    def check_parameters(self, configurations: dict[str, RangeCheck]):
+        """Check all parameters in one query with their ranges joined to each row."""
+        selection = self._join_thresholds(self._data, configurations)
+        if self._is_empty(selection):
             return
-        selection = self._data.filter(parameter_boolean)
-        result_expr = self._apply_flagging_logic(configuration)
+        result_expr = self._apply_flagging_logic()
         # Update original dataframe with qc results
         self.update_dataframe(selection=selection, result_expr=result_expr)
 
-    def _apply_flagging_logic(self, configuration: RangeCheck) -> pl.DataFrame:
+    def _apply_flagging_logic(self) -> pl.DataFrame:
         """
         Apply flagging logic for value vs. summation deviation test using polars.
         """
-        min_val = float(configuration.min_range_value)
-        max_val = float(configuration.max_range_value)
+        min_val = pl.col("check_min_range_value")
+        max_val = pl.col("check_max_range_value")
 
         result_expr = (
             pl.when(pl.col("value").is_null() | pl.col("value").is_nan())
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.MISSING_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "MISSING no value for {}", pl.lit(self._parameter)
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.MISSING_VALUE.value)),
+                    pl.format("MISSING no value for {}", pl.col("parameter")),
                 )
             )
             .when((pl.col("value") >= min_val) & (pl.col("value") <= max_val))
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.GOOD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "GOOD {} in range {} - {}",
-                            pl.col("value"),
-                            pl.lit(min_val),
-                            pl.lit(max_val),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.GOOD_VALUE.value)),
+                    pl.format(
+                        "GOOD {} in range {} - {}",
+                        pl.col("value"),
+                        min_val,
+                        max_val,
+                    ),
                 )
             )
             .otherwise(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.BAD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "BAD {} out of range {} - {}",
-                            pl.col("value"),
-                            pl.lit(min_val),
-                            pl.lit(max_val),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.BAD_VALUE.value)),
+                    pl.format(
+                        "BAD {} out of range {} - {}",
+                        pl.col("value"),
+                        min_val,
+                        max_val,
+                    ),
                 )
             )
         )
@@ -1,55 +1,52 @@
 import polars as pl
 
 from ocean_data_qc.fyskem.base_qc_category import BaseQcCategory
+from ocean_data_qc.fyskem.profile_view import ProfileView
 from ocean_data_qc.fyskem.qc_checks import RepeatedValueCheck
 from ocean_data_qc.fyskem.qc_flag import QcFlag
 from ocean_data_qc.fyskem.qc_flag_tuple import QcField
 
 
 class RepeatedValueQc(BaseQcCategory):
-    def __init__(self, data):
+    uses_profiles = True
+
+    def __init__(self, data, profiles: ProfileView | None = None):
         super().__init__(
             data,
             QcField.RepeatedValue,
             f"AUTO_QC_{QcField.RepeatedValue.name}",
+            profiles,
         )
 
     def check(self, parameter: str, configuration: RepeatedValueCheck):
+        self.check_parameters({parameter: configuration})
+
+    def check_parameters(self, configurations: dict[str, RepeatedValueCheck]):
         """
         This aims only to check for manual errors, therefore we look
         at the profile without blanks/none/nan.
         GOOD_DATA: first occurrence of a value
         PROBABLY_GOOD_DATA: repeated occurrence of a value
         """
-        self._parameter = parameter
-        parameter_boolean = pl.col("parameter") == parameter
-
-        # Early exit if nothing matches
-        if self._data.filter(parameter_boolean).is_empty():
-            return
-
-        # Difference per group (other parameters only)
+        # Difference to the previous value in the profile
         difference_expr = (
             pl.when(pl.col("value").is_not_null())
-            .then(
-                pl.col("value")
-                - pl.col("value").fill_null(strategy="forward").shift(1).over("visit_key")
-            )
+            .then(pl.col("value") - pl.col("prev_value"))
             .otherwise(None)
             .alias("difference")
         )
 
-        selection = (
-            self._data.filter(parameter_boolean)
-            .sort(["visit_key", "DEPH"])
-            .with_columns(difference_expr)
-        )
+        selection = self._join_thresholds(
+            self._profile_selection(configurations), configurations
+        ).with_columns(difference_expr)
+        if self._is_empty(selection):
+            return
 
-        result_expr = self._apply_flagging_logic(configuration)
+        result_expr = self._apply_flagging_logic()
         # Update original dataframe with qc results
         self.update_dataframe(selection=selection, result_expr=result_expr)
 
-    def _apply_flagging_logic(self, configuration: RepeatedValueCheck) -> pl.DataFrame:
+    def _apply_flagging_logic(self) -> pl.DataFrame:
         """
         Apply flagging logic for repeated value test using polars.
         """
@@ -58,43 +55,35 @@ class RepeatedValueQc(BaseQcCategory):
         result_expr = (
             pl.when(pl.col("value").is_null() | pl.col("value").is_nan())
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.MISSING_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "MISSING value not found for {}", pl.lit(self._parameter)
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.MISSING_VALUE.value)),
+                    pl.format("MISSING value not found for {}", pl.col("parameter")),
                 )
             )
             .when(
                 (
-                    (pl.col("difference") != configuration.repeated_value)
+                    (pl.col("difference") != pl.col("check_repeated_value"))
                     | pl.col("difference").is_null()
                 )
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.GOOD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "GOOD change from previous depth {} is > {}",
-                            pl.col("difference").round(2),
-                            pl.lit(configuration.repeated_value),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.GOOD_VALUE.value)),
+                    pl.format(
+                        "GOOD change from previous depth {} is > {}",
+                        pl.col("difference").round(2),
+                        pl.col("check_repeated_value_text"),
+                    ),
                 )
             )
             .otherwise(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.PROBABLY_GOOD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "PROBABLY GOOD value. The value {} is identical to the "
-                            "value at the sampled depth above.",
-                            pl.col("value"),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.PROBABLY_GOOD_VALUE.value)),
+                    pl.format(
+                        "PROBABLY GOOD value. The value {} is identical to the "
+                        "value at the sampled depth above.",
+                        pl.col("value"),
+                    ),
                 )
             )
         )
@@ -1,16 +1,22 @@
 import polars as pl
 
 from ocean_data_qc.fyskem.base_qc_category import BaseQcCategory
+from ocean_data_qc.fyskem.profile_view import ProfileView, profile_shift
 from ocean_data_qc.fyskem.qc_checks import SpikeCheck
 from ocean_data_qc.fyskem.qc_flag import QcFlag
 from ocean_data_qc.fyskem.qc_flag_tuple import QcField
 
 
 class SpikeQc(BaseQcCategory):
-    def __init__(self, data):
-        super().__init__(data, QcField.Spike, f"AUTO_QC_{QcField.Spike.name}")
+    uses_profiles = True
+
+    def __init__(self, data, profiles: ProfileView | None = None):
+        super().__init__(data, QcField.Spike, f"AUTO_QC_{QcField.Spike.name}", profiles)
 
     def check(self, parameter: str, configuration: SpikeCheck):
+        self.check_parameters({parameter: configuration})
+
+    def check_parameters(self, configurations: dict[str, SpikeCheck]):
         """
         check som kollar förändring relativt föregående djup och nästa djup.
         Förändringen här definieras som delta enlig QARTOD spike test.
@@ -20,30 +26,21 @@ class SpikeQc(BaseQcCategory):
             BAD DATA CORRECTABLE: om threshold high > förändringen > threshold low.
             BAD_DATA: om förändringen är > threshold high-
         """
-        self._parameter = parameter
-        parameter_boolean = pl.col("parameter") == parameter
-
-        # Early exit if nothing matches
-        if self._data.filter(parameter_boolean).is_empty():
-            return
-        self._threshold_high = configuration.threshold_high
-        selection = self._data.filter(
-            parameter_boolean
-            & pl.col("value").is_not_null()
-            & (pl.col("TOTAL_QC") != "4")
+        selection = self._profile_selection(configurations).filter(
+            pl.col("value").is_not_null() & (pl.col("TOTAL_QC") != "4")
         )
+        # The neighbours are taken among the selected rows only
         selection = (
-            selection.sort(["visit_key", "DEPH"])
-            .with_columns(
+            selection.with_columns(
                 [
-                    pl.col("value").shift(1).over("visit_key").alias("prev_value"),
-                    pl.col("value").shift(-1).over("visit_key").alias("next_value"),
-                    pl.col("value").shift(2).over("visit_key").alias("prev2_value"),
-                    pl.col("value").shift(-2).over("visit_key").alias("next2_value"),
-                    pl.col("DEPH").shift(1).over("visit_key").alias("prev_deph"),
-                    pl.col("DEPH").shift(-1).over("visit_key").alias("next_deph"),
-                    pl.col("DEPH").shift(2).over("visit_key").alias("prev2_deph"),
-                    pl.col("DEPH").shift(-2).over("visit_key").alias("next2_deph"),
+                    profile_shift("value", 1).alias("prev_value"),
+                    profile_shift("value", -1).alias("next_value"),
+                    profile_shift("value", 2).alias("prev2_value"),
+                    profile_shift("value", -2).alias("next2_value"),
+                    profile_shift("DEPH", 1).alias("prev_deph"),
+                    profile_shift("DEPH", -1).alias("next_deph"),
+                    profile_shift("DEPH", 2).alias("prev2_deph"),
+                    profile_shift("DEPH", -2).alias("next2_deph"),
                 ]
             )
             .with_columns(
@@ -88,11 +85,15 @@ class SpikeQc(BaseQcCategory):
             )
         )
 
-        result_expr = self._apply_flagging_logic(configuration)
+        selection = self._join_thresholds(selection, configurations)
+        if self._is_empty(selection):
+            return
+
+        result_expr = self._apply_flagging_logic()
         # Update original dataframe with qc results
         self.update_dataframe(selection=selection, result_expr=result_expr)
 
-    def _apply_flagging_logic(self, configuration: SpikeCheck) -> pl.DataFrame:
+    def _apply_flagging_logic(self) -> pl.DataFrame:
         """
         Apply flagging logic for delta (spike) check.
         """
@@ -104,60 +105,54 @@ class SpikeQc(BaseQcCategory):
         result_expr = (
             pl.when(
                 (
-                    (pl.col("delta") < configuration.threshold_high)
-                    & (pl.col("delta") >= configuration.threshold_low)
-                    & (pl.col("rate_of_change") <= configuration.rate_of_change)
+                    (pl.col("delta") < pl.col("check_threshold_high"))
+                    & (pl.col("delta") >= pl.col("check_threshold_low"))
+                    & (pl.col("rate_of_change") <= pl.col("check_rate_of_change"))
                 )
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.PROBABLY_BAD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "BAD DATA CORRECTABLE: threshold_high > spike >= threshold_low. {} > {} >= {}. Previous {}, Next {}, rate_of_change {}",  # noqa: E501
-                            configuration.threshold_high,
-                            pl.col("delta").round(2),
-                            configuration.threshold_low,
-                            pl.col("prev_value").round(2),
-                            pl.col("next_value").round(2),
-                            pl.col("rate_of_change").round(2),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.PROBABLY_BAD_VALUE.value)),
+                    pl.format(
+                        "BAD DATA CORRECTABLE: threshold_high > spike >= threshold_low. {} > {} >= {}. Previous {}, Next {}, rate_of_change {}",  # noqa: E501
+                        pl.col("check_threshold_high_text"),
+                        pl.col("delta").round(2),
+                        pl.col("check_threshold_low_text"),
+                        pl.col("prev_value").round(2),
+                        pl.col("next_value").round(2),
+                        pl.col("rate_of_change").round(2),
+                    ),
                 )
             )
             .when(
-                (pl.col("delta") >= configuration.threshold_high)
-                & (pl.col("rate_of_change") <= configuration.rate_of_change)
+                (pl.col("delta") >= pl.col("check_threshold_high"))
+                & (pl.col("rate_of_change") <= pl.col("check_rate_of_change"))
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.BAD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "BAD DATA: spike >= threshold_high. {} >= {}. Previous {}, Next {}, rate_of_change {}",  # noqa: E501
-                            pl.col("delta").round(2),
-                            configuration.threshold_high,
-                            pl.col("prev_value").round(2),
-                            pl.col("next_value").round(2),
-                            pl.col("rate_of_change").round(2),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.BAD_VALUE.value)),
+                    pl.format(
+                        "BAD DATA: spike >= threshold_high. {} >= {}. Previous {}, Next {}, rate_of_change {}",  # noqa: E501
+                        pl.col("delta").round(2),
+                        pl.col("check_threshold_high_text"),
+                        pl.col("prev_value").round(2),
+                        pl.col("next_value").round(2),
+                        pl.col("rate_of_change").round(2),
+                    ),
                 )
             )
             .otherwise(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.GOOD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "GOOD DATA: spike < threshold_low. {} < {}. Rate of change {}.Tested values: {}, {}, {}",  # noqa: E501,
-                            pl.col("delta").round(2),
-                            configuration.threshold_low,
-                            pl.col("rate_of_change").round(2),
-                            pl.col("prev_value").round(2),
-                            pl.col("value").round(2),
-                            pl.col("next_value").round(2),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.GOOD_VALUE.value)),
+                    pl.format(
+                        "GOOD DATA: spike < threshold_low. {} < {}. Rate of change {}.Tested values: {}, {}, {}",  # noqa: E501,
+                        pl.col("delta").round(2),
+                        pl.col("check_threshold_low_text"),
+                        pl.col("rate_of_change").round(2),
+                        pl.col("prev_value").round(2),
+                        pl.col("value").round(2),
+                        pl.col("next_value").round(2),
+                    ),
                 )
             )
         )
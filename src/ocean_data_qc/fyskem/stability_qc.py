@@ -1,123 +1,110 @@
 import polars as pl
 
 from ocean_data_qc.fyskem.base_qc_category import BaseQcCategory
+from ocean_data_qc.fyskem.profile_view import ProfileView
 from ocean_data_qc.fyskem.qc_checks import StabilityCheck
 from ocean_data_qc.fyskem.qc_flag import QcFlag
 from ocean_data_qc.fyskem.qc_flag_tuple import QcField
 
 
 class StabilityQc(BaseQcCategory):
-    def __init__(self, data):
+    uses_profiles = True
+
+    def __init__(self, data, profiles: ProfileView | None = None):
         super().__init__(
             data,
             QcField.Stability,
             f"AUTO_QC_{QcField.Stability.name}",
+            profiles,
         )
 
     def check(self, parameter: str, configuration: StabilityCheck):
+        self.check_parameters({parameter: configuration})
+
+    def check_parameters(self, configurations: dict[str, StabilityCheck]):
         """
         Beräknar förändring i densitet mellan två på varandra följande djup
         GOOD_DATA: om förändring ligger mellan allowed_increase och allowed_decrease
         BAD_DATA: om förändring ligger utanför intervallet
         """
-        # self._parameter = parameter
-        # parameter_boolean = pl.col("parameter") == parameter
-        #
-
-        self._parameter = parameter
-        selection = (
-            self._data.filter(
-                (pl.col("parameter") == parameter) & pl.col("value").is_not_null()
-            )
-            .sort(["visit_key", "DEPH"])
-            .with_columns(
-                [(pl.col("value").diff().over("visit_key")).alias("difference")]
-            )
-        )
-        if selection.is_empty():
+        selection = self._join_thresholds(
+            self._profile_selection(configurations).filter(pl.col("value").is_not_null()),
+            configurations,
+        ).with_columns([(pl.col("value") - pl.col("prev_value")).alias("difference")])
+        if self._is_empty(selection):
             return
 
-        result_expr = self._apply_flagging_logic(configuration=configuration)
+        result_expr = self._apply_flagging_logic()
         # Update original dataframe with qc results
         self.update_dataframe(selection=selection, result_expr=result_expr)
 
-    def _apply_flagging_logic(self, configuration: StabilityCheck) -> pl.DataFrame:
+    def _apply_flagging_logic(self) -> pl.DataFrame:
         """
         Apply flagging logic for stability test using polars.
         """
         # Create the flag + info struct logic
         result_expr = (
-            pl.when((pl.col("difference") < configuration.bad_decrease))
+            pl.when((pl.col("difference") < pl.col("check_bad_decrease")))
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.BAD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "BAD, instable profile, decrease of {} is larger than the "
-                            "allowed limit {} kg/m3",
-                            pl.col("difference").round(4),
-                            pl.lit(configuration.bad_decrease),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.BAD_VALUE.value)),
+                    pl.format(
+                        "BAD, instable profile, decrease of {} is larger than the "
+                        "allowed limit {} kg/m3",
+                        pl.col("difference").round(4),
+                        pl.col("check_bad_decrease_text"),
+                    ),
                 )
             )
             .when(
-                (pl.col("difference") < configuration.probably_bad_decrease)
-                & (pl.col("difference") >= configuration.bad_decrease)
+                (pl.col("difference") < pl.col("check_probably_bad_decrease"))
+                & (pl.col("difference") >= pl.col("check_bad_decrease"))
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.PROBABLY_BAD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "PROBABLY BAD, instable profile, decrease of {} is between:"
-                            "{} and {} kg/m3",
-                            pl.col("difference").round(4),
-                            pl.lit(configuration.probably_bad_decrease),
-                            pl.lit(configuration.bad_decrease),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.PROBABLY_BAD_VALUE.value)),
+                    pl.format(
+                        "PROBABLY BAD, instable profile, decrease of {} is between:"
+                        "{} and {} kg/m3",
+                        pl.col("difference").round(4),
+                        pl.col("check_probably_bad_decrease_text"),
+                        pl.col("check_bad_decrease_text"),
+                    ),
                 )
             )
             .when(
-                (pl.col("difference") < configuration.probably_good_decrease)
-                & (pl.col("difference") >= configuration.probably_bad_decrease)
+                (pl.col("difference") < pl.col("check_probably_good_decrease"))
+                & (pl.col("difference") >= pl.col("check_probably_bad_decrease"))
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.PROBABLY_GOOD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "PROBABLY GOOD, instable profile, decrease of {} is between:"
-                            "{} and {} kg/m3",
-                            pl.col("difference").round(4),
-                            pl.lit(configuration.probably_good_decrease),
-                            pl.lit(configuration.probably_bad_decrease),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.PROBABLY_GOOD_VALUE.value)),
+                    pl.format(
+                        "PROBABLY GOOD, instable profile, decrease of {} is between:"
+                        "{} and {} kg/m3",
+                        pl.col("difference").round(4),
+                        pl.col("check_probably_good_decrease_text"),
+                        pl.col("check_probably_bad_decrease_text"),
+                    ),
                 )
             )
-            .when((pl.col("difference") >= configuration.probably_good_decrease))
+            .when((pl.col("difference") >= pl.col("check_probably_good_decrease")))
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.GOOD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "GOOD, stable profile, change of {} kg/m3 is acceptable",
-                            pl.col("difference").round(4),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.GOOD_VALUE.value)),
+                    pl.format(
+                        "GOOD, stable profile, change of {} kg/m3 is acceptable",
+                        pl.col("difference").round(4),
+                    ),
                 )
             )
             .otherwise(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.NO_QUALITY_CONTROL.value)).alias("flag"),
-                        pl.format(
-                            "Difference is {} e.g. first depth with value at visit",
-                            pl.col("difference").round(4),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.NO_QUALITY_CONTROL.value)),
+                    pl.format(
+                        "Difference is {} e.g. first depth with value at visit",
+                        pl.col("difference").round(4),
+                    ),
                 )
             )
         )
@@ -1,7 +1,7 @@
 import polars as pl
 
 from ocean_data_qc.fyskem.base_qc_category import BaseQcCategory
-from ocean_data_qc.fyskem.qc_checks import StatisticCheck
+from ocean_data_qc.fyskem.qc_checks import THRESHOLD_COLUMNS, StatisticCheck
 from ocean_data_qc.fyskem.qc_flag import QcFlag
 from ocean_data_qc.fyskem.qc_flag_tuple import QcField
 
@@ -17,29 +17,52 @@ class StatisticQc(BaseQcCategory):
         parameter_boolean = pl.col("parameter") == parameter
 
         # Early exit if nothing matches
-        if self._data.filter(parameter_boolean).is_empty():
+        if self._is_empty(self._data.filter(parameter_boolean)):
             return
 
+        # Each row is matched to the depth bin with the closest bin_min_depth at or
+        # below DEPH in its sea basin and month, and gets the thresholds of the
+        # statistics row used for that bin. The bins come from the threshold grid, so
+        # overlapping depth intervals use the first matching row as in
+        # get_thresholds. Rows outside all bins are dropped and keep flag 0.
+        thresholds = (
+            configuration.threshold_grid.depth_bins()
+            .lazy()
+            .with_columns(pl.col("month").cast(pl.Int32))
+            .join(
+                configuration.data.lazy()
+                .with_row_index("statistics_row")
+                .select(pl.col("statistics_row").cast(pl.Int64), *THRESHOLD_COLUMNS),
+                on="statistics_row",
+            )
+            .sort("bin_min_depth")
+        )
         selection = (
             self._data.lazy()
-            .filter(pl.col("parameter") == parameter)
-            .with_columns(pl.col("visit_month").cast(pl.Int32))
-            .join(
-                configuration.data.lazy(),
-                left_on=["sea_basin", "visit_month"],
-                right_on=["sea_basin", "month"],
-                how="left",
+            .filter((pl.col("parameter") == parameter) & pl.col("DEPH").is_not_null())
+            .with_columns(
+                pl.col("visit_month").cast(pl.Int32),
+                pl.col("DEPH").cast(pl.Float64).alias("statistic_depth"),
             )
-            .filter(
-                (pl.col("DEPH") >= pl.col("min_depth"))
-                & (pl.col("DEPH") < pl.col("max_depth"))
+            .sort("statistic_depth")
+            .join_asof(
+                thresholds,
+                left_on="statistic_depth",
+                right_on="bin_min_depth",
+                by_left=["sea_basin", "visit_month"],
+                by_right=["sea_basin", "month"],
+                strategy="backward",
+                # Both sides are sorted on the depth above
+                check_sortedness=False,
             )
-            .collect()
+            .filter(pl.col("DEPH") < pl.col("bin_max_depth"))
         )
+        if not self._lazy:
+            selection = selection.collect()
 
         result_expr = self._apply_flagging_logic(configuration)
         # Update original dataframe with qc results
-        self.update_dataframe(selection=selection.clone(), result_expr=result_expr)
+        self.update_dataframe(selection=selection, result_expr=result_expr)
 
     def _apply_flagging_logic(self, configuration: StatisticCheck) -> pl.DataFrame:
         """
@@ -48,13 +71,9 @@ class StatisticQc(BaseQcCategory):
         result_expr = (
             pl.when(pl.col("value").is_null() | pl.col("value").is_nan())
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.MISSING_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "MISSING no value for {}", pl.lit(self._parameter)
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.MISSING_VALUE.value)),
+                    pl.format("MISSING no value for {}", pl.lit(self._parameter)),
                 )
             )
             .when(
@@ -68,14 +87,12 @@ class StatisticQc(BaseQcCategory):
                 )
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.NO_QUALITY_CONTROL.value)).alias("flag"),
-                        pl.format(
-                            "NO_QC_PERFORMED thresholds missing for {}",
-                            pl.lit(self._parameter),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.NO_QUALITY_CONTROL.value)),
+                    pl.format(
+                        "NO_QC_PERFORMED thresholds missing for {}",
+                        pl.lit(self._parameter),
+                    ),
                 )
             )
             .when(
@@ -83,16 +100,14 @@ class StatisticQc(BaseQcCategory):
                 & (pl.col("value") <= pl.col("flag1_upper"))
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.GOOD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "GOOD {} in [{}, {}]",
-                            pl.col("value"),
-                            pl.col("flag1_lower"),
-                            pl.col("flag1_upper"),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.GOOD_VALUE.value)),
+                    pl.format(
+                        "GOOD {} in [{}, {}]",
+                        pl.col("value"),
+                        pl.col("flag1_lower"),
+                        pl.col("flag1_upper"),
+                    ),
                 )
             )
             .when(
@@ -106,16 +121,14 @@ class StatisticQc(BaseQcCategory):
                 )
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.PROBABLY_GOOD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "PROBABLY_GOOD: {} in range {}-{}]",
-                            pl.col("value"),
-                            pl.col("flag2_lower"),
-                            pl.col("flag2_upper"),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.PROBABLY_GOOD_VALUE.value)),
+                    pl.format(
+                        "PROBABLY_GOOD: {} in range {}-{}]",
+                        pl.col("value"),
+                        pl.col("flag2_lower"),
+                        pl.col("flag2_upper"),
+                    ),
                 )
             )
             .when(
@@ -129,29 +142,25 @@ class StatisticQc(BaseQcCategory):
                 )
             )
             .then(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.PROBABLY_BAD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "BAD_DATA_CORRECTABLE: {} in range {}-{}",
-                            pl.col("value"),
-                            pl.col("flag3_lower"),
-                            pl.col("flag3_upper"),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.PROBABLY_BAD_VALUE.value)),
+                    pl.format(
+                        "BAD_DATA_CORRECTABLE: {} in range {}-{}",
+                        pl.col("value"),
+                        pl.col("flag3_lower"),
+                        pl.col("flag3_upper"),
+                    ),
                 )
             )
             .otherwise(
-                pl.struct(
-                    [
-                        pl.lit(str(QcFlag.BAD_VALUE.value)).alias("flag"),
-                        pl.format(
-                            "BAD {} outside range [{}, {}]",
-                            pl.col("value"),
-                            pl.col("flag3_lower"),
-                            pl.col("flag3_upper"),
-                        ).alias("info"),
-                    ]
+                self._result(
+                    pl.lit(str(QcFlag.BAD_VALUE.value)),
+                    pl.format(
+                        "BAD {} outside range [{}, {}]",
+                        pl.col("value"),
+                        pl.col("flag3_lower"),
+                        pl.col("flag3_upper"),
+                    ),
                 )
             )
         )
@@ -0,0 +1,171 @@
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Optional, TypeVar
+
+import polars as pl
+
+T = TypeVar("T")
+
+CONFIGS_DIR = Path(__file__).parent / "configs"
+STATISTICS_DIR = CONFIGS_DIR / "statistic_check_data"
+STATISTICS_STORE = CONFIGS_DIR / "statistic_check_data.arrow"
+
+STATISTICS_SCHEMA = {
+    "depth": pl.Float64,
+    "depth_interval": pl.Utf8,
+    "month": pl.Int64,
+    "sea_basin": pl.Utf8,
+    "mean": pl.Float64,
+    "std": pl.Float64,
+    "count": pl.Float64,
+    "max": pl.Float64,
+    "min": pl.Float64,
+    "median": pl.Float64,
+    "95p": pl.Float64,
+    "5p": pl.Float64,
+    "99p": pl.Float64,
+    "1p": pl.Float64,
+    "25p": pl.Float64,
+    "75p": pl.Float64,
+    "mad": pl.Float64,
+    "smad": pl.Float64,
+    "min_depth": pl.Float64,
+    "max_depth": pl.Float64,
+    "flag1_lower": pl.Float64,
+    "flag1_upper": pl.Float64,
+    "flag2_lower": pl.Float64,
+    "flag2_upper": pl.Float64,
+    "flag3_lower": pl.Float64,
+    "flag3_upper": pl.Float64,
+    "min_range_value": pl.Float64,
+    "max_range_value": pl.Float64,
+}
+
+
+def read_statistics_file(path: Path) -> pl.DataFrame:
+    """Read a tab separated statistics file with the statistics column types."""
+    return pl.read_csv(path, separator="\t", encoding="utf8").cast(STATISTICS_SCHEMA)
+
+
+def compile_statistics(
+    statistics_dir: Path = STATISTICS_DIR, store: Path = STATISTICS_STORE
+):
+    """
+    Compile all statistics files in statistics_dir to one uncompressed Arrow IPC file
+    that can be memory mapped. The parameter is taken from the file name and the rows
+    are sorted by parameter, sea_basin, month and min_depth.
+    """
+    statistics = pl.concat(
+        [
+            read_statistics_file(path).select(
+                pl.lit(path.stem).alias("parameter"), *STATISTICS_SCHEMA
+            )
+            for path in sorted(statistics_dir.glob("*.txt"))
+        ]
+    ).sort(["parameter", "sea_basin", "month", "min_depth"], maintain_order=True)
+    statistics.write_ipc(store, compression="uncompressed")
+
+
+# Process wide registry of loaded tables, shared by all threads and inherited by forked
+# processes
+_registry = {}
+_registry_lock = threading.RLock()
+
+
+def _reset_registry_lock():
+    # The lock may have been held by another thread when the process was forked
+    global _registry_lock
+    _registry_lock = threading.RLock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_registry_lock)
+
+
+def _modified(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def shared_table(path: Path, loader: Callable[..., T], *dependencies: Path) -> T:
+    """
+    Return loader(path, *dependencies) from the process wide registry. The registry is
+    keyed on the path, the loader and the dependencies, and the table is loaded again
+    when the modification time of the path or of any dependency has changed. A
+    dependency does not have to exist.
+    """
+    path = Path(path).resolve()
+    dependencies = tuple(Path(dependency).resolve() for dependency in dependencies)
+    modified = (path.stat().st_mtime_ns, *map(_modified, dependencies))
+    with _registry_lock:
+        key = (path, loader, dependencies)
+        if key in _registry and _registry[key][0] == modified:
+            return _registry[key][1]
+        table = loader(path, *dependencies)
+        _registry[key] = (modified, table)
+        return table
+
+
+def _read_store(store: Path) -> pl.DataFrame:
+    return pl.read_ipc(store, memory_map=True)
+
+
+def load_statistics(
+    parameter: str,
+    source: Path,
+    store: Path = STATISTICS_STORE,
+) -> Optional[pl.DataFrame]:
+    """
+    Return the statistics for a parameter from the compiled store, a zero copy slice
+    of the memory mapped store.
+
+    Returns None if there is no store, if the store is older than the source
+    statistics file or if the parameter is not in the store. The caller should then
+    read the source file.
+    """
+    try:
+        if store.stat().st_mtime < source.stat().st_mtime:
+            return None
+        statistics = shared_table(store, _read_store)
+    except FileNotFoundError:
+        return None
+
+    # The store is sorted by parameter
+    parameters = statistics.get_column("parameter")
+    start = parameters.search_sorted(parameter, side="left")
+    end = parameters.search_sorted(parameter, side="right")
+    if start == end:
+        return None
+    return statistics.slice(start, end - start).drop("parameter")
+
+
+def _load_statistics_file(source: Path, store: Path) -> pl.DataFrame:
+    statistics = load_statistics(source.stem, source, store)
+    if statistics is None:
+        statistics = read_statistics_file(source)
+    return statistics
+
+
+def shared_statistics(source: Path, store: Path = STATISTICS_STORE) -> pl.DataFrame:
+    """
+    Return the statistics for a statistics file, from the compiled store when it is up
+    to date. The statistics are loaded once per process and loaded again when the
+    statistics file or the store has changed.
+    """
+    return shared_table(source, _load_statistics_file, store)
+
+
+def preload_statistics(statistics_dir: Path = STATISTICS_DIR):
+    """
+    Load all statistics in the registry, e.g. before forking worker processes that
+    then share them copy-on-write.
+    """
+    for source in sorted(statistics_dir.glob("*.txt")):
+        shared_statistics(source)
+
+
+if __name__ == "__main__":
+    compile_statistics()
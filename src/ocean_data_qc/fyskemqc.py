@@ -1,13 +1,33 @@
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Sequence
+
 import polars as pl
+import pyarrow.parquet as pq
 
+from ocean_data_qc import errors
+from ocean_data_qc.fyskem.base_qc_category import BaseQcCategory
 from ocean_data_qc.fyskem.consistency_qc import ConsistencyQc
 from ocean_data_qc.fyskem.dependency_qc import DependencyQc
 from ocean_data_qc.fyskem.gradient_qc import GradientQc
 from ocean_data_qc.fyskem.h2s_qc import H2sQc
-from ocean_data_qc.fyskem.parameter import Parameter
+from ocean_data_qc.fyskem.parameter_view import ParameterRow, ParameterView
+from ocean_data_qc.fyskem.profile_view import ProfileView
 from ocean_data_qc.fyskem.qc_configuration import QcConfiguration
+from ocean_data_qc.fyskem.qc_flag import QcFlag
+from ocean_data_qc.fyskem.qc_flag_expressions import (
+    automatic_flags,
+    code_column,
+    decode_quality_flags,
+    encode_quality_flags,
+    highest_priority_flag,
+    total_automatic_source,
+    with_total_flag,
+)
 from ocean_data_qc.fyskem.qc_flag_tuple import QcField
-from ocean_data_qc.fyskem.qc_flags import QcFlags
+from ocean_data_qc.fyskem.qc_timing import QcTiming
 from ocean_data_qc.fyskem.quantification_limit_qc import QuantificationLimitQc
 from ocean_data_qc.fyskem.range_qc import RangeQc
 from ocean_data_qc.fyskem.repeated_value_qc import RepeatedValueQc
@@ -28,11 +48,30 @@ QC_CATEGORIES = (
     DependencyQc,
 )
 
+# Columns read by the QC categories
+QC_INPUT_COLUMNS = (
+    "visit_key",
+    "sea_basin",
+    "visit_month",
+    "DEPH",
+    "parameter",
+    "value",
+    "quality_flag_long",
+)
+OPTIONAL_QC_INPUT_COLUMNS = ("LMQNT_VAL", "STD_UNCERT", "_row_id")
+
+# Row number in the source of streaming QC, used as _row_id if the source has none
+_SOURCE_ROW_COLUMN = "_source_row"
+
 
 class FysKemQc:
     def __init__(self, data: pl.DataFrame):
         self._data = data
         self._configuration = QcConfiguration()
+        self._hooks = []
+        self._profiles = None
+        self._defer_info = False
+        self._deferred_info = {}
         self._original_flags = self._data["quality_flag_long"].clone()
         flags = pl.col("quality_flag_long").str.split("_")
         self._data = self._data.with_columns(
@@ -44,47 +83,409 @@ class FysKemQc:
             ]
         )
 
+    @classmethod
+    def from_parquet(cls, path: str | Path, columns: Sequence[str] = ()):
+        """
+        Read the columns needed for QC, and the given extra columns, from a Parquet
+        file. Other columns in the file are not read.
+        """
+        data_columns = pl.read_parquet_schema(path).keys()
+        return cls(
+            pl.read_parquet(path, columns=cls._input_columns(data_columns, columns))
+        )
+
+    @classmethod
+    def from_ipc(
+        cls, path: str | Path, columns: Sequence[str] = (), memory_map: bool = True
+    ):
+        """
+        Read the columns needed for QC, and the given extra columns, from an Arrow IPC
+        file. The file is memory mapped unless memory_map is False.
+        """
+        data_columns = pl.read_ipc_schema(path).keys()
+        return cls(
+            pl.read_ipc(
+                path,
+                columns=cls._input_columns(data_columns, columns),
+                memory_map=memory_map,
+            )
+        )
+
+    @staticmethod
+    def _input_columns(data_columns: Iterable[str], columns: Sequence[str]) -> list[str]:
+        data_columns = set(data_columns)
+        if missing_columns := [
+            column
+            for column in (*QC_INPUT_COLUMNS, *columns)
+            if column not in data_columns
+        ]:
+            raise errors.InputDataError(f"Missing columns: {', '.join(missing_columns)}")
+        return list(
+            dict.fromkeys(
+                [
+                    *QC_INPUT_COLUMNS,
+                    *(
+                        column
+                        for column in OPTIONAL_QC_INPUT_COLUMNS
+                        if column in data_columns
+                    ),
+                    *columns,
+                ]
+            )
+        )
+
+    def to_parquet(self, path: str | Path, columns: Sequence[str] = ()):
+        """
+        Write the QC results to a Parquet file: _row_id, quality_flag_long, the info
+        columns, the total flag info columns if added, and the given extra columns.
+        _row_id is the row number in the data the QC was run on unless the data
+        already had a _row_id column. Deferred info is rendered first, see render_info.
+        """
+        self.render_info()
+        qc_columns = [
+            column
+            for column in self._data.columns
+            if column in ("_row_id", "quality_flag_long")
+            or column.startswith(("info_AUTO_QC_", "total_automatic"))
+        ]
+        self._data.select(
+            [*qc_columns, *(column for column in columns if column not in qc_columns)]
+        ).write_parquet(path)
+
+    def add_hook(self, hook: Callable[[QcTiming], None]):
+        """
+        Register a hook that is called with a QcTiming for each QC category,
+        _update_total and total_flag_info, and with the row counts of each checked
+        parameter. Hooks are called from worker threads when running in parallel.
+        Without hooks nothing is measured. Hooks do not change how the categories are
+        run, each category checks all its parameters at once.
+        """
+        self._hooks.append(hook)
+
+    def _notify(self, timing: QcTiming):
+        for hook in self._hooks:
+            hook(timing)
+
+    def _timed(self, step: str, function: Callable[[], None]):
+        data_before = self._data
+        start = time.perf_counter()
+        function()
+        self._notify(
+            QcTiming(
+                step=step,
+                parameter=None,
+                seconds=time.perf_counter() - start,
+                rows_before=len(data_before),
+                rows_after=len(self._data),
+                size_before=data_before.estimated_size(),
+                size_after=self._data.estimated_size(),
+            )
+        )
+
     def __len__(self):
         return len(self._data)
 
-    def __getitem__(self, index):
-        row_dict = self._data.row(index, named=True)  # Get named dict of the row
-        return Parameter(row_dict)
+    def __getitem__(self, index) -> ParameterRow:
+        return self.parameters[index]
 
     @property
-    def parameters(self):
-        return {
-            Parameter(self._data.row(i, named=True)) for i in range(self._data.height)
-        }
+    def parameters(self) -> ParameterView:
+        """
+        The rows of the data as Parameters, read from the columns when used. See
+        ParameterView for batches and filtering.
+        """
+        return ParameterView(self._data)
+
+    def run_automatic_qc(
+        self,
+        lazy: bool = False,
+        parallel: bool = False,
+        max_workers: int | None = None,
+        defer_info: bool = False,
+    ):
+        """
+        Run all QC categories in QcField order.
+
+        With lazy=True each category adds the checks for all its parameters to a single
+        LazyFrame plan that is collected once, instead of materializing the data for
+        every parameter.
+
+        With parallel=True categories that do not depend on each others flags run
+        concurrently on a thread pool with max_workers threads. The result is the same
+        as when running the categories one by one.
+
+        The automatic flags are kept as integer codes while the categories run and
+        are written back to quality_flag_long once all categories are done.
+
+        With defer_info=True no info_AUTO_QC_* columns are added. Each check keeps a
+        reason code and the values its info text is made from, and the texts are
+        added by render_info().
+        """
+        self._defer_info = defer_info
+        self._deferred_info = {}
+        self._data = decode_quality_flags(self._data)
+        if "_row_id" not in self._data.columns:
+            self._data = self._data.with_columns(
+                pl.int_range(pl.len(), dtype=pl.Int64).alias("_row_id")
+            )
+        # The profile checks share one sorted view of the data
+        self._profiles = ProfileView(self._data)
 
-    def run_automatic_qc(self):
         ordered_qc_tests = sorted(
             (QcField[category.__name__.removesuffix("Qc")], category)
             for category in QC_CATEGORIES
         )
-        for field, qc_category in ordered_qc_tests:
-            print(f"run {field.name} qc")
-            # Get config for parameter
-            category_checker = qc_category(self._data)
-            category_checker.expand_qc_columns()
+        if parallel:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                for wave in self._qc_waves(ordered_qc_tests):
+                    data = self._data
+                    results = executor.map(
+                        lambda qc_test: self._run_category(*qc_test, data, lazy), wave
+                    )
+                    for (field, _), result in zip(wave, results):
+                        self._data = self._merge_category_result(field, result)
+        else:
+            for field, qc_category in ordered_qc_tests:
+                self._data = self._run_category(field, qc_category, self._data, lazy)
+
+        self._data = encode_quality_flags(self._data)
+        if self._hooks:
+            self._timed("_update_total", self._update_total)
+        else:
+            self._update_total()
+
+    @classmethod
+    def run_automatic_qc_streaming(
+        cls,
+        source: str | Path | pl.LazyFrame,
+        sink: str | Path,
+        visits_per_chunk: int = 100,
+        hooks: Sequence[Callable[[QcTiming], None]] = (),
+        **kwargs,
+    ) -> int:
+        """
+        Run automatic QC on data that does not fit in memory.
+
+        All checks only use rows from the same visit, so the data from source (a
+        Parquet or CSV file or a LazyFrame) is checked visits_per_chunk whole visits at
+        a time. The source is read once and written sorted by visit_key to a temporary
+        Arrow IPC file next to sink. The chunks are contiguous slices of that file,
+        which is memory mapped. The result of each chunk is appended to sink, a Parquet
+        or CSV file, in visit_key order. The hooks are added to the QC of each chunk,
+        see add_hook. Other keyword arguments are passed to run_automatic_qc, with
+        defer_info=True no info texts are written.
+
+        Returns the number of rows written. _row_id is kept if the source has it,
+        otherwise it is the row number in the source.
+        """
+        data = cls._scan(source)
+        sink = Path(sink)
+        has_row_id = "_row_id" in data.collect_schema().names()
+        if not has_row_id:
+            data = data.with_row_index(_SOURCE_ROW_COLUMN)
+
+        rows_written = 0
+        schema = None
+        writer = None
+        with tempfile.TemporaryDirectory(dir=sink.parent) as directory:
+            sorted_path = Path(directory) / "sorted_by_visit.arrow"
+            data.sort("visit_key", maintain_order=True).sink_ipc(sorted_path)
+            sorted_data = pl.read_ipc(sorted_path, memory_map=True)
+
+            # Offset and number of rows of each chunk of visits_per_chunk visits
+            visit_lengths = sorted_data.get_column("visit_key").rle().struct.field("len")
+            chunk_lengths = (
+                visit_lengths.to_frame()
+                .group_by(pl.int_range(pl.len()) // visits_per_chunk, maintain_order=True)
+                .agg(pl.col("len").sum())
+                .get_column("len")
+                .to_list()
+            )
+            try:
+                offset = 0
+                for chunk_length in chunk_lengths:
+                    chunk = sorted_data.slice(offset, chunk_length)
+                    offset += chunk_length
+
+                    fyskemqc = cls(chunk)
+                    for hook in hooks:
+                        fyskemqc.add_hook(hook)
+                    fyskemqc.run_automatic_qc(**kwargs)
+                    result = fyskemqc._data
+                    if not has_row_id:
+                        result = result.with_columns(
+                            pl.col(_SOURCE_ROW_COLUMN).cast(pl.Int64).alias("_row_id")
+                        ).drop(_SOURCE_ROW_COLUMN)
+
+                    # All chunks are written with the columns and types of the first
+                    # chunk
+                    if schema is None:
+                        schema = result.schema
+                    result = result.select(schema.names()).cast(schema)
+
+                    if sink.suffix == ".csv":
+                        with sink.open("w" if rows_written == 0 else "a") as f:
+                            result.write_csv(f, include_header=rows_written == 0)
+                    else:
+                        table = result.to_arrow()
+                        if writer is None:
+                            writer = pq.ParquetWriter(sink, table.schema)
+                        writer.write_table(table)
+                    rows_written += len(result)
+            finally:
+                if writer is not None:
+                    writer.close()
 
-            for parameter in self._configuration.parameters(
-                f"{field.name.lower()}_check"
-            ):
-                if config := self._configuration.get(
-                    f"{field.name.lower()}_check", parameter
-                ):
-                    category_checker.check(parameter, config)
+        return rows_written
 
-            category_checker.collapse_qc_columns()
-            self._data = category_checker._data
+    @staticmethod
+    def _scan(source: str | Path | pl.LazyFrame) -> pl.LazyFrame:
+        if isinstance(source, pl.LazyFrame):
+            return source
+        if Path(source).suffix == ".csv":
+            return pl.scan_csv(source)
+        return pl.scan_parquet(source)
+
+    def _run_category(
+        self,
+        field: QcField,
+        qc_category: type[BaseQcCategory],
+        data: pl.DataFrame,
+        lazy: bool,
+    ) -> pl.DataFrame:
+        print(f"run {field.name} qc")
+        start = time.perf_counter()
+        # Get config for parameter
+        if qc_category.uses_profiles:
+            category_checker = qc_category(
+                data.lazy() if lazy else data, profiles=self._profiles
+            )
+        else:
+            category_checker = qc_category(data.lazy() if lazy else data)
+        if self._defer_info:
+            category_checker.defer_info()
+        category_checker.expand_qc_columns()
+
+        category = f"{field.name.lower()}_check"
+        configurations = {
+            parameter: config
+            for parameter in self._configuration.parameters(category)
+            if (config := self._configuration.get(category, parameter))
+        }
+        category_checker.check_parameters(configurations)
+        # The number of rows is not known before a lazy category is collected
+        parameter_timings = []
+        if self._hooks and not lazy:
+            parameter_timings = self._parameter_timings(category_checker, configurations)
+
+        category_checker.collapse_qc_columns()
+        result = category_checker._data
+        if self._defer_info:
+            self._deferred_info[field] = category_checker.deferred_info
+
+        if self._hooks:
+            self._notify(
+                QcTiming(
+                    step=qc_category.__name__,
+                    parameter=None,
+                    seconds=time.perf_counter() - start,
+                    rows_selected=None
+                    if lazy
+                    else sum(timing.rows_selected for timing in parameter_timings),
+                    rows_updated=None
+                    if lazy
+                    else sum(timing.rows_updated for timing in parameter_timings),
+                    rows_before=len(data),
+                    rows_after=len(result),
+                    size_before=data.estimated_size(),
+                    size_after=result.estimated_size(),
+                )
+            )
+        return result
 
-        self._update_total()
+    def _parameter_timings(
+        self, category_checker: BaseQcCategory, configurations: dict
+    ) -> list[QcTiming]:
+        """
+        Notify the hooks of the rows selected and updated for each checked parameter,
+        from the pending updates of the category grouped by parameter.
+        """
+        column = category_checker._column_name
+        counts = {}
+        if category_checker._pending_updates:
+            counts = {
+                parameter: (rows_selected, rows_updated)
+                for parameter, rows_selected, rows_updated in pl.concat(
+                    category_checker._pending_updates
+                )
+                .join(
+                    category_checker._data.select("_row_id", "parameter"),
+                    on="_row_id",
+                    how="left",
+                )
+                .group_by("parameter")
+                .agg(pl.len(), pl.col(column).is_not_null().sum())
+                .iter_rows()
+            }
+
+        timings = []
+        for parameter in configurations:
+            rows_selected, rows_updated = counts.get(parameter, (0, 0))
+            timing = QcTiming(
+                step=type(category_checker).__name__,
+                parameter=parameter,
+                seconds=None,
+                rows_selected=rows_selected,
+                rows_updated=rows_updated,
+            )
+            self._notify(timing)
+            timings.append(timing)
+        return timings
+
+    @staticmethod
+    def _qc_waves(ordered_qc_tests):
+        """
+        Group the ordered QC categories into waves that can run concurrently.
+
+        A category writes the automatic flag of its own field and reads the flags in
+        reads_automatic_flags. It starts a new wave if it reads a flag written in the
+        current wave or writes a flag read in the current wave, so every category
+        sees the same flags as when the categories run one by one.
+        """
+        waves = []
+        written, read = set(), set()
+        for field, qc_category in ordered_qc_tests:
+            reads = set(qc_category.reads_automatic_flags)
+            if not waves or reads & written or field in read:
+                waves.append([])
+                written, read = set(), set()
+            waves[-1].append((field, qc_category))
+            written.add(field)
+            read |= reads
+        return waves
+
+    def _merge_category_result(self, field: QcField, result: pl.DataFrame):
+        """
+        Add the flag codes, info and any other new columns from a category that ran on
+        a copy of the data.
+        """
+        columns = [
+            *(column for column in result.columns if column not in self._data.columns),
+            code_column(field),
+        ]
+        if result["_row_id"].equals(self._data["_row_id"]):
+            return self._data.with_columns(result.select(columns))
+        return self._data.drop(columns, strict=False).join(
+            result.select(["_row_id", *columns]),
+            on="_row_id",
+            how="left",
+            maintain_order="left",
+        )
 
     def _update_total(self):
         """
         Updates the total flag in the quality_flag_long string.
-        Only applies QcFlags.from_string() to changed rows.
+        Only recalculates the total flag for changed rows.
         Skips entirely if no changes are detected.
         """
         changed_mask_expr = pl.col("quality_flag_long") != pl.lit(self._original_flags)
@@ -93,56 +494,88 @@ class FysKemQc:
         if self._data.filter(changed_mask_expr).is_empty():
             return
 
-        # Apply update only where needed
-        self._data = self._data.with_columns(
-            pl.when(changed_mask_expr)
-            .then(
-                pl.col("quality_flag_long").map_elements(
-                    lambda x: str(QcFlags.from_string(x)), return_dtype=pl.Utf8
-                )
+        # Apply update only where needed. Run lazily so that the flag parts used
+        # several times in the expression are only split once.
+        self._data = (
+            self._data.lazy()
+            .with_columns(
+                pl.when(changed_mask_expr)
+                .then(with_total_flag(pl.col("quality_flag_long")))
+                .otherwise(pl.col("quality_flag_long"))
+                .alias("quality_flag_long")
             )
-            .otherwise(pl.col("quality_flag_long"))
-            .alias("quality_flag_long")
+            .collect()
         )
 
+    def render_info(self, flagged_only: bool = False):
+        """
+        Add the info_AUTO_QC_* columns deferred by run_automatic_qc(defer_info=True).
+        Rows that were not checked get "No quality control". With flagged_only only
+        checked rows with a flag other than good get a text, the others are null.
+        """
+        deferred_info, self._deferred_info = self._deferred_info, {}
+        for field, info in deferred_info.items():
+            info_column = f"info_AUTO_QC_{field.name}"
+            self._data = self._data.join(
+                info.render(flagged_only).rename({"info": info_column}),
+                on="_row_id",
+                how="left",
+                maintain_order="left",
+            )
+            if not flagged_only:
+                self._data = self._data.with_columns(
+                    pl.col(info_column).fill_null(str(QcFlag.NO_QUALITY_CONTROL))
+                )
+
     def total_flag_info(self):
+        """
+        Add columns describing the total automatic flag: the flag itself, the names of
+        the QC fields that gave it and the info from those fields. Deferred info is
+        rendered first, see render_info.
+        """
+        self.render_info()
+        if self._hooks:
+            self._timed("total_flag_info", self._add_total_flag_info)
+        else:
+            self._add_total_flag_info()
+
+    def _add_total_flag_info(self):
+        # The automatic flags and their total are used for every field
         self._data = self._data.with_columns(
-            [
-                # Compute total_automatic
-                pl.col("quality_flag_long")
-                .map_elements(
-                    lambda x: str(QcFlags.from_string(x).total_automatic),
-                    return_dtype=pl.Utf8,
+            automatic_flags(pl.col("quality_flag_long")).alias("_automatic")
+        ).with_columns(
+            highest_priority_flag(pl.col("_automatic")).alias("_total_automatic")
+        )
+        source = total_automatic_source(pl.col("_automatic"), pl.col("_total_automatic"))
+        source_info = [
+            pl.when(is_source).then(
+                pl.format(
+                    "{}: {}", pl.lit(field.name), pl.col(f"info_AUTO_QC_{field.name}")
                 )
+            )
+            for field, is_source in source.items()
+            if f"info_AUTO_QC_{field.name}" in self._data.columns
+        ]
+        self._data = self._data.with_columns(
+            [
+                pl.col("_total_automatic")
+                .replace_strict({flag.value: str(flag) for flag in QcFlag})
                 .alias("total_automatic"),
-                # Compute total_automatic_fields
-                pl.col("quality_flag_long")
-                .map_elements(
-                    lambda x: "; ".join(
-                        QcFlags.from_string(x).get_field_name(f)
-                        for f in QcFlags.from_string(x).total_automatic_source
-                    ),
-                    return_dtype=pl.Utf8,
-                )
-                .alias("total_automatic_fields"),
-                # Compute total_automatic_info from all columns
-                pl.struct(self._data.columns)
-                .map_elements(FysKemQc.extract_info, return_dtype=pl.Utf8)
-                .alias("total_automatic_info"),
+                pl.concat_str(
+                    [
+                        pl.when(is_source).then(pl.lit(field.name))
+                        for field, is_source in source.items()
+                    ],
+                    separator="; ",
+                    ignore_nulls=True,
+                ).alias("total_automatic_fields"),
+                (
+                    pl.concat_str(source_info, separator="; ", ignore_nulls=True)
+                    if source_info
+                    else pl.lit("")
+                ).alias("total_automatic_info"),
             ]
-        )
-
-    @staticmethod
-    def extract_info(row: dict) -> str:
-        qcflags = QcFlags.from_string(row["quality_flag_long"])
-        fields = qcflags.total_automatic_source
-        info_items = []
-        for field in fields:
-            col_name = f"info_AUTO_QC_{field.name}"
-            value = row.get(col_name, None)
-            if value is not None:
-                info_items.append(f"{field.name}: {value}")
-        return "; ".join(info_items)
+        ).drop("_automatic", "_total_automatic")
 
 
 if __name__ == "__main__":
@@ -1,13 +1,24 @@
+import collections
 import datetime
 import functools
+import threading
 from pathlib import Path
+from typing import Callable, Optional, TypeVar
 
 import numpy as np
 import polars as pl
 
+from ocean_data_qc.fyskem.statistic_store import (
+    STATISTICS_STORE,
+    shared_statistics,
+    shared_table,
+)
+
+T = TypeVar("T")
+
 # Path setup
 STATISTICS_DIR = Path(__file__).parent / "fyskem" / "configs" / "statistic_check_data"
-STATISTIC_FILES = {path.stem: path for path in STATISTICS_DIR.glob("*") if path.is_file()}
+STATISTIC_FILES = {path.stem: path for path in STATISTICS_DIR.glob("*.txt")}
 
 
 @functools.cache
@@ -18,39 +29,96 @@ def nan_float(value: str) -> float:
         return np.nan
 
 
-@functools.cache
+# Upper limit for the memory used by cached statistics
+PROFILE_STATISTICS_CACHE_BYTES = 64 * 2**20
+
+_MISSING = object()
+
+
+class ProfileStatisticsCache:
+    """
+    Thread safe least recently used cache with a limit on the total size in bytes of
+    the cached values. Values larger than the limit are not cached.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key, value, size: int):
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+profile_statistics_cache = ProfileStatisticsCache(PROFILE_STATISTICS_CACHE_BYTES)
+
+
 def get_profile_statistics_for_parameter_and_sea_basin(
     parameter: str,
     sea_basin: str,
     point_in_time: datetime.datetime,
     statistics: tuple[str, ...] = ("median", "25p", "75p"),
 ) -> dict:
-    statistic_path = STATISTIC_FILES.get(parameter)
-    if not statistic_path:
-        print(f"No statistic for {parameter} in sea basin {sea_basin}")
-        return _empty_result(statistics)
+    """
+    Return the depth profile of the given statistics for a parameter in a sea basin for
+    the month of point_in_time.
+
+    Results are cached per month, not per point in time, in profile_statistics_cache.
+    The statistics files are loaded once per process by statistic_store, the same
+    tables as used by the statistic check.
+    """
+    key = ("profile", parameter, str(sea_basin), point_in_time.month, statistics)
+    output = profile_statistics_cache.get(key, _MISSING)
+    if output is _MISSING:
+        output = _profile_statistics(
+            parameter, str(sea_basin), point_in_time.month, statistics
+        )
+        profile_statistics_cache.put(
+            key, output, sum(64 + 8 * len(values) for values in output.values())
+        )
+    return output
 
-    try:
-        df = pl.read_csv(statistic_path, separator="\t", try_parse_dates=True)
-    except Exception as e:
-        print(f"Failed to read {statistic_path}: {e}")
-        return _empty_result(statistics)
 
-    try:
-        filtered_df = df.filter(
-            (pl.col("month").cast(pl.Int64) == point_in_time.month)
-            & (pl.col("sea_basin").cast(pl.Utf8) == str(sea_basin))
-        )
-    except pl.ColumnNotFoundError:
-        print(f"Missing expected columns in {parameter}")
+def _profile_statistics(
+    parameter: str, sea_basin: str, month: int, statistics: tuple[str, ...]
+) -> dict:
+    statistic_partitions = _statistic_partitions(parameter)
+    if statistic_partitions is None:
         return _empty_result(statistics)
 
-    if filtered_df.is_empty():
+    filtered_df = statistic_partitions.get((sea_basin, month))
+    if filtered_df is None or filtered_df.is_empty():
         return _empty_result(statistics)
 
-    # Ensure depth is cast correctly
-    filtered_df = filtered_df.with_columns([pl.col("depth").cast(pl.Float64)])
-
     output = {"depth": filtered_df["depth"].to_list()}
 
     for stat in statistics:
@@ -68,6 +136,65 @@ def get_profile_statistics_for_parameter_and_sea_basin(
     return output
 
 
+def _statistic_table(parameter: str) -> Optional[pl.DataFrame]:
+    """
+    Return the statistics for a parameter from the process wide registry of
+    statistic_store. Returns None if the file is missing or can not be used. Failures
+    are cached as well and the reason is only printed once.
+    """
+    return _shared_statistic(parameter, _load_statistic_table)
+
+
+def _statistic_partitions(
+    parameter: str,
+) -> Optional[dict[tuple[str, int], pl.DataFrame]]:
+    """
+    Return the statistics for a parameter partitioned by sea_basin and month, from the
+    process wide registry. The partitions are built once per loaded table. Returns None
+    like _statistic_table.
+    """
+    return _shared_statistic(parameter, _load_statistic_partitions)
+
+
+def _shared_statistic(parameter: str, loader: Callable[[Path, Path], T]) -> Optional[T]:
+    statistic_path = STATISTIC_FILES.get(parameter)
+    try:
+        if statistic_path:
+            return shared_table(statistic_path, loader, STATISTICS_STORE)
+    except FileNotFoundError:
+        pass
+    _print_once(f"No statistic for {parameter}")
+    return None
+
+
+def _load_statistic_table(source: Path, store: Path) -> Optional[pl.DataFrame]:
+    # Loader for the registry that gives None for a file that can not be used, so that
+    # it is not read again until it has changed
+    try:
+        return shared_statistics(source, store)
+    except pl.exceptions.ColumnNotFoundError:
+        print(f"Missing expected columns in {source.stem}")
+    except Exception as e:
+        print(f"Failed to read {source}: {e}")
+    return None
+
+
+def _load_statistic_partitions(
+    source: Path, store: Path
+) -> Optional[dict[tuple[str, int], pl.DataFrame]]:
+    statistic_table = _load_statistic_table(source, store)
+    if statistic_table is None:
+        return None
+    return statistic_table.partition_by(
+        ["sea_basin", "month"], maintain_order=True, as_dict=True
+    )
+
+
+@functools.cache
+def _print_once(message: str):
+    print(message)
+
+
 def _empty_result(statistics: tuple[str, ...]) -> dict:
     return {stat: [np.nan] for stat in ("depth", *statistics)}
 
@@ -333,3 +333,108 @@ def test_consistency_qc_using_override_configuration(
 
     # And the parameter is given the expected flag at the expected position
     assert parameter_after.qc.automatic[QcField.Consistency] == expected_flag
+
+
+def test_check_all_parameters_at_once_uses_largest_parameter_set():
+    # Given values for two checked parameters and the parameters summed for them
+    given_rows = [
+        ("NTOT", 14.23, 1.35),
+        ("AMON", 3.76, 0.15),
+        ("NTRI", 0.87, 0.12),
+        ("NTRA", 8.24, 0.2),
+        ("NTRZ", 8.0, None),
+        ("DOXY_CTD", 8.2, 0.2),
+        ("DOXY_BTL", 8.3, 0.2),
+    ]
+    given_data = generate_data_frame(
+        [
+            {
+                "parameter": parameter,
+                "value": value,
+                "STD_UNCERT": std_uncert,
+                "DEPH": 20,
+                "visit_key": "ABC123",
+                "_row_id": row_id,
+            }
+            for row_id, (parameter, value, std_uncert) in enumerate(given_rows)
+        ]
+    )
+    given_configurations = {
+        "NTOT": generate_consistency_check_configuration(
+            parameter_sets=[["NTRZ", "AMON"], ["NTRA", "NTRI", "AMON"]],
+            sigma=1.4,
+            upper_limit=999,
+        ),
+        "DOXY_CTD": generate_consistency_check_configuration(
+            parameter_sets=[["DOXY_BTL"]], sigma=0.3
+        ),
+    }
+
+    # When checking the parameters one at a time and all at once
+    results = []
+    for check_all in (False, True):
+        consistency_qc = ConsistencyQc(given_data)
+        consistency_qc.expand_qc_columns()
+        if check_all:
+            consistency_qc.check_parameters(given_configurations)
+        else:
+            for parameter, configuration in given_configurations.items():
+                consistency_qc.check(parameter, configuration)
+        consistency_qc.collapse_qc_columns()
+        results.append(consistency_qc._data)
+
+    # Then the flags and info are the same
+    assert results[0].equals(results[1])
+
+    # And the parameter set with the largest summation is used, with the parameters
+    # listed in the order of the data
+    info = dict(
+        zip(
+            results[1]["parameter"],
+            results[1][f"info_AUTO_QC_{QcField.Consistency.name}"],
+        )
+    )
+    assert info["NTOT"] == (
+        "GOOD: difference NTOT-AMON, NTRI, NTRA 14.23 - 12.87 = 1.36 is within "
+        "-2.756-999.0"
+    )
+    assert info["DOXY_CTD"] == (
+        "GOOD: difference DOXY_CTD-DOXY_BTL 8.2 - 8.3 = -0.1 is within -0.566-0.566"
+    )
+
+
+def test_parameter_with_several_values_at_a_depth_is_listed_once_per_value():
+    # Given a summed parameter with two values at the same depth
+    given_rows = [
+        ("NTOT", 14.0),
+        ("NTRA", 4.0),
+        ("AMON", 3.0),
+        ("NTRA", 5.0),
+    ]
+    given_data = generate_data_frame(
+        [
+            {
+                "parameter": parameter,
+                "value": value,
+                "DEPH": 20,
+                "visit_key": "ABC123",
+                "_row_id": row_id,
+            }
+            for row_id, (parameter, value) in enumerate(given_rows)
+        ]
+    )
+    given_configuration = generate_consistency_check_configuration(
+        parameter_sets=[["NTRA", "AMON"]], sigma=1.4, upper_limit=999
+    )
+
+    # When running the consistency check
+    consistency_qc = ConsistencyQc(given_data)
+    consistency_qc.expand_qc_columns()
+    consistency_qc.check("NTOT", given_configuration)
+    consistency_qc.collapse_qc_columns()
+
+    # Then both values are summed and the parameter of each value is listed in the
+    # order of the data
+    assert consistency_qc._data[f"info_AUTO_QC_{QcField.Consistency.name}"][0] == (
+        "GOOD: difference NTOT-NTRA, AMON, NTRA 14.0 - 12.0 = 2.0 is within -2.8-999.0"
+    )
@@ -99,3 +99,98 @@ def test_dependency_check_using_override_configuration(
 
     # And the parameter is given the expected flag at the expected position
     assert parameter_after.qc.automatic[QcField.Dependency] == expected_flag
+
+
+def test_check_all_parameters_at_once_gives_same_flags_as_one_at_a_time():
+    # Given parameters depending on each other, one with bad incoming and total flags
+    given_rows = [
+        ("SALT_CTD", "0_0000000000_0_0"),
+        ("DOXY_CTD", "0_0000000000_0_0"),
+        ("TEMP_CTD", "4_1120000000_0_4"),
+        ("Derived in situ density CTD", "0_0200000000_0_0"),
+    ]
+    given_data = generate_data_frame(
+        [
+            {
+                "parameter": parameter,
+                "value": 1.0,
+                "quality_flag_long": flags,
+                "DEPH": 20,
+                "visit_key": "ABC123",
+            }
+            for parameter, flags in given_rows
+        ]
+    )
+    given_configurations = {
+        "SALT_CTD": generate_dependency_configuration(
+            "SALT_CTD", ["TEMP_CTD", "Derived in situ density CTD"]
+        ),
+        "DOXY_CTD": generate_dependency_configuration(
+            "DOXY_CTD", ["TEMP_CTD", "SALT_CTD"]
+        ),
+    }
+
+    # When checking the parameters one at a time and all at once
+    results = []
+    for check_all in (False, True):
+        dependency_qc = DependencyQc(given_data)
+        dependency_qc.expand_qc_columns()
+        if check_all:
+            dependency_qc.check_parameters(given_configurations)
+        else:
+            for parameter, configuration in given_configurations.items():
+                dependency_qc.check(parameter, configuration)
+        dependency_qc.collapse_qc_columns()
+        results.append(dependency_qc._data)
+
+    # Then the flags and info are the same
+    assert results[0].equals(results[1])
+
+    # And the highest priority flag is inherited
+    assert results[1]["info_AUTO_QC_Dependency"].to_list()[:2] == [
+        "The following parameters: TEMP_CTD have flag 4 which is inherited by the "
+        "parameter: SALT_CTD",
+        "The following parameters: TEMP_CTD have flag 4 which is inherited by the "
+        "parameter: DOXY_CTD",
+    ]
+
+
+@pytest.mark.parametrize(
+    "given_dependency_quality_flag_long, expected_flag",
+    (
+        ("1_1100000000_0_4", QcFlag.BAD_VALUE),
+        ("1_1100000000_4_4", QcFlag.BAD_VALUE),
+        ("4_1100000000_0_1", QcFlag.GOOD_VALUE),
+    ),
+)
+def test_only_automatic_and_total_flags_are_inherited(
+    given_dependency_quality_flag_long, expected_flag
+):
+    # Given a dependency whose only bad flag is its incoming, manual or total flag
+    given_data = generate_data_frame(
+        [
+            {
+                "parameter": parameter,
+                "value": 1.0,
+                "quality_flag_long": flags,
+                "DEPH": 20,
+                "visit_key": "ABC123",
+            }
+            for parameter, flags in (
+                ("SALT_CTD", "0_0000000000_0_0"),
+                ("TEMP_CTD", given_dependency_quality_flag_long),
+            )
+        ]
+    )
+    given_configuration = generate_dependency_configuration("SALT_CTD", ["TEMP_CTD"])
+
+    # When running the dependency check
+    dependency_qc = DependencyQc(given_data)
+    dependency_qc.expand_qc_columns()
+    dependency_qc.check("SALT_CTD", given_configuration)
+    dependency_qc.collapse_qc_columns()
+
+    # Then the highest priority automatic or total flag is inherited and the
+    # incoming flag is ignored
+    parameter_after = Parameter(dependency_qc._data.row(0, named=True))
+    assert parameter_after.qc.automatic[QcField.Dependency] == expected_flag
@@ -1,9 +1,12 @@
 import polars as pl
 import pytest
+from polars.testing import assert_frame_equal
 
+from ocean_data_qc.errors import InputDataError
 from ocean_data_qc.fyskem.qc_flag import QcFlag
 from ocean_data_qc.fyskem.qc_flag_tuple import QcField, QcFlagTuple
 from ocean_data_qc.fyskem.qc_flags import QcFlags
+from ocean_data_qc.fyskem.qc_timing import QcTimingCollector
 from ocean_data_qc.fyskemqc import QC_CATEGORIES, FysKemQc
 from tests.setup_methods import generate_data_frame, generate_data_frame_of_length
 
@@ -219,3 +222,329 @@ def test_fyskem_qc_large_dataset(large_dataset):
     assert (
         temp_rows.filter(pl.col("quality_flag_long") == "").height == 0
     )  # all TEMP rows flagged
+
+
+def test_lazy_qc_gives_same_result_as_eager_qc(large_dataset):
+    # Given two FysKemQc objects with the same data
+    eager_fyskemqc = FysKemQc(large_dataset)
+    lazy_fyskemqc = FysKemQc(large_dataset)
+
+    # When running automatic QC eagerly and lazily
+    eager_fyskemqc.run_automatic_qc()
+    lazy_fyskemqc.run_automatic_qc(lazy=True)
+
+    # Then the resulting data is the same
+    assert_frame_equal(
+        eager_fyskemqc._data.sort("_row_id"), lazy_fyskemqc._data.sort("_row_id")
+    )
+
+
+@pytest.mark.parametrize("given_lazy", (False, True))
+def test_parallel_qc_gives_same_result_as_sequential_qc(large_dataset, given_lazy):
+    # Given two FysKemQc objects with the same data
+    sequential_fyskemqc = FysKemQc(large_dataset)
+    parallel_fyskemqc = FysKemQc(large_dataset)
+
+    # When running automatic QC sequentially and in parallel
+    sequential_fyskemqc.run_automatic_qc()
+    parallel_fyskemqc.run_automatic_qc(lazy=given_lazy, parallel=True)
+
+    # Then the resulting data is the same
+    assert_frame_equal(sequential_fyskemqc._data, parallel_fyskemqc._data)
+
+
+@pytest.mark.parametrize("given_lazy", (False, True))
+def test_deferred_info_renders_same_info_as_automatic_qc(large_dataset, given_lazy):
+    # Given two FysKemQc objects with the same data
+    fyskemqc = FysKemQc(large_dataset)
+    deferred_fyskemqc = FysKemQc(large_dataset)
+
+    # When running automatic QC with deferred info
+    fyskemqc.run_automatic_qc()
+    deferred_fyskemqc.run_automatic_qc(lazy=given_lazy, defer_info=True)
+
+    # Then no info columns are added
+    info_columns = [f"info_AUTO_QC_{field.name}" for field in QcField]
+    assert not set(info_columns) & set(deferred_fyskemqc._data.columns)
+
+    # And the rendered info is the same as when formatted during QC
+    deferred_fyskemqc.render_info()
+    assert_frame_equal(
+        fyskemqc._data.sort("_row_id"),
+        deferred_fyskemqc._data.sort("_row_id").select(fyskemqc._data.columns),
+    )
+
+
+def test_deferred_info_for_flagged_rows_only(large_dataset):
+    # Given automatic QC run with deferred info
+    fyskemqc = FysKemQc(large_dataset)
+    fyskemqc.run_automatic_qc(defer_info=True)
+
+    # When rendering info only for flagged rows
+    fyskemqc.render_info(flagged_only=True)
+
+    # Then rows without a flag other than good have no info
+    range_flags = fyskemqc._data.select(
+        pl.col("quality_flag_long")
+        .str.split("_")
+        .list.get(1)
+        .str.slice(QcField.Range.value, 1),
+        "info_AUTO_QC_Range",
+    )
+    assert range_flags.filter(
+        pl.col("quality_flag_long").is_in(["0", "1"]),
+        pl.col("info_AUTO_QC_Range").is_not_null(),
+    ).is_empty()
+    assert range_flags.filter(
+        ~pl.col("quality_flag_long").is_in(["0", "1"]),
+        pl.col("info_AUTO_QC_Range").is_null(),
+    ).is_empty()
+
+
+@pytest.mark.parametrize("given_sink_name", ("result.parquet", "result.csv"))
+@pytest.mark.parametrize("given_row_ids", (None, "reversed"))
+def test_streaming_qc_gives_same_result_as_in_memory_qc(
+    tmp_path, given_sink_name, given_row_ids
+):
+    # Given data with several visits, not sorted by visit, stored in a parquet file
+    given_data = (
+        generate_data_frame_of_length(number_of_rows=300, number_of_visits=7)
+        .with_columns(pl.col("SERNO").alias("visit_key"))
+        .sample(fraction=1, shuffle=True, seed=7)
+    )
+    # And possibly with its own _row_id
+    if given_row_ids == "reversed":
+        given_data = given_data.with_columns(
+            (1000 - pl.int_range(pl.len(), dtype=pl.Int64)).alias("_row_id")
+        )
+    given_source = tmp_path / "source.parquet"
+    given_data.write_parquet(given_source)
+
+    # When running automatic QC in memory and streamed a few visits at a time
+    in_memory_fyskemqc = FysKemQc(given_data)
+    in_memory_fyskemqc.run_automatic_qc()
+    given_sink = tmp_path / given_sink_name
+    rows_written = FysKemQc.run_automatic_qc_streaming(
+        given_source, given_sink, visits_per_chunk=3
+    )
+
+    # Then all rows are written to the sink
+    assert rows_written == len(given_data)
+    expected_data = in_memory_fyskemqc._data
+    if given_sink.suffix == ".csv":
+        streamed_data = pl.read_csv(given_sink, schema=expected_data.schema)
+    else:
+        streamed_data = pl.read_parquet(given_sink)
+
+    # And each row keeps the _row_id of the source, or its row number in the source,
+    # with the same result as when running in memory
+    assert_frame_equal(
+        streamed_data.select(expected_data.columns).sort("_row_id"),
+        expected_data.sort("_row_id"),
+    )
+
+    # And no temporary files are left
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        ["source.parquet", given_sink_name]
+    )
+
+
+@pytest.mark.parametrize("given_file_format", ("parquet", "ipc"))
+def test_qc_from_file_reads_only_qc_columns(tmp_path, given_file_format):
+    # Given data with an extra column stored in a file
+    given_data = generate_data_frame_of_length(number_of_rows=100).with_columns(
+        pl.lit("extra").alias("EXTRA")
+    )
+    given_path = tmp_path / f"data.{given_file_format}"
+    getattr(given_data, f"write_{given_file_format}")(given_path)
+
+    # When reading the file
+    fyskemqc = getattr(FysKemQc, f"from_{given_file_format}")(given_path)
+
+    # Then the columns needed for QC are read but not the extra column
+    assert "quality_flag_long" in fyskemqc._data.columns
+    assert "EXTRA" not in fyskemqc._data.columns
+    assert len(fyskemqc) == len(given_data)
+
+
+def test_qc_from_file_with_missing_column_raises(tmp_path):
+    # Given a file without the value column
+    given_path = tmp_path / "data.parquet"
+    generate_data_frame_of_length(number_of_rows=10).drop("value").write_parquet(
+        given_path
+    )
+
+    # When reading the file
+    # Then an InputDataError is raised
+    with pytest.raises(InputDataError, match="value"):
+        FysKemQc.from_parquet(given_path)
+
+
+@pytest.mark.parametrize("given_column", ("LMQNT_VAL", "STD_UNCERT", "_row_id", "value"))
+def test_qc_from_file_with_requested_qc_input_column_reads_it_once(
+    tmp_path, given_column
+):
+    # Given a file with the optional QC input columns
+    given_data = generate_data_frame_of_length(number_of_rows=10).with_columns(
+        pl.lit(0.1).alias("LMQNT_VAL"),
+        pl.lit(0.2).alias("STD_UNCERT"),
+        pl.int_range(pl.len(), dtype=pl.Int64).alias("_row_id"),
+    )
+    given_path = tmp_path / "data.parquet"
+    given_data.write_parquet(given_path)
+
+    # When reading the file requesting a column that is also a QC input column
+    fyskemqc = FysKemQc.from_parquet(given_path, columns=[given_column])
+
+    # Then the column is read once
+    assert fyskemqc._data.columns.count(given_column) == 1
+    assert fyskemqc._data[given_column].to_list() == given_data[given_column].to_list()
+
+
+def test_qc_to_parquet_writes_qc_columns(tmp_path):
+    # Given QC has been run on data read from a parquet file
+    given_data = generate_data_frame_of_length(number_of_rows=100)
+    given_path = tmp_path / "data.parquet"
+    given_data.write_parquet(given_path)
+    fyskemqc = FysKemQc.from_parquet(given_path, columns=["STATN"])
+    fyskemqc.run_automatic_qc()
+
+    # When writing the result
+    result_path = tmp_path / "result.parquet"
+    fyskemqc.to_parquet(result_path, columns=["STATN"])
+
+    # Then only the QC columns and the requested columns are written
+    result = pl.read_parquet(result_path)
+    assert set(result.columns) == {
+        "_row_id",
+        "quality_flag_long",
+        "STATN",
+        *(f"info_AUTO_QC_{field.name}" for field in QcField),
+    }
+
+    # And _row_id is the row in the original data
+    assert result["STATN"].to_list() == given_data["STATN"].to_list()
+    assert result["_row_id"].to_list() == list(range(len(given_data)))
+
+
+@pytest.mark.parametrize("given_lazy", (False, True))
+def test_hook_receives_timings_for_all_steps(large_dataset, given_lazy):
+    # Given a FysKemQc object with a timing collector
+    fyskemqc = FysKemQc(large_dataset)
+    collector = QcTimingCollector()
+    fyskemqc.add_hook(collector)
+
+    # When running automatic QC and adding the total flag info
+    fyskemqc.run_automatic_qc(lazy=given_lazy)
+    fyskemqc.total_flag_info()
+
+    # Then there is a timing for each category and the total flag steps
+    timings = collector.to_dataframe()
+    step_timings = timings.filter(pl.col("parameter").is_null())
+    assert set(step_timings["step"]) == {
+        *(category.__name__ for category in QC_CATEGORIES),
+        "_update_total",
+        "total_flag_info",
+    }
+    assert (step_timings["rows_after"] == len(large_dataset)).all()
+
+    # And there are row counts for checked parameters when not running lazily
+    range_timings = timings.filter(
+        (pl.col("step") == "RangeQc") & pl.col("parameter").is_not_null()
+    )
+    if given_lazy:
+        assert range_timings.is_empty()
+    else:
+        assert range_timings["seconds"].is_null().all()
+        assert range_timings["rows_selected"].sum() > 0
+        assert (range_timings["rows_updated"] <= range_timings["rows_selected"]).all()
+
+
+def test_qc_with_hook_gives_same_result_as_without_hook(large_dataset):
+    # Given a FysKemQc object with a hook and one without
+    with_hook = FysKemQc(large_dataset)
+    collector = QcTimingCollector()
+    with_hook.add_hook(collector)
+    without_hook = FysKemQc(large_dataset)
+
+    # When running automatic QC on both
+    with_hook.run_automatic_qc()
+    without_hook.run_automatic_qc()
+
+    # Then the results are the same
+    assert_frame_equal(with_hook._data, without_hook._data)
+
+    # And the rows selected for each parameter are the rows of the parameter
+    range_timings = collector.to_dataframe().filter(
+        (pl.col("step") == "RangeQc") & pl.col("parameter").is_not_null()
+    )
+    parameter_rows = dict(
+        large_dataset.filter(pl.col("value").is_not_null())
+        .group_by("parameter")
+        .len()
+        .iter_rows()
+    )
+    for parameter, rows_selected in range_timings.select(
+        "parameter", "rows_selected"
+    ).iter_rows():
+        assert rows_selected == parameter_rows.get(parameter, 0)
+
+
+def test_qc_waves_run_flag_readers_after_flag_writers():
+    # Given the QC categories in QcField order
+    ordered_qc_tests = sorted(
+        (QcField[category.__name__.removesuffix("Qc")], category)
+        for category in QC_CATEGORIES
+    )
+
+    # When grouping them into waves
+    waves = FysKemQc._qc_waves(ordered_qc_tests)
+
+    # Then all categories are scheduled once in QcField order
+    assert [qc_test for wave in waves for qc_test in wave] == ordered_qc_tests
+
+    # And no category reads a flag written by another category in the same wave
+    for wave in waves:
+        written = {field for field, _ in wave}
+        for field, qc_category in wave:
+            assert not (set(qc_category.reads_automatic_flags) - {field}) & written
+
+
+@pytest.mark.parametrize(
+    "given_flag_string",
+    (
+        "1_0000000000_0_1",
+        "1_1114111111_0_4",
+        "0_1204121200_0_4",
+        "4_Q000000000_0_4",
+        "1_1111111111_3_3",
+    ),
+)
+def test_total_flag_info_describes_total_automatic_flag(given_flag_string):
+    # Given data with info from some automatic QC fields
+    given_info = {
+        f"info_AUTO_QC_{field.name}": f"info {field.value}"
+        for field in QcField
+        if field.value % 2 == 0
+    }
+    given_data = generate_data_frame(
+        [{"quality_flag_long": given_flag_string, **given_info}]
+    )
+    fyskemqc = FysKemQc(given_data)
+
+    # When adding total flag info
+    fyskemqc.total_flag_info()
+
+    # Then the info matches the total automatic flag and its sources
+    qc_flags = QcFlags.from_string(given_flag_string)
+    source_fields = qc_flags.total_automatic_source
+    row = fyskemqc._data.row(0, named=True)
+    assert row["total_automatic"] == str(qc_flags.total_automatic)
+    assert row["total_automatic_fields"] == "; ".join(
+        field.name for field in source_fields
+    )
+    assert row["total_automatic_info"] == "; ".join(
+        f"{field.name}: info {field.value}"
+        for field in source_fields
+        if field.value % 2 == 0
+    )
@@ -0,0 +1,184 @@
+import polars as pl
+import pytest
+
+from ocean_data_qc.fyskem import generate_statistic_config
+from ocean_data_qc.fyskem.generate_statistic_config import (
+    generate_statistic_parameter_files,
+)
+
+STATISTICS = ("mean", "std", "count", "max", "min", "median", "25p", "75p")
+
+
+def write_basin_file(path, sea_basin, parameters, rows):
+    columns = ["depth", "depth_interval", "month", "sea_basin"] + [
+        f"{parameter}:{statistic}" for parameter in parameters for statistic in STATISTICS
+    ]
+    lines = ["\t".join(columns)]
+    for depth, depth_interval, month, values in rows:
+        lines.append(
+            "\t".join(
+                [str(depth), depth_interval, str(month), sea_basin]
+                + ["" if value is None else str(value) for value in values]
+            )
+        )
+    path.write_text("\n".join(lines) + "\n", encoding="utf8")
+
+
+@pytest.fixture
+def given_data_directory(tmp_path):
+    data_directory = tmp_path / "data"
+    data_directory.mkdir()
+    write_basin_file(
+        data_directory / "Eastern Gotland Basin.csv",
+        "Eastern Gotland Basin",
+        ("H2S", "TEMP_CTD"),
+        [
+            (0.0, "0_5.0", 1, [1, 1, 20, 3, 0.5, 1, 0.75, 1.25] + [None] * 8),
+            (70.0, "65.0_75.0", 1, [5, 2, 20, 9, 1, 5, 4, 6, 2, 1, 20, 4, 0, 2, 1, 3]),
+        ],
+    )
+    write_basin_file(
+        data_directory / "Bothnian Bay.csv",
+        "Bothnian Bay",
+        ("TEMP_CTD",),
+        [(0.0, "0_5.0", 2, [3, 0.5, 20, 4, 2, 3, 2.5, 3.5])],
+    )
+    return data_directory
+
+
+def test_limits_for_all_parameters(given_data_directory, tmp_path):
+    # Given basin files with statistics for two parameters in one basin
+    given_output_directory = tmp_path / "output"
+
+    # When generating the parameter files
+    config_data = generate_statistic_parameter_files(
+        given_data_directory, given_output_directory
+    )
+
+    # Then there is one file per parameter with the limits
+    assert config_data == {
+        "TEMP_CTD": {"file_name": "TEMP_CTD.txt"},
+        "H2S": {"file_name": "H2S.txt"},
+    }
+    h2s = pl.read_csv(given_output_directory / "H2S.txt", separator="\t")
+    temp = pl.read_csv(given_output_directory / "TEMP_CTD.txt", separator="\t")
+
+    # And the limits are clipped at 0 and use 3 std in the special basin below 60 m
+    assert h2s["min_depth"].to_list() == [0.0, 65.0]
+    assert h2s["max_depth"].to_list() == [5.0, 75.0]
+    assert h2s["flag2_lower"].to_list() == [0.12, 0.0]
+    assert h2s["flag3_upper"].to_list() == [3.75, 12.0]
+    assert h2s["min_range_value"].to_list() == [0.0, 0.0]
+    assert h2s["max_range_value"].to_list() == [5.0, 15.0]
+
+    # And rows without statistics for the parameter are not included and temperature
+    # limits are clipped at -2
+    assert temp["sea_basin"].to_list() == ["Bothnian Bay", "Eastern Gotland Basin"]
+    assert temp["flag3_lower"].to_list() == [0.5, -2.0]
+    assert temp["min_range_value"].to_list() == [1.0, -2.0]
+    assert temp["max_range_value"].to_list() == [5.0, 6.0]
+
+    # And the output directory only holds the parameter files, the manifest is written
+    # next to it
+    assert sorted(path.name for path in given_output_directory.iterdir()) == [
+        "H2S.txt",
+        "TEMP_CTD.txt",
+    ]
+    assert (tmp_path / "output_manifest.json").exists()
+
+
+def test_only_changed_parameters_are_generated_again(
+    given_data_directory, tmp_path, capsys
+):
+    # Given parameter files that have been generated
+    given_output_directory = tmp_path / "output"
+    generate_statistic_parameter_files(given_data_directory, given_output_directory)
+    capsys.readouterr()
+
+    # When generating again without changes
+    generate_statistic_parameter_files(given_data_directory, given_output_directory)
+
+    # Then no file is written
+    assert "Saved" not in capsys.readouterr().out
+
+    # When a basin file with only one of the parameters has changed
+    write_basin_file(
+        given_data_directory / "Bothnian Bay.csv",
+        "Bothnian Bay",
+        ("TEMP_CTD",),
+        [(0.0, "0_5.0", 2, [3, 0.5, 20, 5, 2, 3, 2.5, 3.5])],
+    )
+    generate_statistic_parameter_files(given_data_directory, given_output_directory)
+
+    # Then only that parameter is written
+    output = capsys.readouterr().out
+    assert "TEMP_CTD.txt" in output
+    assert "H2S.txt" not in output
+
+
+def test_all_parameters_are_generated_when_limit_rules_change(
+    given_data_directory, tmp_path, capsys, monkeypatch
+):
+    # Given parameter files that have been generated
+    given_output_directory = tmp_path / "output"
+    generate_statistic_parameter_files(given_data_directory, given_output_directory)
+    capsys.readouterr()
+
+    # When the limit rules have changed
+    monkeypatch.setitem(generate_statistic_config.LIMIT_RULES, "range_std_factor", 1)
+    generate_statistic_parameter_files(given_data_directory, given_output_directory)
+
+    # Then all parameters are written with the new rules
+    output = capsys.readouterr().out
+    assert "TEMP_CTD.txt" in output
+    assert "H2S.txt" in output
+    temp = pl.read_csv(given_output_directory / "TEMP_CTD.txt", separator="\t")
+    assert temp["max_range_value"].to_list() == [4.5, 5.0]
+
+
+def test_all_parameters_are_generated_when_limit_formulas_change(
+    given_data_directory, tmp_path, capsys, monkeypatch
+):
+    # Given parameter files that have been generated
+    given_output_directory = tmp_path / "output"
+    generate_statistic_parameter_files(given_data_directory, given_output_directory)
+    capsys.readouterr()
+
+    # When the expressions computing the limits have changed but not the limit rules
+    limits = generate_statistic_config._limits
+
+    def given_limits(rules):
+        return [limit.round(0) for limit in limits(rules)]
+
+    monkeypatch.setattr(generate_statistic_config, "_limits", given_limits)
+    generate_statistic_parameter_files(given_data_directory, given_output_directory)
+
+    # Then all parameters are written with the new limits
+    output = capsys.readouterr().out
+    assert "TEMP_CTD.txt" in output
+    assert "H2S.txt" in output
+    h2s = pl.read_csv(given_output_directory / "H2S.txt", separator="\t")
+    assert h2s["flag3_upper"].to_list() == [4.0, 12.0]
+
+
+def test_files_of_removed_parameters_are_deleted(given_data_directory, tmp_path):
+    # Given parameter files that have been generated
+    given_output_directory = tmp_path / "output"
+    generate_statistic_parameter_files(given_data_directory, given_output_directory)
+
+    # When a parameter is no longer in any basin file
+    write_basin_file(
+        given_data_directory / "Eastern Gotland Basin.csv",
+        "Eastern Gotland Basin",
+        ("TEMP_CTD",),
+        [(70.0, "65.0_75.0", 1, [2, 1, 20, 4, 0, 2, 1, 3])],
+    )
+    config_data = generate_statistic_parameter_files(
+        given_data_directory, given_output_directory
+    )
+
+    # Then its file is removed
+    assert config_data == {"TEMP_CTD": {"file_name": "TEMP_CTD.txt"}}
+    assert sorted(path.name for path in given_output_directory.iterdir()) == [
+        "TEMP_CTD.txt"
+    ]
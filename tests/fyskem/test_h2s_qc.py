@@ -117,3 +117,57 @@ def test_h2s_check_using_override_configuration(
 
     # And the parameter is given the expected flag at the expected position
     assert parameter_after.qc.automatic[QcField.H2s] == expected_flag
+
+
+def test_check_all_parameters_at_once():
+    # Given two parameters at two depths and H2S present only at the first depth
+    given_rows = [
+        ("NTRA", 10, "0_0000000000_0_0"),
+        ("NTRI", 10, "6_0000000000_0_6"),
+        ("H2S", 10, "1_0000000000_0_1"),
+        ("NTRA", 20, "0_0000000000_0_0"),
+        ("NTRI", 20, "0_0000000000_0_0"),
+        ("H2S", 20, "1_0000040000_0_1"),
+    ]
+    given_data = generate_data_frame(
+        [
+            {
+                "parameter": parameter,
+                "value": 1.23,
+                "quality_flag_long": flags,
+                "DEPH": depth,
+                "visit_key": "ABC123",
+            }
+            for parameter, depth, flags in given_rows
+        ]
+    )
+    given_configurations = {
+        parameter: generate_h2s_configuration(
+            parameter, QcFlag.VALUE_BELOW_DETECTION.value
+        )
+        for parameter in ("NTRA", "NTRI")
+    }
+
+    # When checking the parameters one at a time and all at once
+    results = []
+    for check_all in (False, True):
+        h2s_qc = H2sQc(given_data)
+        h2s_qc.expand_qc_columns()
+        if check_all:
+            h2s_qc.check_parameters(given_configurations)
+        else:
+            for parameter, configuration in given_configurations.items():
+                h2s_qc.check(parameter, configuration)
+        h2s_qc.collapse_qc_columns()
+        results.append(h2s_qc._data)
+
+    # Then the flags and info are the same
+    assert results[0].equals(results[1])
+    assert results[1]["info_AUTO_QC_H2s"].to_list() == [
+        "BAD NTRA because h2s present",
+        "BELOW_DETECTION NTRI is below detection limit",
+        "No quality control",
+        "GOOD no h2s present",
+        "GOOD no h2s present",
+        "No quality control",
+    ]
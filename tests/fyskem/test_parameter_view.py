@@ -0,0 +1,99 @@
+import polars as pl
+import pytest
+
+from ocean_data_qc.fyskem.parameter import Parameter
+from ocean_data_qc.fyskem.parameter_view import ParameterView
+from ocean_data_qc.fyskem.qc_flag import QcFlag
+from ocean_data_qc.fyskem.qc_flag_tuple import QcField
+
+
+def given_parameters_data():
+    return pl.DataFrame(
+        {
+            "parameter": ["TEMP_CTD", "SALT_CTD", "TEMP_CTD", "SALT_CTD", "TEMP_CTD"],
+            "visit_key": ["V1", "V1", "V2", "V2", "V2"],
+            "DEPH": [0.0, 0.0, 5.0, 5.0, 10.0],
+            "value": [10.1, 7.2, 9.8, 7.4, 9.1],
+            "quality_flag_long": [
+                "1_0100000000_0_1",
+                "1_0400000000_0_4",
+                "0_0000000000_0_0",
+                "1_0000000000_3_3",
+                "",
+            ],
+        }
+    )
+
+
+def test_rows_read_the_same_values_as_parameters():
+    # Given a view of the data
+    given_data = given_parameters_data()
+    view = ParameterView(given_data)
+
+    # When reading the rows
+    rows = list(view)
+
+    # Then they have the same values as Parameters created from the rows
+    assert len(rows) == len(view) == given_data.height
+    for index, row in enumerate(rows):
+        parameter = Parameter(given_data.row(index, named=True))
+        assert isinstance(row, Parameter)
+        assert (row.name, row.depth, row.value) == (
+            parameter.name,
+            parameter.depth,
+            parameter.value,
+        )
+        assert row.qc == parameter.qc
+        assert row.manual_comment == ""
+        assert row.data == parameter.data
+
+    # And rows can be accessed from the end and not outside the data
+    assert view[-1].depth == 10.0
+    with pytest.raises(IndexError):
+        view[len(view)]
+
+
+def test_batches_and_filters():
+    # Given a view of the data
+    view = ParameterView(given_parameters_data())
+
+    # When iterating in batches
+    batches = list(view.iter_batches(2))
+
+    # Then the batches hold consecutive rows
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert [row.value for batch in batches for row in batch] == [
+        row.value for row in view
+    ]
+
+    # And rows can be filtered by parameter, visit and flag
+    assert [row.depth for row in view.filter(parameter="TEMP_CTD", visit_key="V2")] == [
+        5.0,
+        10.0,
+    ]
+    assert [row.value for row in view.filter(flag=QcFlag.BAD_VALUE)] == [7.2]
+    assert [row.value for row in view.filter(flag=QcFlag.NO_QUALITY_CONTROL)] == [
+        9.8,
+        9.1,
+    ]
+    assert [
+        row.value for row in view.filter(flag=QcFlag.GOOD_VALUE, field=QcField.Range)
+    ] == [10.1]
+
+    # And a field can not be filtered without a flag
+    with pytest.raises(ValueError):
+        view.filter(field=QcField.Range)
+
+
+def test_row_data_is_kept_with_current_flags():
+    # Given a row of a view
+    row = ParameterView(given_parameters_data())[0]
+
+    # When changing the data and the flags of the row
+    row.data["value"] = 42.0
+    row.qc.manual = QcFlag.BAD_VALUE
+
+    # Then the same data is returned with the change and the current flags
+    assert row.data is row.data
+    assert row.data["value"] == row.value == 42.0
+    assert row.data["quality_flag_long"] == "1_0100000000_4_4"
@@ -0,0 +1,67 @@
+import polars as pl
+
+from ocean_data_qc.fyskem.gradient_qc import GradientQc
+from ocean_data_qc.fyskem.profile_view import ProfileView
+from tests.setup_methods import (
+    generate_data_frame,
+    generate_gradient_configuration,
+)
+
+
+def given_profiles_data():
+    return generate_data_frame(
+        [
+            {"parameter": "B", "visit_key": "V1", "DEPH": 10.0, "value": 3.0},
+            {"parameter": "A", "visit_key": "V2", "DEPH": 0.0, "value": 9.0},
+            {"parameter": "A", "visit_key": "V1", "DEPH": 10.0, "value": None},
+            {"parameter": "A", "visit_key": "V1", "DEPH": 20.0, "value": 2.0},
+            {"parameter": "A", "visit_key": "V1", "DEPH": 0.0, "value": 1.0},
+            {"parameter": "B", "visit_key": "V1", "DEPH": 0.0, "value": 4.0},
+        ]
+    ).with_columns(
+        pl.int_range(pl.len(), dtype=pl.Int64).alias("_row_id"),
+        pl.lit("0").alias("TOTAL_QC"),
+    )
+
+
+def test_profiles_are_sorted_with_closest_values_in_the_same_profile():
+    # Given data with two parameters and visits in no particular order
+    given_data = given_profiles_data()
+
+    # When building the profile view
+    profiles = ProfileView(given_data)
+
+    # Then the rows of a parameter are sorted by visit and depth
+    parameter_a = profiles.parameter("A")
+    assert parameter_a["_row_id"].to_list() == [4, 2, 3, 1]
+
+    # And the closest values skip missing values and do not cross profiles
+    assert parameter_a["prev_value"].to_list() == [None, 1.0, 1.0, None]
+    assert parameter_a["prev_deph"].to_list() == [None, 0.0, 0.0, None]
+    assert parameter_a["next_value"].to_list() == [2.0, 2.0, None, None]
+    assert parameter_a["next_deph"].to_list() == [20.0, 20.0, None, None]
+    assert profiles.parameter("B")["prev_value"].to_list() == [None, 4.0]
+
+    # And a parameter that is not in the data has no rows
+    assert "C" not in profiles
+    assert profiles.parameter("C").is_empty()
+
+
+def test_category_with_shared_profile_view():
+    # Given a profile view built once for the data
+    given_data = given_profiles_data()
+    given_profiles = ProfileView(given_data)
+    given_configuration = generate_gradient_configuration("A", -1, 1)
+
+    # When checking with the shared view and with a view of its own
+    results = []
+    for profiles in (given_profiles, None):
+        gradient_qc = GradientQc(given_data, profiles=profiles)
+        gradient_qc.expand_qc_columns()
+        gradient_qc.check("A", given_configuration)
+        gradient_qc.collapse_qc_columns()
+        results.append(gradient_qc._data)
+
+    # Then the category without a view builds its own with the same results
+    assert gradient_qc.profiles is not given_profiles
+    assert results[0].equals(results[1])
@@ -2,6 +2,7 @@ import numpy as np
 import pytest
 
 from ocean_data_qc.fyskem.parameter import Parameter
+from ocean_data_qc.fyskem.qc_checks import GradientCheck, threshold_table
 from ocean_data_qc.fyskem.qc_configuration import QcConfiguration
 
 
@@ -89,3 +90,57 @@ def test_statistic_check_unkown_parameter_returns_none(given_parameter_name):
     )
 
     assert retrieved_configuration is None
+
+
+def test_statistic_check_batch_thresholds_match_single_thresholds():
+    # Given the statistic configuration for a parameter
+    retrieved_configuration = QcConfiguration().get("statistic_check", "TEMP_CTD")
+
+    # And points both with and without configuration
+    given_points = (
+        ("Kattegat", 0, 1),
+        ("Kattegat", 5, 2),
+        ("Kattegat", 12.5, 7),
+        ("Kattegat", 1000, 2),
+        ("unknown", 0, 1),
+        ("Kattegat", 0, 13),
+        ("Kattegat", np.nan, 1),
+    )
+
+    # When getting thresholds for all points at once
+    batch_thresholds = retrieved_configuration.get_thresholds_batch(*zip(*given_points))
+
+    # Then they are the same as the thresholds for each point
+    for index, point in enumerate(given_points):
+        thresholds = retrieved_configuration.get_thresholds(*point)
+        for threshold, value in thresholds.items():
+            np.testing.assert_equal(batch_thresholds[threshold][index], value)
+
+
+def test_threshold_table_has_one_row_per_parameter():
+    # Given checks for two parameters with integer and float thresholds
+    given_configurations = {
+        "A": GradientCheck(allowed_decrease=-10, allowed_increase=0.5),
+        "B": GradientCheck(allowed_decrease=-0.2, allowed_increase=3),
+    }
+
+    # When compiling them to a threshold table
+    thresholds = threshold_table(given_configurations)
+
+    # Then the thresholds are numbers and texts as configured
+    assert thresholds.rows(named=True) == [
+        {
+            "parameter": "A",
+            "check_allowed_decrease": -10.0,
+            "check_allowed_decrease_text": "-10",
+            "check_allowed_increase": 0.5,
+            "check_allowed_increase_text": "0.5",
+        },
+        {
+            "parameter": "B",
+            "check_allowed_decrease": -0.2,
+            "check_allowed_decrease_text": "-0.2",
+            "check_allowed_increase": 3.0,
+            "check_allowed_increase_text": "3",
+        },
+    ]
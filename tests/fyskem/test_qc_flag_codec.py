@@ -0,0 +1,90 @@
+import polars as pl
+import pytest
+
+from ocean_data_qc.fyskem import qc_flag_codec
+from ocean_data_qc.fyskem.qc_flag import QcFlag
+from ocean_data_qc.fyskem.qc_flag_tuple import QcField
+from ocean_data_qc.fyskem.qc_flags import QcFlags
+
+GIVEN_FLAG_STRINGS = (
+    "0_0000000000_0_0",
+    "0_1234567890_0_4",
+    "Q_00Q0000000_0_0",
+    "1_000B0A0000_0_0",
+    "6_0000000000_Q_0",
+    "9_8760000000_0_0",
+    "1_1115110000_0_5",
+    "3_5610000000_0_6",
+    "1__0_0",
+    "",
+)
+
+
+def test_packed_flags_are_decoded_to_the_same_flags_as_qc_flags():
+    # Given quality flag strings
+    given_flags = [QcFlags.from_string(value) for value in GIVEN_FLAG_STRINGS]
+
+    # When packing the strings with the updated total flag
+    packed = qc_flag_codec.encode([str(flags) for flags in given_flags])
+
+    # Then they are packed to the same integers as by QcFlags
+    assert packed.tolist() == [flags.packed for flags in given_flags]
+
+    # And decoded to the same strings
+    assert qc_flag_codec.decode(packed).tolist() == [str(flags) for flags in given_flags]
+    assert [str(QcFlags.from_packed(int(value))) for value in packed] == [
+        str(flags) for flags in given_flags
+    ]
+
+
+def test_total_and_field_codes_match_qc_flags():
+    # Given packed quality flag strings
+    packed = qc_flag_codec.encode(GIVEN_FLAG_STRINGS)
+    expected_flags = [QcFlags.from_string(value) for value in GIVEN_FLAG_STRINGS]
+
+    # When calculating the total flags with numpy and polars
+    total_codes = qc_flag_codec.total_codes(packed)
+    polars_total_codes = (
+        pl.DataFrame({"packed": packed})
+        .select(qc_flag_codec.packed_total_code(pl.col("packed")))
+        .to_series()
+    )
+
+    # Then the totals are the same as by QcFlags
+    expected_total_codes = [
+        qc_flag_codec.FLAG_CODES[flags.total.value] for flags in expected_flags
+    ]
+    assert total_codes.tolist() == expected_total_codes
+    assert polars_total_codes.to_list() == expected_total_codes
+    assert qc_flag_codec.decode(qc_flag_codec.with_total(packed)).tolist() == [
+        str(flags) for flags in expected_flags
+    ]
+
+    # And each automatic field is extracted at its position
+    for field, position in zip(QcField, qc_flag_codec.AUTOMATIC_POSITIONS):
+        assert qc_flag_codec.flag_codes(packed, position).tolist() == [
+            qc_flag_codec.FLAG_CODES[flags.get_field(field).value]
+            for flags in expected_flags
+        ]
+
+
+def test_flags_that_do_not_fit_the_packed_positions():
+    # Given a string with fewer automatic flags than QC fields
+    # When packing the string
+    # Then the missing flags are packed as no QC performed
+    assert qc_flag_codec.decode(qc_flag_codec.encode(["3_561_0_6"])).tolist() == [
+        "3_5610000000_0_6"
+    ]
+
+    # Given flags with more automatic flags than QC fields
+    given_flags = QcFlags()
+    given_flags.automatic = [QcFlag.GOOD_VALUE] * (len(QcField) + 1)
+
+    # When packing the flags
+    # Then a ValueError is raised
+    with pytest.raises(ValueError):
+        given_flags.packed
+
+    # And a packed integer without a flag at a position cannot be unpacked
+    with pytest.raises(ValueError):
+        QcFlags.from_packed(2**qc_flag_codec.BITS_PER_FLAG - 1)
@@ -0,0 +1,138 @@
+import polars as pl
+import pytest
+
+from ocean_data_qc.fyskem.qc_flag import QcFlag
+from ocean_data_qc.fyskem.qc_flag_expressions import (
+    code_column,
+    decode_quality_flags,
+    encode_quality_flags,
+    flag_code,
+    has_flag,
+    total_flag,
+    with_total_flag,
+)
+from ocean_data_qc.fyskem.qc_flag_tuple import QcField
+from ocean_data_qc.fyskem.qc_flags import QcFlags
+
+GIVEN_FLAG_STRINGS = (
+    "0_000_0_1",
+    "0_123_0_0",
+    "7_000_0_0",
+    "9_876_0_0",
+    "2_345_0_0",
+    "1_234_5_6",
+    "9_999_1_9",
+    "1_111511_0_5",
+    "3_561_0_6",
+    "0_1234567890_0_4",
+    "Q_00Q0000000_0_0",
+    "1_000B0A0000_0_0",
+    "6_0000000000_Q_0",
+    "1__0_0",
+    "_0000000000__0",
+    "",
+)
+
+
+@pytest.mark.parametrize("given_flag_string", GIVEN_FLAG_STRINGS)
+def test_total_flag_expression_matches_qc_flags(given_flag_string):
+    # Given a column with a quality flag string
+    given_data = pl.DataFrame({"quality_flag_long": [given_flag_string]})
+
+    # When calculating the total flag with polars expressions
+    result = given_data.select(
+        total=total_flag(pl.col("quality_flag_long")),
+        updated=with_total_flag(pl.col("quality_flag_long")),
+    ).row(0, named=True)
+
+    # Then the result is the same as when using QcFlags
+    expected_qc_flags = QcFlags.from_string(given_flag_string)
+    assert result["updated"] == str(expected_qc_flags)
+    if given_flag_string:
+        assert result["total"] == expected_qc_flags.total.value
+
+
+def test_total_flag_expression_keeps_missing_values():
+    # Given a column with a missing quality flag string
+    given_data = pl.DataFrame(
+        {"quality_flag_long": [None, "1_0_0_0"]}, schema={"quality_flag_long": pl.Utf8}
+    )
+
+    # When updating the total flag
+    result = given_data.select(with_total_flag(pl.col("quality_flag_long"))).to_series()
+
+    # Then the missing value is kept
+    assert result.to_list() == [None, "1_0_0_1"]
+
+
+@pytest.mark.parametrize(
+    "given_flag_string",
+    (
+        "0_0000000000_0_0",
+        "0_1234567890_0_4",
+        "Q_00Q0000000_0_0",
+        "1_000B0A0000_0_0",
+        "6_0000000000_Q_0",
+        "1_000000000012_0_1",
+    ),
+)
+def test_decoded_quality_flags_are_encoded_to_the_same_string(given_flag_string):
+    # Given data with a quality flag string
+    given_data = pl.DataFrame({"quality_flag_long": [given_flag_string]})
+
+    # When decoding the flags to integer codes and encoding them again
+    decoded_data = decode_quality_flags(given_data)
+    encoded_data = encode_quality_flags(decoded_data)
+
+    # Then there is an integer code column for each QC field
+    for field in QcField:
+        assert decoded_data[code_column(field)].dtype == pl.UInt8
+
+    # And the quality flag string is unchanged
+    assert encoded_data["quality_flag_long"].to_list() == [given_flag_string]
+    assert set(encoded_data.columns) == set(decoded_data.columns) - {
+        code_column(field) for field in QcField
+    }
+
+
+@pytest.mark.parametrize("given_field", list(QcField))
+def test_updated_flag_code_is_encoded_at_field_position(given_field):
+    # Given decoded quality flags
+    given_data = decode_quality_flags(
+        pl.DataFrame({"quality_flag_long": ["1_0000000000_0_1"]})
+    )
+
+    # When updating the code for a QC field
+    given_data = given_data.with_columns(
+        flag_code(pl.lit(QcFlag.BAD_VALUE.value)).alias(code_column(given_field))
+    )
+    encoded_data = encode_quality_flags(given_data)
+
+    # Then the flag is written to the position of the field
+    expected_automatic = ["0"] * len(QcField)
+    expected_automatic[given_field.value] = QcFlag.BAD_VALUE.value
+    assert encoded_data["AUTO_QC"].to_list() == ["".join(expected_automatic)]
+
+
+@pytest.mark.parametrize(
+    "given_flag_string",
+    (
+        "0_0000000000_0_0",
+        "0_1234567890_0_4",
+        "Q_00Q0000000_0_0",
+        "1_000B0A0000_0_0",
+        "6_0000000000_Q_0",
+    ),
+)
+@pytest.mark.parametrize("given_flag", [flag.value for flag in QcFlag])
+def test_has_flag_matches_flag_in_quality_flag_string(given_flag_string, given_flag):
+    # Given decoded quality flags
+    given_data = decode_quality_flags(
+        pl.DataFrame({"quality_flag_long": [given_flag_string]})
+    )
+
+    # When comparing the flag positions with a flag
+    result = given_data.select(has_flag(given_flag)).item()
+
+    # Then it is the same as searching the quality flag string for the flag
+    assert result == (given_flag in given_flag_string)
@@ -95,3 +95,29 @@ def test_return_total_from_auto_inc_manual(given_qc_flags, expected_value):
     )
     qf.manual = QcFlag.parse(given_qc_flags[2])
     assert qf.total == expected_value
+
+
+def test_total_is_updated_when_automatic_flag_is_assigned_in_place():
+    # Given QC flags with a total flag that has been read
+    given_qc_flags = QcFlags.from_string("1_1100000000_0_1")
+    assert given_qc_flags.total == QcFlag.GOOD_VALUE
+
+    # When assigning an automatic flag in place
+    given_qc_flags.automatic[QcField.Range] = QcFlag.BAD_VALUE
+
+    # Then the total flag is updated
+    assert given_qc_flags.total == QcFlag.BAD_VALUE
+    assert str(given_qc_flags) == "1_1400000000_0_4"
+
+
+def test_qc_flags_are_compact():
+    # Given QC flags
+    given_qc_flags = QcFlags.from_string("1_1100000000_0_1")
+
+    # Then neither the flags nor the automatic flags have an instance dictionary
+    assert not hasattr(given_qc_flags, "__dict__")
+    assert not hasattr(given_qc_flags.automatic, "__dict__")
+
+    # And flags with the same values are equal
+    assert given_qc_flags == QcFlags.from_string("1_1100000000_0_1")
+    assert given_qc_flags != QcFlags.from_string("1_1100000000_4_4")
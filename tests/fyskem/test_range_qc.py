@@ -53,3 +53,74 @@ def test_quality_flag_for_value_with_global_limits_using_override_configuration(
     assert len(parameter_after.qc.automatic) >= (QcField.Range + 1)
     # And the parameter is given the expected flag at the expected position
     assert parameter_after.qc.automatic[QcField.Range] == expected_flag
+
+
+def test_all_checked_parameters_are_updated_when_collapsing():
+    # Given data with two parameters, one value in range and one out of range
+    given_data = generate_data_frame(
+        [
+            {"parameter": "parameter_1", "value": 1.0},
+            {"parameter": "parameter_2", "value": 1.0},
+            {"parameter": "parameter_1", "value": 20.0},
+            {"parameter": "parameter_2", "value": 20.0},
+        ]
+    )
+    range_qc = RangeQc(given_data)
+    range_qc.expand_qc_columns()
+
+    # When checking both parameters with different ranges
+    range_qc.check("parameter_1", generate_range_check_configuration("", 0, 10))
+    range_qc.check("parameter_2", generate_range_check_configuration("", 10, 30))
+
+    # And finalizing data
+    range_qc.collapse_qc_columns()
+
+    # Then both parameters are flagged
+    flags = [
+        Parameter(row).qc.automatic[QcField.Range]
+        for row in range_qc._data.iter_rows(named=True)
+    ]
+    assert flags == [
+        QcFlag.GOOD_VALUE,
+        QcFlag.BAD_VALUE,
+        QcFlag.BAD_VALUE,
+        QcFlag.GOOD_VALUE,
+    ]
+
+
+def test_checking_all_parameters_at_once_gives_the_same_result():
+    # Given data with two parameters and a range for each of them
+    given_data = generate_data_frame(
+        [
+            {"parameter": "parameter_1", "value": 1.0},
+            {"parameter": "parameter_2", "value": 1.0},
+            {"parameter": "parameter_1", "value": 20.0},
+            {"parameter": "parameter_2", "value": None},
+        ]
+    )
+    given_configurations = {
+        "parameter_1": generate_range_check_configuration("", 0, 10),
+        "parameter_2": generate_range_check_configuration("", 10, 30),
+    }
+
+    # When checking the parameters one by one and all at once
+    results = []
+    for check_all in (False, True):
+        range_qc = RangeQc(given_data)
+        range_qc.expand_qc_columns()
+        if check_all:
+            range_qc.check_parameters(given_configurations)
+        else:
+            for parameter, configuration in given_configurations.items():
+                range_qc.check(parameter, configuration)
+        range_qc.collapse_qc_columns()
+        results.append(range_qc._data)
+
+    # Then the flags and info are the same
+    assert results[0].equals(results[1])
+    assert results[1]["info_AUTO_QC_Range"].to_list() == [
+        "GOOD 1.0 in range 0.0 - 10.0",
+        "BAD 1.0 out of range 10.0 - 30.0",
+        "BAD 20.0 out of range 0.0 - 10.0",
+        "MISSING no value for parameter_2",
+    ]
@@ -230,3 +230,119 @@ def test_quality_flag_for_value_month_depth_with_given_qc(
 
     # And the parameter is given the expected flag at the expected position
     assert parameter_after.qc.automatic[QcField.Statistic] == expected_flag
+
+
+def test_each_row_uses_thresholds_for_its_depth_bin():
+    # Given values at different depths, one below all depth bins and one in another month
+    given_parameter_name = "parameter_name"
+    given_sea_area = "ocean1"
+    given_rows = (
+        (5, 1, "01", QcFlag.GOOD_VALUE),
+        (5, 15, "01", QcFlag.BAD_VALUE),
+        (5, 30, "01", QcFlag.NO_QUALITY_CONTROL),
+        (5, 1, "03", QcFlag.NO_QUALITY_CONTROL),
+    )
+    given_data = generate_data_frame(
+        [
+            {
+                "parameter": given_parameter_name,
+                "value": value,
+                "sea_basin": given_sea_area,
+                "DEPH": depth,
+                "visit_month": month,
+            }
+            for value, depth, month, _ in given_rows
+        ]
+    )
+
+    # And thresholds for two depth bins where the value is only good in the first
+    def given_months(lower, upper):
+        return {
+            "01": {
+                "min_range_value": lower,
+                "max_range_value": upper,
+                "flag1_lower": lower,
+                "flag1_upper": upper,
+                "flag2_lower": lower,
+                "flag2_upper": upper,
+                "flag3_lower": lower,
+                "flag3_upper": upper,
+            }
+        }
+
+    given_configuration = generate_statistic_check_configuration(
+        sea_basin=given_sea_area,
+        depth_intervals=[(10, 20, given_months(7, 8)), (0, 10, given_months(1, 10))],
+    )
+
+    # When performing QC
+    statistic_qc = StatisticQc(given_data)
+    statistic_qc.expand_qc_columns()
+    statistic_qc.check(given_parameter_name, given_configuration)
+    statistic_qc.collapse_qc_columns()
+
+    # Then each row is flagged using the thresholds for its depth bin
+    # And rows without a depth bin are not checked
+    for row, (_, _, _, expected_flag) in zip(
+        statistic_qc._data.iter_rows(named=True), given_rows
+    ):
+        parameter_after = Parameter(row)
+        assert parameter_after.qc.automatic[QcField.Statistic] == expected_flag
+
+
+def test_overlapping_depth_bins_use_first_match_as_get_thresholds():
+    # Given values in two overlapping depth bins, the first bin covering both values
+    given_parameter_name = "parameter_name"
+    given_sea_area = "ocean1"
+    given_rows = ((5, 15, QcFlag.GOOD_VALUE), (5, 50, QcFlag.GOOD_VALUE))
+    given_data = generate_data_frame(
+        [
+            {
+                "parameter": given_parameter_name,
+                "value": value,
+                "sea_basin": given_sea_area,
+                "DEPH": depth,
+                "visit_month": "01",
+            }
+            for value, depth, _ in given_rows
+        ]
+    )
+
+    def given_months(lower, upper):
+        return {
+            "01": {
+                "min_range_value": lower,
+                "max_range_value": upper,
+                "flag1_lower": lower,
+                "flag1_upper": upper,
+                "flag2_lower": lower,
+                "flag2_upper": upper,
+                "flag3_lower": lower,
+                "flag3_upper": upper,
+            }
+        }
+
+    given_configuration = generate_statistic_check_configuration(
+        sea_basin=given_sea_area,
+        depth_intervals=[(0, 100, given_months(1, 10)), (10, 20, given_months(7, 8))],
+    )
+
+    # When performing QC
+    statistic_qc = StatisticQc(given_data)
+    statistic_qc.expand_qc_columns()
+    with pytest.warns(UserWarning, match="Overlapping depth intervals"):
+        statistic_qc.check(given_parameter_name, given_configuration)
+    statistic_qc.collapse_qc_columns()
+
+    # Then each row is flagged with the thresholds of the first matching depth bin
+    for row, (_, depth, expected_flag) in zip(
+        statistic_qc._data.iter_rows(named=True), given_rows
+    ):
+        parameter_after = Parameter(row)
+        assert parameter_after.qc.automatic[QcField.Statistic] == expected_flag
+
+        # And the same thresholds are given by get_thresholds
+        assert (
+            given_configuration.get_thresholds(given_sea_area, depth, 1)["flag1_upper"]
+            == 10
+        )
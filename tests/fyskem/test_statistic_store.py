@@ -0,0 +1,118 @@
+import os
+
+import polars as pl
+from polars.testing import assert_frame_equal
+
+from ocean_data_qc.fyskem.qc_configuration import QcConfiguration
+from ocean_data_qc.fyskem.statistic_store import (
+    STATISTICS_DIR,
+    compile_statistics,
+    load_statistics,
+    read_statistics_file,
+    shared_statistics,
+)
+
+
+def test_compiled_statistics_match_statistics_files(tmp_path):
+    # Given a store compiled from the statistics files
+    given_store = tmp_path / "statistics.arrow"
+    compile_statistics(STATISTICS_DIR, given_store)
+
+    for given_source in sorted(STATISTICS_DIR.glob("*.txt")):
+        # When loading the statistics for a parameter
+        statistics = load_statistics(given_source.stem, given_source, given_store)
+
+        # Then they are the same as in the file, sorted by sea basin, month and depth
+        assert_frame_equal(
+            statistics,
+            read_statistics_file(given_source).sort(
+                ["sea_basin", "month", "min_depth"], maintain_order=True
+            ),
+        )
+
+
+def test_outdated_store_is_not_used(tmp_path):
+    # Given a statistics file that is newer than the compiled store
+    given_source = tmp_path / "TEMP_CTD.txt"
+    given_source.write_text((STATISTICS_DIR / "TEMP_CTD.txt").read_text())
+    given_store = tmp_path / "statistics.arrow"
+    compile_statistics(tmp_path, given_store)
+    store_modified = given_store.stat().st_mtime
+    os.utime(given_source, (store_modified + 10, store_modified + 10))
+
+    # When loading the statistics
+    statistics = load_statistics("TEMP_CTD", given_source, given_store)
+
+    # Then the store is not used
+    assert statistics is None
+
+
+def test_missing_store_or_parameter_is_not_used(tmp_path):
+    # Given a compiled store that is newer than the statistics file
+    given_source = tmp_path / "TEMP_CTD.txt"
+    given_source.write_text((STATISTICS_DIR / "TEMP_CTD.txt").read_text())
+    os.utime(given_source, (0, 0))
+    given_store = tmp_path / "statistics.arrow"
+    compile_statistics(tmp_path, given_store)
+
+    # When loading a parameter that is not in the store or from a missing store
+    # Then the store is not used
+    assert load_statistics("NOT_A_PARAMETER", given_source, given_store) is None
+    assert load_statistics("TEMP_CTD", given_source, tmp_path / "missing.arrow") is None
+    assert isinstance(
+        load_statistics("TEMP_CTD", given_source, given_store), pl.DataFrame
+    )
+
+
+def test_statistics_are_shared_between_configurations():
+    # Given two separately created configurations
+    first_configuration = QcConfiguration()
+    second_configuration = QcConfiguration()
+
+    # When getting the statistics for the same parameter from both
+    first_statistics = first_configuration.get("statistic_check", "TEMP_CTD").data
+    second_statistics = second_configuration.get("statistic_check", "TEMP_CTD").data
+
+    # Then the same table is used
+    assert first_statistics is second_statistics
+
+
+def test_shared_statistics_are_reloaded_when_file_changes(tmp_path):
+    # Given statistics that have been loaded from a file
+    given_source = tmp_path / "NOT_IN_STORE.txt"
+    given_source.write_text((STATISTICS_DIR / "TEMP_CTD.txt").read_text())
+    os.utime(given_source, (0, 0))
+    first_statistics = shared_statistics(given_source)
+
+    # When the file is changed
+    given_rows = given_source.read_text().splitlines(keepends=True)
+    given_source.write_text("".join(given_rows[:2]))
+    os.utime(given_source, (10, 10))
+    second_statistics = shared_statistics(given_source)
+
+    # Then the changed statistics are loaded
+    assert len(first_statistics) == len(given_rows) - 1
+    assert len(second_statistics) == 1
+
+
+def test_shared_statistics_are_reloaded_when_store_is_recompiled(tmp_path):
+    # Given statistics that have been loaded from a compiled store
+    given_source = tmp_path / "TEMP_CTD.txt"
+    given_source.write_text((STATISTICS_DIR / "TEMP_CTD.txt").read_text())
+    os.utime(given_source, (0, 0))
+    given_store = tmp_path / "statistics.arrow"
+    compile_statistics(tmp_path, given_store)
+    os.utime(given_store, (10, 10))
+    first_statistics = shared_statistics(given_source, given_store)
+
+    # When the store is compiled again from a changed file that is still older
+    given_rows = given_source.read_text().splitlines(keepends=True)
+    given_source.write_text("".join(given_rows[:2]))
+    os.utime(given_source, (0, 0))
+    compile_statistics(tmp_path, given_store)
+    os.utime(given_store, (20, 20))
+    second_statistics = shared_statistics(given_source, given_store)
+
+    # Then the statistics are loaded again from the store
+    assert len(first_statistics) == len(given_rows) - 1
+    assert len(second_statistics) == 1
@@ -0,0 +1,124 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from ocean_data_qc import statistic
+from ocean_data_qc.fyskem.qc_configuration import QcConfiguration
+from ocean_data_qc.statistic import (
+    ProfileStatisticsCache,
+    get_profile_statistics_for_parameter_and_sea_basin,
+)
+
+
+def test_profile_statistics_are_cached_per_month():
+    # Given an empty cache
+    statistic.profile_statistics_cache.clear()
+
+    # When getting statistics for two points in time in the same month
+    first_result = get_profile_statistics_for_parameter_and_sea_basin(
+        "TEMP_CTD", "Kattegat", datetime.datetime(2024, 5, 16, 10, 30)
+    )
+    second_result = get_profile_statistics_for_parameter_and_sea_basin(
+        "TEMP_CTD", "Kattegat", datetime.datetime(2024, 5, 2, 8, 0)
+    )
+
+    # Then the cached result is reused
+    assert second_result is first_result
+    assert len(first_result["depth"]) > 1
+
+    # And only the profile is cached
+    assert len(statistic.profile_statistics_cache) == 1
+
+
+def test_profile_statistics_use_the_statistics_of_the_statistic_check():
+    # Given the statistics used by the statistic check
+    given_statistics = QcConfiguration().get("statistic_check", "TEMP_CTD").data
+
+    # When getting the statistics table for profiles of the same parameter
+    statistic_table = statistic._statistic_table("TEMP_CTD")
+
+    # Then the same table is used
+    assert statistic_table is given_statistics
+
+
+def test_statistics_are_partitioned_by_sea_basin_and_month_once():
+    # Given the statistics table of a parameter
+    given_table = statistic._statistic_table("TEMP_CTD")
+
+    # When getting the partitions of the table twice
+    first_partitions = statistic._statistic_partitions("TEMP_CTD")
+    second_partitions = statistic._statistic_partitions("TEMP_CTD")
+
+    # Then the partitions are built once
+    assert second_partitions is first_partitions
+
+    # And each partition holds the rows of its sea_basin and month
+    assert sum(len(partition) for partition in first_partitions.values()) == len(
+        given_table
+    )
+    for (sea_basin, month), partition in first_partitions.items():
+        assert partition["sea_basin"].unique().to_list() == [sea_basin]
+        assert partition["month"].unique().to_list() == [month]
+
+
+@pytest.mark.parametrize(
+    "given_content, expected_warning",
+    (
+        (None, "No statistic for {parameter}"),
+        ("depth\tmonth\n0\t1\n", "Missing expected columns in {parameter}"),
+    ),
+)
+def test_unusable_statistics_are_read_and_reported_once(
+    tmp_path, monkeypatch, capsys, given_content, expected_warning
+):
+    # Given a parameter with a missing or unusable statistics file
+    given_parameter = f"UNUSABLE_{tmp_path.name}"
+    given_path = tmp_path / f"{given_parameter}.txt"
+    if given_content is not None:
+        given_path.write_text(given_content)
+    monkeypatch.setitem(statistic.STATISTIC_FILES, given_parameter, given_path)
+    statistic.profile_statistics_cache.clear()
+
+    # When getting statistics for several months
+    results = [
+        get_profile_statistics_for_parameter_and_sea_basin(
+            given_parameter, "Kattegat", datetime.datetime(2024, month, 1)
+        )
+        for month in (1, 2, 3)
+    ]
+
+    # Then no statistics are found and the reason is only reported once
+    assert all(np.isnan(result["depth"][0]) for result in results)
+    assert capsys.readouterr().out.splitlines() == [
+        expected_warning.format(parameter=given_parameter)
+    ]
+
+
+def test_cache_evicts_least_recently_used_values_over_limit():
+    # Given a cache with room for two values
+    given_cache = ProfileStatisticsCache(max_bytes=20)
+    given_cache.put("first", 1, size=10)
+    given_cache.put("second", 2, size=10)
+
+    # When using the first value and adding a third
+    given_cache.get("first")
+    given_cache.put("third", 3, size=10)
+
+    # Then the least recently used value is evicted
+    assert given_cache.get("second") is None
+    assert given_cache.get("first") == 1
+    assert given_cache.get("third") == 3
+    assert given_cache.nbytes == 20
+
+
+def test_cache_does_not_keep_values_larger_than_limit():
+    # Given a small cache
+    given_cache = ProfileStatisticsCache(max_bytes=10)
+
+    # When adding a value larger than the limit
+    given_cache.put("large", 1, size=11)
+
+    # Then it is not cached
+    assert given_cache.get("large") is None
+    assert given_cache.nbytes == 0